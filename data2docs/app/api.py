@@ -0,0 +1,27 @@
+# app/api.py
+
+import streamlit as st
+
+from perf import span
+
+# ---------------- CONFIG ----------------
+# API_URL = "http://127.0.0.1:5000/api"  # Local testing
+API_URL = "https://ai-data-reporter.onrender.com/api"  # For deployment
+
+
+def safe_json(res):
+    try:
+        return res.json()
+    except Exception:
+        return {}
+
+
+def auth_headers():
+    return {"Authorization": f"Bearer {st.session_state.token}"}
+
+
+def post(path, **kwargs):
+    # requests is only needed once the user talks to the backend
+    import requests
+    with span(f"POST {path}"):
+        return requests.post(f"{API_URL}{path}", **kwargs)
@@ -0,0 +1,196 @@
+# app/automl.py
+
+import streamlit as st
+
+from perf import span
+
+MODES = ["⚡ Progressive (growing samples)", "🐢 Full data"]
+
+
+def show_automl(data_for_viz, dataset_key):
+    """AutoML block; ``dataset_key`` is the dataset store key of ``data_for_viz``."""
+    target_col = st.selectbox("🎯 Select target column for prediction:", data_for_viz.columns)
+
+    if not target_col:
+        return
+
+    import os
+
+    from progressive_automl import FIRST_STAGE, MIN_ROWS
+
+    if len(data_for_viz) < MIN_ROWS:
+        st.warning(f"⚠️ AutoML needs at least {MIN_ROWS} rows.")
+        return
+
+    # progressive by default once the data is bigger than a few samples' worth
+    mode = st.radio("Training mode:", MODES, index=0 if len(data_for_viz) > 10 * FIRST_STAGE else 1,
+                    horizontal=True, key="automl_mode")
+    budget = None
+    if mode == MODES[0]:
+        budget = st.number_input("⏱️ Time budget (seconds):", min_value=5, max_value=3600,
+                                 value=int(os.environ.get("AUTOML_BUDGET_S", "60")), step=5,
+                                 key="automl_budget")
+
+    # training saves a model version, so it runs only on request and reruns reuse the result;
+    # the store key already names the content, so reruns never hash the frame
+    key = (dataset_key, target_col, mode)
+    run = st.session_state.get("automl_run")
+    if st.button("🚀 Train Models", key="automl_train"):
+        if run is not None and run["key"] == key:
+            st.caption("ℹ️ Already trained on this data, target and mode; showing that run.")
+        else:
+            board = st.empty()
+
+            def show_stage(leaderboard, stage, stages):
+                latest = leaderboard.groupby("model").tail(1).sort_values("score", ascending=False)
+                with board.container():
+                    st.caption(f"Provisional leaderboard after stage {stage} of {stages} "
+                               f"({int(leaderboard['rows'].iloc[-1]):,} training rows):")
+                    st.dataframe(latest.reset_index(drop=True), use_container_width=True)
+
+            with st.spinner("🤖 Training models..."):
+                run = train_automl(data_for_viz, target_col, progressive=mode == MODES[0], budget_s=budget,
+                                   user=st.session_state.get("user"), on_stage=show_stage)
+            run["key"] = key
+            st.session_state.automl_run = run
+
+    if run is None or run["key"] != key:
+        st.session_state.automl_results = None
+        st.info("Choose a target and training mode, then press **🚀 Train Models**.")
+        return
+
+    results = run["scores"]
+    # kept for the HTML report
+    st.session_state.automl_results = {"target": target_col, "problem_type": run["problem_type"],
+                                       "best_model": run["best_name"], "scores": results}
+    show_run(run)
+
+    # AI Explanation of results
+    if st.button("💡 Explain Results with AI"):
+        from chat_with_groq import chat_with_groq
+
+        try:
+            reply = chat_with_groq([
+                {"role": "system", "content": "You are a data scientist explaining AutoML results."},
+                {"role": "user", "content": f"Explain these results:\n{results}"}
+            ], user=st.session_state.get("user"))
+            st.write("### 🤖 AI Explanation")
+            st.write(reply)
+        except Exception as e:
+            st.error(f"⚠️ AI explanation failed: {e}")
+
+
+def show_run(run):
+    """Scores, the search summary and the saved model of a :func:`train_automl` run."""
+    st.write(f"Detected task: **{run['problem_type'].capitalize()}**")
+    if run.get("stop_reason"):
+        st.info(f"Stopped after {run['seconds']}s: {run['stop_reason']}. **{run['best_name']}** trained on "
+                f"{run['train_rows']:,} rows" + (" (refit on all training data)." if run["refit"] else "."))
+    st.subheader("📊 Model Performance")
+    st.json(run["scores"])
+    if run.get("report"):
+        st.text("Detailed report (best model):")
+        st.text(run["report"])
+
+    meta = run.get("meta")
+    if meta:
+        st.success(f"💾 Saved **{run['best_name']}** as model `{meta['dataset_id']}` v{meta['version']}. "
+                   f"Score new data with `POST /api/models/{meta['dataset_id']}/predict`.")
+
+        def model_bytes():
+            with open(meta["path"], "rb") as f:
+                return f.read()
+
+        # read only when clicked, not on every rerun
+        st.download_button(
+            label="📥 Download Best Model",
+            data=model_bytes,
+            file_name=f"model_{meta['dataset_id']}_v{meta['version']}.joblib"
+        )
+
+
+def train_automl(data_for_viz, target_col, progressive=False, budget_s=None, user=None, on_stage=None):
+    """Fit the candidate models, save the best one and return the run for :func:`show_run`."""
+    # scikit-learn is the slowest import in the app; only pay for it here
+    import numpy as np
+    import pandas as pd
+    from sklearn.model_selection import train_test_split
+    from sklearn.preprocessing import LabelEncoder
+    from sklearn.metrics import classification_report
+
+    from progressive_automl import candidate_models, evaluate, progressive_search
+
+    # shallow: columns below are replaced, never written in place, so the shared frame is untouched
+    df_ml = data_for_viz.copy(deep=False)
+
+    # Encode categorical target if needed
+    label_classes = None
+    if df_ml[target_col].dtype == "object":
+        le = LabelEncoder()
+        df_ml[target_col] = le.fit_transform(df_ml[target_col].astype(str))
+        label_classes = le.classes_.tolist()
+
+    # timestamps are for trend charts, not model features
+    X = df_ml.drop(columns=[target_col]).select_dtypes(exclude=["datetime", "datetimetz"])
+    # nor are nested JSON values: lists and dicts cannot be one-hot encoded
+    nested = [c for c in X.columns[X.dtypes == object]
+              if X[c].map(lambda v: isinstance(v, (list, dict))).any()]
+    X = X.drop(columns=nested).dropna(axis=1, how="all")
+    # linear models reject NaN, and so do random forests before scikit-learn 1.4: fill numeric
+    # gaps with the training medians, saved in the model meta so batch scoring fills the same way
+    fill_values = X.median(numeric_only=True).to_dict()
+    X = X.fillna(fill_values)
+    y = df_ml[target_col]
+    input_columns = X.columns.tolist()
+
+    # Handle categorical predictors
+    with span("automl: prepare features"):
+        X = pd.get_dummies(X, drop_first=True)
+
+    # Detect problem type
+    problem_type = "classification" if y.nunique() <= 10 and y.dtype != "float" else "regression"
+    run = {"problem_type": problem_type}
+
+    if progressive:
+        with span("automl: progressive search"):
+            search = progressive_search(X, y, problem_type, budget_s=float(budget_s or 60), on_stage=on_stage)
+        best_name, best_model, best_score = search["best_name"], search["best_model"], search["best_score"]
+        results = search["scores"]
+        X_test, y_test = search["X_test"], search["y_test"]
+        run.update({k: search[k] for k in ("stop_reason", "seconds", "train_rows", "refit")})
+    else:
+        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+        results = {}
+        best_model = None
+        best_name = None
+        best_score = -np.inf
+        for name, model in candidate_models(problem_type).items():
+            with span(f"fit {name}"):
+                model.fit(X_train, y_train)
+            score, results[name] = evaluate(problem_type, model, X_test, y_test)
+            if score > best_score:
+                best_score = score
+                best_model = model
+                best_name = name
+
+    run.update({"best_name": best_name, "scores": results})
+    if problem_type == "classification":
+        run["report"] = classification_report(y_test, best_model.predict(X_test))
+
+    # Save best model: one versioned artifact per user and dataset
+    if best_model:
+        from model_registry import save_model
+
+        with span("automl: save model"):
+            run["meta"] = save_model(best_model, user, data_for_viz, {
+                "target": target_col,
+                "problem_type": problem_type,
+                "model_name": best_name,
+                "score": float(best_score),
+                "input_columns": input_columns,
+                "categorical_columns": [c for c in input_columns if c not in X.columns],
+                "feature_columns": X.columns.tolist(),
+                "fill_values": fill_values,
+                "label_classes": label_classes,
+            })
+    return run
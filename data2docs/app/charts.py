@@ -0,0 +1,225 @@
+# app/charts.py
+
+from datetime import timedelta
+
+import streamlit as st
+
+from perf import span
+
+# ---------------------------
+# Chart options
+# ---------------------------
+chart_options = [
+    "Histogram",
+    "Boxplot",
+    "Correlation Heatmap",
+    "Scatter Plot",
+    "Line Chart",
+    "Bar Chart (Categorical)",
+    "Pie Chart (Categorical)"
+]
+
+
+def _column_groups(df_in):
+    numeric_cols = df_in.select_dtypes(include="number").columns.tolist()
+    datetime_cols = df_in.select_dtypes(include=["datetime", "datetimetz"]).columns.tolist()
+    cat_cols = df_in.select_dtypes(exclude=["number", "datetime", "datetimetz"]).columns.tolist()
+    return numeric_cols, datetime_cols, cat_cols
+
+
+# ---------------------------
+# Chart rendering function
+# ---------------------------
+def render_chart(df_in, chart_type, key_prefix=""):
+    """Draw ``chart_type`` with its widgets; returns the chart spec (see :func:`draw_chart`) or ``None``."""
+    with span(f"render_chart: {chart_type}"):
+        return _render_chart(df_in, chart_type, key_prefix)
+
+
+def _render_chart(df_in, chart_type, key_prefix):
+    numeric_cols, datetime_cols, cat_cols = _column_groups(df_in)
+
+    with st.expander(f"📊 {chart_type}"):
+        custom_title = st.text_input(
+            f"Title for {chart_type}:",
+            value=chart_type,
+            key=f"title_{key_prefix}_{chart_type}"
+        )
+        spec = {"chart": chart_type, "title": custom_title}
+
+        try:
+            if chart_type == "Histogram":
+                if not numeric_cols:
+                    st.warning("⚠️ No numeric columns available.")
+                    return None
+                spec["column"] = st.selectbox("Select column:", numeric_cols, key=f"hist_col_{key_prefix}")
+                spec["bins"] = st.slider("Bins:", 5, 100, 20, key=f"bins_{key_prefix}")
+
+            elif chart_type == "Boxplot":
+                if not numeric_cols:
+                    st.warning("⚠️ No numeric columns available.")
+                    return None
+                spec["columns"] = st.multiselect("Select columns:", numeric_cols, default=numeric_cols[:1],
+                                                 key=f"box_cols_{key_prefix}")
+                if not spec["columns"]:
+                    return None
+
+            elif chart_type == "Correlation Heatmap":
+                from correlation import METHOD_LABELS
+
+                spec["method"] = METHOD_LABELS[st.selectbox("Method:", list(METHOD_LABELS),
+                                                            key=f"corr_method_{key_prefix}")]
+
+            elif chart_type == "Scatter Plot":
+                if len(numeric_cols) < 2:
+                    st.info("ℹ️ Need at least two numeric columns.")
+                    return None
+                spec["x"] = st.selectbox("X-axis column:", numeric_cols, key=f"xcol_{key_prefix}")
+                spec["y"] = st.selectbox("Y-axis column:", numeric_cols, key=f"ycol_{key_prefix}")
+
+            elif chart_type == "Line Chart":
+                x_options = datetime_cols + numeric_cols
+                if not x_options:
+                    st.info("ℹ️ Need a datetime column or at least two numeric columns.")
+                    return None
+                spec["x"] = st.selectbox("X-axis column:", x_options, key=f"xline_{key_prefix}")
+                if spec["x"] in datetime_cols:
+                    if not _time_series_widgets(df_in, spec, numeric_cols, key_prefix):
+                        return None
+                else:
+                    if len(numeric_cols) < 2:
+                        st.info("ℹ️ Need at least two numeric columns.")
+                        return None
+                    spec["y"] = st.selectbox("Y-axis column:", numeric_cols, key=f"yline_{key_prefix}")
+
+            elif chart_type == "Bar Chart (Categorical)":
+                if not cat_cols:
+                    st.warning("⚠️ No categorical columns available.")
+                    return None
+                spec["column"] = st.selectbox("Select column:", cat_cols, key=f"bar_col_{key_prefix}")
+
+            elif chart_type == "Pie Chart (Categorical)":
+                if not cat_cols:
+                    st.warning("⚠️ No categorical columns available.")
+                    return None
+                spec["column"] = st.selectbox("Select column:", cat_cols, key=f"pie_col_{key_prefix}")
+
+            st.pyplot(draw_chart(df_in, spec))
+            return spec
+
+        except ValueError as e:
+            st.info(f"ℹ️ {e}")
+        except Exception as e:
+            st.error(f"❌ Error rendering {chart_type}: {e}")
+    return None
+
+
+# ---------------------------
+# Drawing (no Streamlit)
+# ---------------------------
+def draw_chart(df_in, spec):
+    """Draw a chart spec from :func:`render_chart` onto a new Figure.
+
+    Uses ``matplotlib.figure.Figure`` rather than pyplot, so figures are not
+    tracked globally and several can be drawn from worker threads (the report
+    builder does). Raises ``ValueError`` when the data cannot make the chart.
+    """
+    import seaborn as sns
+    from matplotlib.figure import Figure
+
+    chart_type = spec["chart"]
+    if chart_type == "Correlation Heatmap":
+        from correlation import clustered_heatmap, correlation_pairs, subset_columns, subset_matrix
+
+        # only the columns behind the strongest pairs are drawn
+        pairs = correlation_pairs(df_in, method=spec["method"], k=15)
+        if pairs.empty:
+            raise ValueError("Need at least two correlated columns for this method.")
+        columns = subset_columns(pairs, max_columns=12)
+        return clustered_heatmap(subset_matrix(df_in, columns, spec["method"]), title=spec["title"])
+
+    fig = Figure()
+    ax = fig.subplots()
+    if chart_type == "Histogram":
+        # ax.hist rather than Series.hist, which reaches for pyplot's current figure
+        ax.hist(df_in[spec["column"]].dropna(), bins=spec["bins"])
+        ax.grid(True)
+    elif chart_type == "Boxplot":
+        sns.boxplot(data=df_in[spec["columns"]], ax=ax)
+    elif chart_type == "Scatter Plot":
+        ax.scatter(df_in[spec["x"]], df_in[spec["y"]], alpha=0.6)
+    elif chart_type == "Line Chart":
+        if "stat" in spec:
+            _time_series(df_in, spec, ax)
+        else:
+            _numeric_line(df_in, spec["x"], spec["y"], ax)
+    elif chart_type == "Bar Chart (Categorical)":
+        col = spec["column"]
+        counts = df_in[col].value_counts().reset_index()
+        counts.columns = [col, "Count"]
+        sns.barplot(x=col, y="Count", data=counts, ax=ax)
+        ax.tick_params(axis="x", labelrotation=45)
+    elif chart_type == "Pie Chart (Categorical)":
+        counts = df_in[spec["column"]].value_counts()
+        ax.pie(counts, labels=counts.index, autopct="%1.1f%%", startangle=90)
+    else:
+        raise ValueError(f"Unknown chart type: {chart_type}")
+    ax.set_title(spec["title"])
+    return fig
+
+
+# ---------------------------
+# Line chart helpers
+# ---------------------------
+LINE_MAX_POINTS = 2_000
+
+
+def _time_series_widgets(df_in, spec, numeric_cols, key_prefix):
+    """Value, aggregate and zoom range for a datetime x-axis; False if there is nothing to draw."""
+    from rollups import STATS, get_rollups
+
+    y_col = st.selectbox("Value:", ["(row count)"] + numeric_cols, key=f"yts_{key_prefix}")
+    spec["y"] = None if y_col == "(row count)" else y_col
+    stats = ["count"] if spec["y"] is None else STATS
+    spec["stat"] = st.selectbox("Aggregate:", stats, index=stats.index("mean") if spec["y"] else 0,
+                                key=f"stat_{key_prefix}")
+
+    rollups = get_rollups(df_in, spec["x"], spec["y"])
+    if rollups.tables["minute"].empty:
+        st.info("ℹ️ No valid timestamps in this column.")
+        return False
+    first, last = rollups.start.to_pydatetime(), rollups.end.to_pydatetime()
+    spec["range"] = (first, last)
+    if last > first:
+        # about a thousand slider stops, in whole minutes
+        step = timedelta(minutes=max(int((last - first).total_seconds() // 60_000), 1))
+        spec["range"] = st.slider("Range:", min_value=first, max_value=last, value=(first, last),
+                                  step=step, key=f"range_{key_prefix}")
+    return True
+
+
+def _time_series(df_in, spec, ax):
+    """Trend over a datetime column, drawn from cached rollups at a zoom-dependent granularity."""
+    from rollups import get_rollups
+
+    level, table = get_rollups(df_in, spec["x"], spec["y"]).select(*spec.get("range", (None, None)))
+    series = table[spec["stat"]]
+    ax.plot(series.index, series.values, marker="o" if len(series) <= 60 else None)
+    ax.set_xlabel(f"{spec['x']} (per {level})")
+    ax.set_ylabel(spec["stat"] if spec["y"] is None else f"{spec['stat']} of {spec['y']}")
+    ax.figure.autofmt_xdate()
+
+
+def _numeric_line(df_in, x_col, y_col, ax):
+    """Line over a numeric x: sorted, and averaged into bins when there are too many points."""
+    data = df_in[[x_col, y_col]].dropna()
+    if len(data) > LINE_MAX_POINTS:
+        import pandas as pd
+
+        bins = pd.cut(data[x_col], LINE_MAX_POINTS)
+        data = data.groupby(bins, observed=True).mean()
+    else:
+        data = data.sort_values(x_col)
+    ax.plot(data[x_col], data[y_col], marker="o" if len(data) <= 60 else None)
+    ax.set_xlabel(x_col)
+    ax.set_ylabel(y_col)
@@ -0,0 +1,31 @@
+# app/chat.py
+
+import streamlit as st
+
+
+
+def show_chat(df):
+    if "chat_history" not in st.session_state:
+        st.session_state.chat_history = [
+            {"role": "system", "content": "You're a helpful data analyst."},
+            {"role": "user", "content": f"Here's a preview of the data:\n\n{df.head(3).to_string(index=False)}"}
+        ]
+
+    prompt = st.text_input("Ask something about your data:")
+
+    if prompt:
+        st.session_state.chat_history.append({"role": "user", "content": prompt})
+        with st.spinner("🤖 Thinking..."):
+            try:
+                # through the LLM gateway (coalescing, per-user rate limits, 429 backoff)
+                from chat_with_groq import chat_with_groq
+
+                reply = chat_with_groq(st.session_state.chat_history, user=st.session_state.get("user"))
+                st.session_state.chat_history.append({"role": "assistant", "content": reply})
+            except Exception as e:
+                st.error(f"⚠️ Chat failed: {e}")
+
+    st.markdown("### 💬 Conversation History")
+    for msg in st.session_state.chat_history[2:]:
+        icon = "👤" if msg["role"] == "user" else "🤖"
+        st.markdown(f"{icon} **{msg['role'].capitalize()}**: {msg['content']}")
@@ -2,19 +2,27 @@ from openai import OpenAI
 import os
 import streamlit as st
 
+from llm_gateway import gateway_from_env
+from perf import traced
+
 client = OpenAI(
     api_key=os.getenv("GROQ_API_KEY") or st.secrets["api_keys"]["groq"],
-    base_url="https://api.groq.com/openai/v1",
+    base_url=os.getenv("GROQ_BASE_URL", "https://api.groq.com/openai/v1"),
+    max_retries=0,  # retries and backoff are the gateway's job
 )
 
-def chat_with_groq(messages, model="llama3-70b-8192"):
-    try:
-        response = client.chat.completions.create(
-            model=model,
-            messages=messages,
-            max_tokens=800,
-            temperature=0.7
-        )
-        return response.choices[0].message.content
-    except Exception as e:
-        return f"❌ Error: {e}"
+
+def _send(messages, **params):
+    response = client.chat.completions.create(messages=messages, **params)
+    return response.choices[0].message.content
+
+
+# one gateway per process, so a user's identical requests from several sessions coalesce
+gateway = gateway_from_env(_send)
+
+
+@traced()
+def chat_with_groq(messages, model="llama3-70b-8192", user=None, max_tokens=800, temperature=0.7):
+    """Reply text for ``messages``; raises ``LLMError`` (``RateLimited`` when queued too long)."""
+    return gateway.complete(messages, user=user, model=model, max_tokens=max_tokens, temperature=temperature)
+
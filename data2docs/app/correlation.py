@@ -0,0 +1,211 @@
+# app/correlation.py
+"""Correlation analysis that scales to wide datasets.
+
+Instead of a dense ``df.corr()`` drawn with an annotation per cell, the
+engine standardizes a (sampled) float32 matrix once, multiplies it in column
+blocks and keeps only the ``k`` strongest pairs. Pairs above a threshold are
+grouped into clusters, and only the columns involved are drawn, ordered by
+hierarchical clustering.
+"""
+
+import numpy as np
+import pandas as pd
+
+METHOD_LABELS = {
+    "Pearson": "pearson",
+    "Spearman (rank)": "spearman",
+    "Cramér's V (categorical)": "cramers_v",
+}
+
+
+# ---------------- NUMERIC (PEARSON / SPEARMAN) ----------------
+def _standardized_matrix(df, columns, method, sample_rows, seed):
+    data = df[columns]
+    if sample_rows and len(data) > sample_rows:
+        data = data.sample(n=sample_rows, random_state=seed)
+    if method == "spearman":
+        data = data.rank(method="average")
+    X = data.to_numpy(dtype=np.float32, na_value=np.nan)
+
+    mean = np.nanmean(X, axis=0)
+    std = np.nanstd(X, axis=0)
+    keep = np.isfinite(std) & (std > 0)  # constant / all-NaN columns have no correlation
+    X = (X[:, keep] - mean[keep]) / std[keep]
+    # missing cells sit at the column mean, i.e. contribute nothing to the dot product
+    np.nan_to_num(X, copy=False, nan=0.0)
+    return X, [c for c, k in zip(columns, keep) if k]
+
+
+def top_correlations(df, method="pearson", k=20, sample_rows=100_000, block_size=256, seed=42):
+    """Return the ``k`` most strongly correlated numeric column pairs.
+
+    Values come from a float32, mean-imputed sample, so they are for ranking;
+    use ``df[[a, b]].corr()`` when an exact coefficient is needed.
+    """
+    columns = df.select_dtypes(include="number").columns.tolist()
+    empty = pd.DataFrame(columns=["column_a", "column_b", "corr"])
+    if len(columns) < 2:
+        return empty
+
+    X, columns = _standardized_matrix(df, columns, method, sample_rows, seed)
+    n_rows, n_cols = X.shape
+    if n_cols < 2 or n_rows < 2:
+        return empty
+
+    best_vals = np.empty(0, dtype=np.float32)
+    best_i = np.empty(0, dtype=np.int64)
+    best_j = np.empty(0, dtype=np.int64)
+    for start_i in range(0, n_cols, block_size):
+        Xi = X[:, start_i:start_i + block_size]
+        for start_j in range(start_i, n_cols, block_size):
+            Xj = X[:, start_j:start_j + block_size]
+            C = (Xi.T @ Xj) / np.float32(n_rows)
+            if start_i == start_j:
+                # same block: only the strict upper triangle holds distinct pairs
+                C[np.tril_indices(C.shape[0], m=C.shape[1])] = 0.0
+            flat = np.abs(C).ravel()
+            take = min(k, flat.size)
+            idx = np.argpartition(flat, flat.size - take)[flat.size - take:]
+            rows, cols = np.unravel_index(idx, C.shape)
+
+            best_vals = np.concatenate([best_vals, C[rows, cols]])
+            best_i = np.concatenate([best_i, rows + start_i])
+            best_j = np.concatenate([best_j, cols + start_j])
+            if best_vals.size > k:
+                keep = np.argpartition(np.abs(best_vals), best_vals.size - k)[best_vals.size - k:]
+                best_vals, best_i, best_j = best_vals[keep], best_i[keep], best_j[keep]
+
+    order = np.argsort(-np.abs(best_vals))
+    pairs = pd.DataFrame({
+        "column_a": [columns[i] for i in best_i[order]],
+        "column_b": [columns[j] for j in best_j[order]],
+        "corr": np.clip(best_vals[order], -1.0, 1.0).astype(float).round(4),
+    })
+    return pairs[pairs["corr"] != 0].reset_index(drop=True)
+
+
+# ---------------- CATEGORICAL (CRAMÉR'S V) ----------------
+def cramers_v_pairs(df, k=20, max_levels=50, sample_rows=200_000, seed=42):
+    """Top ``k`` pairs of low-cardinality categorical columns by bias-corrected Cramér's V."""
+    data = df.select_dtypes(exclude="number")
+    if sample_rows and len(data) > sample_rows:
+        data = data.sample(n=sample_rows, random_state=seed)
+
+    codes = {}
+    for col in data.columns:
+        col_codes, uniques = pd.factorize(data[col], use_na_sentinel=True)
+        if 2 <= len(uniques) <= max_levels:
+            codes[col] = (col_codes, len(uniques))
+
+    names = list(codes)
+    results = []
+    for a_pos, a in enumerate(names):
+        codes_a, levels_a = codes[a]
+        for b in names[a_pos + 1:]:
+            codes_b, levels_b = codes[b]
+            valid = (codes_a >= 0) & (codes_b >= 0)
+            n = int(valid.sum())
+            if n < 2:
+                continue
+            table = np.bincount(codes_a[valid] * levels_b + codes_b[valid],
+                                minlength=levels_a * levels_b).reshape(levels_a, levels_b).astype(np.float64)
+            table = table[table.sum(axis=1) > 0][:, table.sum(axis=0) > 0]
+            r, c = table.shape
+            if r < 2 or c < 2:
+                continue
+            expected = table.sum(axis=1, keepdims=True) * table.sum(axis=0, keepdims=True) / n
+            chi2 = ((table - expected) ** 2 / expected).sum()
+            # Bergsma (2013) bias correction
+            phi2 = max(0.0, chi2 / n - (r - 1) * (c - 1) / (n - 1))
+            r_corr = r - (r - 1) ** 2 / (n - 1)
+            c_corr = c - (c - 1) ** 2 / (n - 1)
+            denom = min(r_corr - 1, c_corr - 1)
+            v = float(np.sqrt(phi2 / denom)) if denom > 0 else 0.0
+            results.append((a, b, round(v, 4)))
+
+    pairs = pd.DataFrame(results, columns=["column_a", "column_b", "corr"])
+    return pairs.sort_values("corr", ascending=False).head(k).reset_index(drop=True)
+
+
+def correlation_pairs(df, method="pearson", k=20, sample_rows=100_000):
+    if method == "cramers_v":
+        return cramers_v_pairs(df, k=k, sample_rows=sample_rows)
+    return top_correlations(df, method=method, k=k, sample_rows=sample_rows)
+
+
+# ---------------- CLUSTERS & HEATMAP ----------------
+def correlation_clusters(pairs, threshold=0.7):
+    """Group columns connected by pairs with ``|corr| >= threshold`` (union-find)."""
+    parent = {}
+
+    def find(x):
+        parent.setdefault(x, x)
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for a, b, value in pairs[["column_a", "column_b", "corr"]].itertuples(index=False):
+        if abs(value) >= threshold:
+            parent[find(a)] = find(b)
+
+    groups = {}
+    for col in list(parent):
+        groups.setdefault(find(col), []).append(col)
+    return sorted((sorted(g) for g in groups.values() if len(g) > 1), key=len, reverse=True)
+
+
+def subset_columns(pairs, max_columns=20):
+    """Columns appearing in the strongest pairs, in order of first appearance."""
+    cols = []
+    for a, b in pairs[["column_a", "column_b"]].itertuples(index=False):
+        for c in (a, b):
+            if c not in cols:
+                cols.append(c)
+        if len(cols) >= max_columns:
+            break
+    return cols[:max_columns]
+
+
+def subset_matrix(df, columns, method="pearson"):
+    """Exact correlation matrix for a small set of columns."""
+    if method == "cramers_v":
+        pairs = cramers_v_pairs(df[columns], k=len(columns) ** 2, max_levels=10**9)
+        matrix = pd.DataFrame(np.eye(len(columns)), index=columns, columns=columns)
+        for a, b, v in pairs.itertuples(index=False):
+            matrix.loc[a, b] = matrix.loc[b, a] = v
+        return matrix
+    return df[columns].corr(method=method)
+
+
+def cluster_order(matrix):
+    """Leaf order of an average-linkage clustering on ``1 - |corr|``."""
+    if len(matrix) < 3:
+        return list(matrix.columns)
+    from scipy.cluster.hierarchy import leaves_list, linkage
+    from scipy.spatial.distance import squareform
+
+    dist = 1.0 - matrix.abs().fillna(0).to_numpy()
+    np.fill_diagonal(dist, 0.0)
+    dist = np.clip((dist + dist.T) / 2, 0.0, None)
+    order = leaves_list(linkage(squareform(dist, checks=False), method="average"))
+    return [matrix.columns[i] for i in order]
+
+
+def clustered_heatmap(matrix, title=None, figsize=None, annot_max=12):
+    """Draw ``matrix`` reordered by :func:`cluster_order`; annotate only small matrices."""
+    import seaborn as sns
+    from matplotlib.figure import Figure
+
+    order = cluster_order(matrix)
+    matrix = matrix.loc[order, order]
+    n = len(order)
+    size = figsize or (min(4 + 0.35 * n, 14), min(3 + 0.3 * n, 12))
+    fig = Figure(figsize=size)
+    ax = fig.subplots()
+    center = None if (matrix.min().min() >= 0) else 0
+    sns.heatmap(matrix, cmap="coolwarm", center=center, annot=n <= annot_max, fmt=".2f",
+                square=n <= annot_max, ax=ax, cbar_kws={"shrink": 0.7})
+    if title:
+        ax.set_title(title)
+    return fig
@@ -0,0 +1,322 @@
+# app/dataset_diff.py
+"""What changed between two versions of the same table.
+
+Every row is reduced to a 64-bit hash (``pandas.util.hash_pandas_object``),
+and the two versions are matched by sorting hashes and binary search. Nothing
+is merged row against row, so two 10M-row extracts compare in seconds.
+
+* Without key columns, rows are compared by content: a row is *added* if no
+  identical row exists in the previous version, *removed* the other way round.
+* With key columns, rows are matched by key hash: *added* and *removed* are new
+  and missing keys, *changed* are matched keys whose other columns differ.
+
+``column_drift`` then compares the distribution of every shared column
+(population stability index over quantile or category bins, null rates,
+means), and ``drift_summary`` packs both into a small dict for the insights
+prompt. With 64-bit hashes the chance of any collision across 10M rows is
+about one in 400,000.
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_bool_dtype, is_datetime64_any_dtype, is_numeric_dtype
+
+from perf import span
+
+PSI_MODERATE = 0.1
+PSI_MAJOR = 0.25
+_EPS = 1e-4  # floor for bin shares, so empty bins do not blow PSI up to infinity
+
+
+# ---------- HASHING ----------
+def _comparable(old, new, columns):
+    """Cast columns whose dtype differs between versions to one dtype, so equal values hash equally."""
+    old_cast, new_cast = {}, {}
+    for col in columns:
+        a, b = old[col].dtype, new[col].dtype
+        if a == b:
+            continue
+        if is_numeric_dtype(a) and is_numeric_dtype(b):
+            old_cast[col], new_cast[col] = old[col].astype("float64"), new[col].astype("float64")
+        else:
+            old_cast[col], new_cast[col] = old[col].astype(str), new[col].astype(str)
+    return old[columns].assign(**old_cast), new[columns].assign(**new_cast)
+
+
+_MIX = np.uint64(0x100000001B3)  # FNV prime: chains column hashes in column order
+
+
+def _freeze(value):
+    """List / dict / set cells (e.g. from nested JSON) as JSON text, so they can be hashed."""
+    if isinstance(value, np.ndarray):
+        value = value.tolist()
+    if isinstance(value, (list, dict, set)):
+        return json.dumps(value, sort_keys=True, default=repr)
+    return value
+
+
+def _factorize(series, use_na_sentinel):
+    """``pd.factorize``, falling back to :func:`_freeze` for unhashable cells."""
+    try:
+        return pd.factorize(series, use_na_sentinel=use_na_sentinel)
+    except TypeError:
+        return pd.factorize(series.map(_freeze), use_na_sentinel=use_na_sentinel)
+
+
+def column_hash(series):
+    """One uint64 per value of ``series``."""
+    if is_numeric_dtype(series.dtype) or is_datetime64_any_dtype(series.dtype):
+        return pd.util.hash_pandas_object(series, index=False).to_numpy()
+    # hash each distinct value once: text columns usually repeat a few values many times
+    codes, uniques = _factorize(series, use_na_sentinel=False)
+    return pd.util.hash_pandas_object(pd.Series(uniques), index=False).to_numpy()[codes]
+
+
+def row_hashes(df):
+    """One uint64 per row over all columns of ``df`` (the index is ignored)."""
+    out = np.zeros(len(df), dtype=np.uint64)
+    for col in df.columns:
+        out *= _MIX
+        out ^= column_hash(df[col])
+    return out
+
+
+def _lookup(sorted_hashes, hashes, order):
+    """For each hash: whether it is in ``sorted_hashes`` and where.
+
+    ``order`` is an argsort of ``hashes``; searching in sorted order walks
+    ``sorted_hashes`` front to back instead of jumping around it at random,
+    which is several times faster on large arrays.
+    """
+    found = np.zeros(len(hashes), dtype=bool)
+    pos = np.zeros(len(hashes), dtype=np.int64)
+    if len(sorted_hashes):
+        queries = hashes[order]
+        at = np.minimum(np.searchsorted(sorted_hashes, queries), len(sorted_hashes) - 1)
+        found[order] = sorted_hashes[at] == queries
+        pos[order] = at
+    return found, pos
+
+
+def _check_unique(sorted_keys, label):
+    dupes = int(np.count_nonzero(sorted_keys[1:] == sorted_keys[:-1]))
+    if dupes:
+        raise ValueError(f"Key columns are not unique in the {label} version ({dupes:,} duplicate keys).")
+
+
+# ---------- DIFF ----------
+def diff_datasets(old, new, key_columns=None):
+    """Row-level diff of ``new`` against ``old``.
+
+    Returns a dict with row counts, ``added`` / ``removed`` / ``changed``
+    counts, positional indices of those rows (``added_rows`` and
+    ``changed_rows`` into ``new``, ``removed_rows`` into ``old``),
+    ``changed_by_column`` (changed cells per column, key mode only),
+    ``columns_added`` / ``columns_removed``, ``dtype_changes`` and ``drift``
+    (see :func:`column_drift`).
+    """
+    key_columns = list(key_columns or [])
+    shared = [c for c in new.columns if c in old.columns]
+    missing = [c for c in key_columns if c not in shared]
+    if missing:
+        raise ValueError(f"Key columns missing from one of the versions: {missing}")
+    old_cmp, new_cmp = _comparable(old, new, shared)
+
+    result = {
+        "rows_old": len(old),
+        "rows_new": len(new),
+        "key_columns": key_columns,
+        "columns_added": [c for c in new.columns if c not in old.columns],
+        "columns_removed": [c for c in old.columns if c not in new.columns],
+        "dtype_changes": {c: (str(old[c].dtype), str(new[c].dtype)) for c in shared if old[c].dtype != new[c].dtype},
+    }
+
+    with span("dataset_diff: rows"):
+        if key_columns:
+            result.update(_diff_by_key(old_cmp, new_cmp, key_columns))
+        else:
+            result.update(_diff_by_content(old_cmp, new_cmp))
+    with span("dataset_diff: drift"):
+        result["drift"] = column_drift(old, new, [c for c in shared if c not in key_columns])
+    return result
+
+
+def _diff_by_content(old, new):
+    h_old, h_new = row_hashes(old), row_hashes(new)
+    order_old, order_new = np.argsort(h_old), np.argsort(h_new)
+    in_old, _ = _lookup(h_old[order_old], h_new, order_new)
+    in_new, _ = _lookup(h_new[order_new], h_old, order_old)
+    added, removed = np.flatnonzero(~in_old), np.flatnonzero(~in_new)
+    return {
+        "added": len(added), "removed": len(removed), "changed": 0,
+        "added_rows": added, "removed_rows": removed, "changed_rows": np.array([], dtype=np.int64),
+        "changed_by_column": pd.Series(dtype="int64"),
+    }
+
+
+def _diff_by_key(old, new, key_columns):
+    value_columns = [c for c in new.columns if c not in key_columns]
+    k_old, k_new = row_hashes(old[key_columns]), row_hashes(new[key_columns])
+
+    order_old, order_new = np.argsort(k_old), np.argsort(k_new)
+    sorted_old, sorted_new = k_old[order_old], k_new[order_new]
+    _check_unique(sorted_old, "previous")
+    _check_unique(sorted_new, "new")
+
+    matched, pos = _lookup(sorted_old, k_new, order_new)
+    in_new, _ = _lookup(sorted_new, k_old, order_old)
+    new_idx = np.flatnonzero(matched)
+    old_idx = order_old[pos[new_idx]]
+
+    differs = row_hashes(old[value_columns])[old_idx] != row_hashes(new[value_columns])[new_idx]
+    changed_new, changed_old = new_idx[differs], old_idx[differs]
+    # per-column hashes only for the rows that differ
+    by_column = {
+        col: int(np.count_nonzero(column_hash(old[col].take(changed_old)) != column_hash(new[col].take(changed_new))))
+        for col in value_columns
+    }
+    added, removed = np.flatnonzero(~matched), np.flatnonzero(~in_new)
+    return {
+        "added": len(added), "removed": len(removed), "changed": len(changed_new),
+        "added_rows": added, "removed_rows": removed, "changed_rows": changed_new,
+        "changed_by_column": pd.Series(by_column, dtype="int64").sort_values(ascending=False),
+    }
+
+
+# ---------- DRIFT ----------
+def _as_float(series):
+    if is_datetime64_any_dtype(series.dtype):
+        if getattr(series.dt, "tz", None) is not None:
+            series = series.dt.tz_convert(None)
+        values = series.to_numpy(dtype="datetime64[s]")
+        out = values.astype(np.int64).astype(np.float64)
+        out[np.isnat(values)] = np.nan
+        return out
+    return series.to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def _kind(dtype):
+    if is_datetime64_any_dtype(dtype):
+        return "datetime"
+    return "numeric" if is_numeric_dtype(dtype) and not is_bool_dtype(dtype) else "categorical"
+
+
+def _psi(p_old, p_new):
+    p_old, p_new = np.maximum(p_old, _EPS), np.maximum(p_new, _EPS)
+    return float(np.sum((p_new - p_old) * np.log(p_new / p_old)))
+
+
+def _shares(counts):
+    total = counts.sum()
+    return counts / total if total else counts.astype(np.float64)
+
+
+def severity(psi):
+    if psi >= PSI_MAJOR:
+        return "major"
+    return "moderate" if psi >= PSI_MODERATE else "stable"
+
+
+def _numeric_drift(a, b, bins, idx_old, idx_new):
+    record = {"mean_old": np.nanmean(a) if len(a) else np.nan, "mean_new": np.nanmean(b) if len(b) else np.nan}
+    sample_old = a if idx_old is None else a[idx_old]
+    sample_new = b if idx_new is None else b[idx_new]
+    sample_old, sample_new = sample_old[~np.isnan(sample_old)], sample_new[~np.isnan(sample_new)]
+    if not len(sample_old):
+        record["psi"] = np.nan
+        return record
+    # decile bins of the previous version, so each starts with an equal share
+    edges = np.unique(np.quantile(sample_old, np.linspace(0, 1, bins + 1)[1:-1]))
+    counts_old = np.bincount(np.searchsorted(edges, sample_old, side="right"), minlength=len(edges) + 1)
+    counts_new = np.bincount(np.searchsorted(edges, sample_new, side="right"), minlength=len(edges) + 1)
+    record["psi"] = _psi(_shares(counts_old), _shares(counts_new))
+    return record
+
+
+def _value_counts(series):
+    # not Series.value_counts: it accepts list cells but returns an index that cannot be searched
+    codes, uniques = _factorize(series, use_na_sentinel=True)
+    counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+    return pd.Series(counts, index=uniques).sort_values(ascending=False, kind="stable")
+
+
+def _categorical_drift(a, b, top):
+    vc_old, vc_new = _value_counts(a), _value_counts(b)
+    # the most common categories of either version; everything else shares one "other" bin
+    cats = vc_old.index[:top].union(vc_new.index[:top])
+    counts_old = np.append(vc_old.reindex(cats, fill_value=0).to_numpy(), vc_old.drop(cats, errors="ignore").sum())
+    counts_new = np.append(vc_new.reindex(cats, fill_value=0).to_numpy(), vc_new.drop(cats, errors="ignore").sum())
+    p_old, p_new = _shares(counts_old), _shares(counts_new)
+    return {
+        "psi": _psi(p_old, p_new),
+        "tv_distance": float(0.5 * np.abs(p_new - p_old).sum()),
+        "new_categories": int((~vc_new.index.isin(vc_old.index)).sum()),
+    }
+
+
+def column_drift(old, new, columns, bins=10, top=20, sample_rows=1_000_000, seed=0):
+    """Distribution drift per column, largest PSI first.
+
+    Numeric and datetime columns are binned at the previous version's deciles,
+    and both versions are histogrammed from random samples of at most
+    ``sample_rows`` (PSI over ten bins barely moves beyond a few thousand rows).
+    Categorical columns count every value, keeping the ``top`` most common
+    plus an "other" bin. Null rates and means always use every row.
+    """
+    rng = np.random.default_rng(seed)
+    idx_old = rng.integers(0, len(old), size=sample_rows) if len(old) > sample_rows else None
+    idx_new = rng.integers(0, len(new), size=sample_rows) if len(new) > sample_rows else None
+    records = []
+    for col in columns:
+        a, b = old[col], new[col]
+        record = {
+            "column": col,
+            "null_rate_old": float(a.isna().mean()) if len(a) else 0.0,
+            "null_rate_new": float(b.isna().mean()) if len(b) else 0.0,
+        }
+        kind = _kind(a.dtype)
+        if kind != "categorical" and kind == _kind(b.dtype):
+            record["kind"] = kind
+            record.update(_numeric_drift(_as_float(a), _as_float(b), bins, idx_old, idx_new))
+            if kind == "datetime":
+                for m in ("mean_old", "mean_new"):
+                    record[m] = pd.to_datetime(record[m], unit="s")
+        else:
+            record["kind"] = "categorical"
+            record.update(_categorical_drift(a, b, top))
+        record["severity"] = severity(record["psi"]) if not np.isnan(record["psi"]) else "n/a"
+        records.append(record)
+    drift = pd.DataFrame(records, columns=["column", "kind", "psi", "severity", "null_rate_old", "null_rate_new",
+                                           "mean_old", "mean_new", "tv_distance", "new_categories"])
+    return drift.sort_values("psi", ascending=False, na_position="last", ignore_index=True)
+
+
+# ---------- PROMPT ----------
+def drift_summary(diff, max_columns=10):
+    """Compact, JSON-friendly summary of a diff for the insights prompt."""
+    drifted = diff["drift"][diff["drift"]["psi"] >= PSI_MODERATE].head(max_columns)
+    columns = {}
+    for _, r in drifted.iterrows():
+        entry = {"psi": round(float(r["psi"]), 3), "severity": r["severity"],
+                 "null_rate": [round(float(r["null_rate_old"]), 4), round(float(r["null_rate_new"]), 4)]}
+        if r["kind"] == "numeric":
+            entry["mean"] = [float(r["mean_old"]), float(r["mean_new"])]
+        elif r["kind"] == "datetime":
+            entry["mean"] = [str(r["mean_old"]), str(r["mean_new"])]
+        else:
+            entry["tv_distance"] = round(float(r["tv_distance"]), 3)
+            entry["new_categories"] = int(r["new_categories"])
+        columns[str(r["column"])] = entry
+    return {
+        "rows": [diff["rows_old"], diff["rows_new"]],
+        "added": diff["added"],
+        "removed": diff["removed"],
+        "changed": diff["changed"],
+        "key_columns": [str(c) for c in diff["key_columns"]],
+        "columns_added": [str(c) for c in diff["columns_added"]],
+        "columns_removed": [str(c) for c in diff["columns_removed"]],
+        "changed_by_column": {str(c): int(n) for c, n in diff["changed_by_column"].head(max_columns).items() if n},
+        "drifted_columns": columns,
+    }
@@ -0,0 +1,249 @@
+# app/dataset_store.py
+"""Process-wide store of loaded datasets, shared by every Streamlit session.
+
+Sessions hold a small :class:`DatasetHandle` in ``st.session_state`` instead
+of their own DataFrame. Identical uploads (same bytes) and identical derived
+frames (same parent, same operation) resolve to one shared frame, so a dozen
+analysts on one extract cost one copy, not a dozen. Frames are treated as
+immutable: code that needs a changed frame takes ``df.copy(deep=False)`` and
+replaces whole columns on it, never writing into cells, so the shared buffers
+are left alone with or without pandas copy-on-write.
+
+Entries are refcounted by their handles (``weakref.finalize``); when the last
+session lets go, the entry is dropped. When resident frames exceed
+``DATASET_STORE_MAX_MB``, the least recently used ones are spilled to an Arrow
+IPC file and re-read through a memory map on next access.
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+import weakref
+from collections import OrderedDict
+
+from perf import span
+
+DATASET_STORE_MAX_MB = float(os.environ.get("DATASET_STORE_MAX_MB", "2048"))
+DATASET_STORE_DIR = os.environ.get("DATASET_STORE_DIR",
+                                   os.path.join(tempfile.gettempdir(), "data2docs-datasets"))
+
+
+def content_key(file):
+    """Hash of an upload's bytes, read without copying the buffer."""
+    h = hashlib.blake2b(digest_size=16)
+    if hasattr(file, "getbuffer"):
+        with file.getbuffer() as buf:
+            h.update(buf)
+    else:
+        file.seek(0)
+        for block in iter(lambda: file.read(1 << 20), b""):
+            h.update(block)
+    file.seek(0)
+    return h.hexdigest()
+
+
+def frame_nbytes(df):
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+class _Entry:
+    def __init__(self, key, frame):
+        self.key = key
+        self.frame = frame
+        self.nbytes = frame_nbytes(frame)
+        self.spill_path = None
+        self.refs = 0
+        self.lock = threading.Lock()  # serializes spill/reload of this entry
+
+
+class DatasetHandle:
+    """A session's reference to a stored frame; cheap to keep in session state."""
+
+    def __init__(self, store, key):
+        self.store = store
+        self.key = key
+        weakref.finalize(self, store._release, key)
+
+    @property
+    def frame(self):
+        return self.store._frame(self.key)
+
+    def __repr__(self):
+        return f"DatasetHandle({self.key!r})"
+
+
+class DatasetStore:
+    def __init__(self, max_bytes, spill_dir):
+        self.max_bytes = max_bytes
+        self.spill_dir = spill_dir
+        self.entries = OrderedDict()  # LRU order: oldest first
+        self.lock = threading.Lock()
+
+    # ---------- public API ----------
+    def get_or_load(self, key, loader):
+        """Handle for ``key``, calling ``loader()`` only if no session has it yet."""
+        with self.lock:
+            if key in self.entries:
+                return self._handle(key)
+        frame = loader()
+        with self.lock:
+            if key not in self.entries:  # another session may have loaded it meanwhile
+                self.entries[key] = _Entry(key, frame)
+            handle = self._handle(key)
+        self._enforce_budget(keep=key)
+        return handle
+
+    def derive(self, parent, op_name, fn):
+        """Handle for ``fn(parent.frame)``, shared by every session applying ``op_name`` to the same parent."""
+        return self.get_or_load(f"{parent.key}:{op_name}", lambda: fn(parent.frame))
+
+    def stats(self):
+        with self.lock:
+            resident = [e for e in self.entries.values() if e.frame is not None]
+            return {
+                "datasets": len(self.entries),
+                "resident": len(resident),
+                "resident_mb": sum(e.nbytes for e in resident) / 1e6,
+                "budget_mb": self.max_bytes / 1e6,
+                "sessions": sum(e.refs for e in self.entries.values()),
+            }
+
+    # ---------- internals ----------
+    def _handle(self, key):
+        # caller holds self.lock
+        entry = self.entries[key]
+        entry.refs += 1
+        self.entries.move_to_end(key)
+        return DatasetHandle(self, key)
+
+    def _release(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return
+            entry.refs -= 1
+            if entry.refs > 0:
+                return
+            del self.entries[key]
+        if entry.spill_path:
+            try:
+                os.remove(entry.spill_path)
+            except OSError:
+                pass
+
+    def _frame(self, key):
+        with self.lock:
+            entry = self.entries[key]
+            self.entries.move_to_end(key)
+        with entry.lock:
+            if entry.frame is None:
+                with span(f"dataset_store: reload {key[:8]}"):
+                    entry.frame = _read_spill(entry.spill_path)
+            frame = entry.frame
+        self._enforce_budget(keep=key)
+        return frame
+
+    def _enforce_budget(self, keep):
+        with self.lock:
+            resident = [e for e in self.entries.values() if e.frame is not None]
+            total = sum(e.nbytes for e in resident)
+            victims = []
+            for entry in resident:  # least recently used first
+                if total <= self.max_bytes:
+                    break
+                if entry.key != keep:
+                    victims.append(entry)
+                    total -= entry.nbytes
+        for entry in victims:
+            self._spill(entry)
+
+    def _spill(self, entry):
+        with entry.lock:
+            if entry.frame is None:
+                return
+            if entry.spill_path is None:
+                path = os.path.join(self.spill_dir, entry.key.replace(":", "__") + ".arrow")
+                try:
+                    with span(f"dataset_store: spill {entry.key[:8]}"):
+                        _write_spill(entry.frame, path)
+                except Exception:
+                    return  # columns Arrow cannot represent: keep the frame resident
+                entry.spill_path = path
+            # frames are immutable, so a file written once stays valid
+            entry.frame = None
+
+
+def _write_spill(frame, path):
+    import pyarrow as pa
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    table = pa.Table.from_pandas(frame, preserve_index=True)
+    tmp = path + ".tmp"
+    with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp, path)
+
+
+def _read_spill(path):
+    import pyarrow as pa
+
+    # memory-mapped: numeric columns without nulls become views on the page cache
+    # (the map stays open for as long as the frame's buffers reference it)
+    table = pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+    return table.to_pandas(split_blocks=True)
+
+
+store = DatasetStore(int(DATASET_STORE_MAX_MB * 1024 * 1024), DATASET_STORE_DIR)
+
+
+# ---------------- PER-FRAME CACHE ----------------
+_derived = {}  # id(frame) -> {key: value}
+_derived_lock = threading.Lock()
+
+
+def _forget_frame(frame_id):
+    with _derived_lock:
+        _derived.pop(frame_id, None)
+
+
+def cached_on_frame(frame, key, compute):
+    """``compute()``, cached under ``key`` for as long as ``frame`` (a DataFrame or Series) lives.
+
+    Frames from the store are shared and immutable, so whatever is computed
+    from one stays valid for the object's lifetime and reruns reuse it. Callers
+    namespace ``key``, e.g. ``("rollups", ts_col, value_col)``.
+    """
+    with _derived_lock:
+        values = _derived.get(id(frame))
+        if values is not None and key in values:
+            return values[key]
+    value = compute()
+    with _derived_lock:
+        values = _derived.get(id(frame))
+        if values is None:
+            values = _derived[id(frame)] = {}
+            weakref.finalize(frame, _forget_frame, id(frame))
+        return values.setdefault(key, value)
+
+
+# ---------------- STREAMLIT GLUE ----------------
+def session_dataset(uploaded_file, loader, slot="dataset"):
+    """Handle for the session's current upload, hashing and parsing it only once.
+
+    ``slot`` names the session-state entry, so a session can hold more than
+    one upload (e.g. a previous version to compare against).
+    """
+    import streamlit as st
+
+    file_id = getattr(uploaded_file, "file_id", None) or uploaded_file.name
+    current = st.session_state.get(slot)
+    if current is not None and st.session_state.get(f"{slot}_file_id") == file_id:
+        return current, False
+
+    with span("dataset_store: hash upload"):
+        key = content_key(uploaded_file)
+    handle = store.get_or_load(key, lambda: loader(uploaded_file))
+    st.session_state[slot] = handle
+    st.session_state[f"{slot}_file_id"] = file_id
+    return handle, True
@@ -1,11 +1,14 @@
 # app/eda.py
 
-import pandas as pd
-import seaborn as sns
-import matplotlib.pyplot as plt
 import streamlit as st
 
+from perf import traced
 
+# matplotlib/seaborn are imported inside the plotting functions so that
+# importing this module (and starting the app) stays cheap.
+
+
+@traced()
 def show_basic_info(df):
     st.subheader("📌 Basic Info")
     st.write("**Shape:**", df.shape)
@@ -14,6 +17,7 @@ def show_basic_info(df):
     st.dataframe(df.dtypes)
 
 
+@traced()
 def show_missing_values(df):
     st.subheader("🔎 Missing Values")
     missing = df.isnull().sum()
@@ -25,40 +29,128 @@ def show_missing_values(df):
         st.success("✅ No missing values found!")
 
 
-from sklearn.impute import SimpleImputer
-
+@traced()
 def auto_handle_missing(df):
-    df_filled = df.copy()
+    """Auto-fill missing values with mode for categorical & median for numeric"""
+    from pandas.api.types import is_numeric_dtype
+
+    # unfilled columns stay shared with df; filled ones are replaced, not written in place
+    df_filled = df.copy(deep=False)
     for col in df.columns:
-        if df[col].dtype == "object":
-            df_filled[col] = df[col].fillna(df[col].mode()[0] if not df[col].mode().empty else "Unknown")
+        # not just dtype == "object": pandas may hold text in a dedicated string dtype
+        if not is_numeric_dtype(df[col]):
+            if df[col].isnull().sum() > 0:
+                mode_val = df[col].mode()[0] if not df[col].mode().empty else "Unknown"
+                df_filled[col] = df[col].fillna(mode_val)
         else:
-            df_filled[col] = df[col].fillna(df[col].median())
+            if df[col].isnull().sum() > 0:
+                df_filled[col] = df[col].fillna(df[col].median())
     return df_filled
 
 
-
+@traced()
 def show_summary_stats(df):
     st.subheader("📊 Summary Statistics")
     st.dataframe(df.describe())
 
 
+@traced()
+def show_outliers(df):
+    from outliers import METHODS, detect_outliers, isolation_forest
+
+    st.subheader("🚨 Outliers & Anomalies")
+    report = detect_outliers(df)
+    if report["columns"].empty:
+        st.info("No numerical columns to check for outliers.")
+        return
+
+    st.write("**Outliers per column:**")
+    counts = report["columns"][["column"] + [f"{m}_{s}" for m in METHODS for s in ("count", "pct")]]
+    st.dataframe(counts, hide_index=True)
+
+    method = st.selectbox("Rule for flagged rows", list(METHODS), format_func=METHODS.get, key="outlier_method")
+    flagged = report["rows"][method]
+    st.write(f"**{report['row_counts'][method]:,} of {report['n_rows']:,} rows** flagged by {METHODS[method]} "
+             "(rows outlying in the most columns first):")
+    st.dataframe(df.loc[flagged[:100]])
+
+    if st.checkbox("🌲 Find multivariate anomalies (Isolation Forest)", key="outlier_iforest"):
+        result = isolation_forest(df)
+        st.write(f"Scored {result['scored_rows']:,} rows: **{result['anomaly_pct']}%** look anomalous. "
+                 "Most anomalous:")
+        st.dataframe(df.loc[result["index"]].assign(anomaly_score=result["scores"]))
+
+
+@traced()
+def show_dataset_diff(diff, old, new):
+    from dataset_diff import PSI_MAJOR, PSI_MODERATE
+
+    st.subheader("🆚 Changes Since Previous Version")
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Rows", f"{diff['rows_new']:,}", f"{diff['rows_new'] - diff['rows_old']:+,}")
+    c2.metric("Added", f"{diff['added']:,}")
+    c3.metric("Removed", f"{diff['removed']:,}")
+    c4.metric("Changed", f"{diff['changed']:,}" if diff["key_columns"] else "–")
+    if not diff["key_columns"]:
+        st.caption("Rows are matched by content; pick key columns to see which rows changed.")
+
+    if diff["columns_added"] or diff["columns_removed"]:
+        st.write("**New columns:**", diff["columns_added"], "**Dropped columns:**", diff["columns_removed"])
+    if diff["dtype_changes"]:
+        st.write("**Type changes (previous → new):**", diff["dtype_changes"])
+    if diff["changed_by_column"].any():
+        st.write("**Changed cells per column:**")
+        st.dataframe(diff["changed_by_column"].rename("changed"))
+
+    for label, rows, frame in (("Added", diff["added_rows"], new), ("Removed", diff["removed_rows"], old),
+                               ("Changed", diff["changed_rows"], new)):
+        if len(rows):
+            st.write(f"**{label} rows** (first 100):")
+            st.dataframe(frame.iloc[rows[:100]])
+
+    st.write(f"**Distribution drift** (PSI ≥ {PSI_MAJOR} major, ≥ {PSI_MODERATE} moderate):")
+    st.dataframe(diff["drift"], hide_index=True)
+
+
+@traced()
 def show_correlation_heatmap(df):
-    st.subheader("📈 Correlation Heatmap")
-    numeric_df = df.select_dtypes(include='number')
-    if numeric_df.shape[1] < 2:
-        st.info("Not enough numerical columns for correlation heatmap.")
+    from correlation import (METHOD_LABELS, clustered_heatmap, correlation_clusters,
+                             correlation_pairs, subset_columns, subset_matrix)
+
+    st.subheader("📈 Correlation Analysis")
+    c1, c2, c3 = st.columns(3)
+    method = METHOD_LABELS[c1.selectbox("Method", list(METHOD_LABELS), key="corr_method")]
+    top_k = c2.slider("Top pairs", 5, 100, 20, key="corr_top_k")
+    threshold = c3.slider("Cluster threshold |r|", 0.3, 0.99, 0.7, key="corr_threshold")
+
+    pairs = correlation_pairs(df, method=method, k=top_k)
+    if pairs.empty:
+        kind = "categorical (2-50 levels)" if method == "cramers_v" else "numerical"
+        st.info(f"Not enough {kind} columns for correlation analysis.")
         return
 
-    corr = numeric_df.corr()
-    fig, ax = plt.subplots(figsize=(10, 6))
-    sns.heatmap(corr, annot=True, cmap='coolwarm', ax=ax)
+    st.write("**Strongest pairs:**")
+    st.dataframe(pairs, hide_index=True)
+
+    clusters = correlation_clusters(pairs, threshold)
+    if clusters:
+        st.write(f"**Clusters of columns with |r| ≥ {threshold:.2f}:**")
+        for i, cluster in enumerate(clusters, 1):
+            st.write(f"{i}. " + ", ".join(map(str, cluster)))
+
+    columns = subset_columns(pairs)
+    fig = clustered_heatmap(subset_matrix(df, columns, method),
+                            title=f"{len(columns)} most correlated columns")
     st.pyplot(fig)
 
 
 
 
+@traced()
 def show_custom_plot(df):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
     st.subheader("🛠️ Custom Chart Builder")
 
     numeric_cols = df.select_dtypes(include='number').columns.tolist()
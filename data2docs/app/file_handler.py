@@ -1,16 +1,309 @@
 # app/file_handler.py
 
-import pandas as pd
+import codecs
 import json
 
+import pandas as pd
+
+from perf import traced
+
+JSON_READ_SIZE = 1 << 20      # bytes pulled from the upload per read
+JSON_CHUNK_ROWS = 50_000      # records buffered before they become a typed frame chunk
+DATETIME_SAMPLE = 1_000       # non-null values tried when guessing if a text column holds dates
+DATETIME_MIN_MATCH = 0.95     # share of the sample that must parse with the guessed format
+
+
+@traced("load_data")
 def load_data(file):
     if file.name.endswith('.csv'):
-        return pd.read_csv(file)
+        df = pd.read_csv(file)
     elif file.name.endswith('.xlsx'):
-        return pd.read_excel(file, engine='openpyxl')
-    elif file.name.endswith('.json'):
-        content = file.read().decode('utf-8')
-        data = json.loads(content)
-        return pd.json_normalize(data)
+        df = pd.read_excel(file, engine='openpyxl')
+    elif file.name.endswith(('.json', '.ndjson', '.jsonl')):
+        # NDJSON is one record per line: never look for a {"data": [...]} wrapper in it
+        df = read_json_stream(file, unwrap=file.name.endswith('.json'))
     else:
         raise ValueError("Unsupported file format. Please upload CSV, Excel, or JSON.")
+    return parse_datetime_columns(df)
+
+
+# ---------------- DATETIME DETECTION ----------------
+def _guess_date_format(sample):
+    from pandas.tseries.api import guess_datetime_format
+
+    fmt = guess_datetime_format(str(sample.iloc[0]))
+    # a full date at least: "2023" or "10:15" alone are not timestamps
+    if not fmt or not all(code in fmt for code in ("%m", "%d")) or not ("%Y" in fmt or "%y" in fmt):
+        return None
+    parsed = pd.to_datetime(sample, format=fmt, errors="coerce")
+    return fmt if parsed.notna().mean() >= DATETIME_MIN_MATCH else None
+
+
+def parse_datetime_columns(df):
+    """Convert text columns that hold timestamps to datetime64.
+
+    The format is guessed from the first value and checked on a sample, so
+    the full column is parsed once with an explicit format (fast) and free
+    text is never run through the slow per-value parser. A column is only
+    replaced when every non-null value parses; one "pending" or "n/a" keeps
+    the whole column as text rather than silently turning it into NaT.
+    """
+    converted = {}
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_numeric_dtype(series) or pd.api.types.is_datetime64_any_dtype(series):
+            continue
+        if pd.api.types.is_bool_dtype(series):
+            continue
+        sample = series.dropna().head(DATETIME_SAMPLE)
+        if sample.empty or not all(isinstance(v, str) for v in sample.head(20)):
+            continue
+        fmt = _guess_date_format(sample)
+        if fmt:
+            parsed = pd.to_datetime(series, format=fmt, errors="coerce")
+            if parsed.notna().sum() == series.notna().sum():
+                converted[col] = parsed
+    return df.assign(**converted) if converted else df
+
+
+# ---------------- STREAMING JSON ----------------
+_WS = " \t\r\n\ufeff"
+
+
+class _TooLarge(Exception):
+    pass
+
+
+class _JsonReader:
+    """Incrementally decoded upload with a cursor; values are decoded one at a time."""
+
+    def __init__(self, file, read_size):
+        self.file = file
+        self.read_size = read_size
+        self.decoder = json.JSONDecoder()
+        self.utf8 = codecs.getincrementaldecoder("utf-8")()
+        self.buf, self.pos, self.eof = "", 0, False
+
+    def fill(self, size):
+        raw = self.file.read(size)
+        if not raw:
+            self.eof = True
+            self.buf = self.buf[self.pos:] + self.utf8.decode(b"", final=True)
+        else:
+            self.buf = self.buf[self.pos:] + (raw if isinstance(raw, str) else self.utf8.decode(raw))
+        self.pos = 0
+
+    def peek(self, skip=_WS):
+        """Next character after ``skip`` characters, or "" at the end of the upload."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in skip:
+                self.pos += 1
+            if self.pos < len(self.buf) or self.eof:
+                return self.buf[self.pos] if self.pos < len(self.buf) else ""
+            self.fill(self.read_size)
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise json.JSONDecodeError(f"Expecting {char!r}", self.buf, self.pos)
+        self.pos += 1
+
+    def decode(self, max_chars=None):
+        """Decode the value at the cursor; ``_TooLarge`` once it needs more than ``max_chars`` buffered."""
+        size = self.read_size
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+                if max_chars is not None and len(self.buf) - self.pos > max_chars:
+                    raise _TooLarge()
+                self.fill(size)
+                size *= 2  # large records: grow reads so retries stay linear
+                continue
+            # a number or literal that ends at the buffer edge may be truncated
+            if end == len(self.buf) and not self.eof and not isinstance(value, (dict, list, str)):
+                self.fill(size)
+                continue
+            self.pos = end
+            return value
+
+
+def _iter_array(reader):
+    """Elements of the array whose ``[`` was just consumed, decoded one by one."""
+    while True:
+        char = reader.peek(_WS + ",")
+        if char == "]":
+            reader.pos += 1
+            return
+        if not char:
+            raise json.JSONDecodeError("Unterminated array", reader.buf, reader.pos)
+        yield reader.decode()
+
+
+def _records_member(record):
+    """The first member holding a list that starts with an object: the records of a
+    ``{"data": [...]}`` wrapper. The same rule :func:`_iter_wrapper` streams by."""
+    for value in record.values():
+        if isinstance(value, list) and value and isinstance(value[0], dict):
+            return value
+    return None
+
+
+def _iter_wrapper(reader):
+    """Stream a top-level object too large to decode whole, member by member.
+
+    The first member whose array starts with an object is yielded record by
+    record; other members are decoded and dropped. An object with no such
+    member is yielded as a single record, as a small one would be.
+    """
+    reader.expect("{")
+    record, streamed = {}, False
+    while True:
+        char = reader.peek(_WS + ",")
+        if char == "}":
+            reader.pos += 1
+            break
+        key = reader.decode()
+        reader.expect(":")
+        if reader.peek() == "[" and not streamed:
+            reader.pos += 1
+            if reader.peek() == "{":
+                streamed = True
+                yield from _iter_array(reader)
+            else:
+                record[key] = list(_iter_array(reader))
+        else:
+            record[key] = reader.decode()
+    if not streamed:
+        yield record
+
+
+def iter_json_records(file, read_size=JSON_READ_SIZE, unwrap=True):
+    """Yield top-level records from a JSON array, a ``{"data": [...]}`` wrapper,
+    a single JSON value or NDJSON, decoding the upload incrementally instead of
+    reading it into one string. With ``unwrap=False`` the upload is read as NDJSON
+    only: every top-level object is one record, whatever its size."""
+    reader = _JsonReader(file, read_size)
+    first = reader.peek()
+    if not first:
+        return
+    if first == "[" and unwrap:
+        reader.pos += 1
+        yield from _iter_array(reader)
+        return
+
+    if first == "{" and unwrap:
+        # an NDJSON line or a small document decodes within a read or two; anything
+        # bigger is one large object, almost always a wrapper around the records
+        try:
+            record = reader.decode(max_chars=2 * read_size)
+        except _TooLarge:
+            # a large first NDJSON line comes out as one record; later lines follow below
+            yield from _iter_wrapper(reader)
+        else:
+            if not reader.peek(_WS + ","):
+                # the whole document was this one object
+                yield from _records_member(record) or [record]
+                return
+            yield record
+
+    while reader.peek(_WS + ","):
+        record = reader.decode()
+        if isinstance(record, list):
+            # a bare top-level array inside NDJSON
+            yield from record
+        else:
+            yield record
+
+
+def _flatten_into(record, prefix, sep, out):
+    for key, value in record.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            # an empty object adds no column, as in json_normalize
+            _flatten_into(value, f"{path}{sep}", sep, out)
+        else:
+            out[path] = value
+
+
+_MISSING = float("nan")
+
+
+class _ColumnBuffers:
+    """Column-wise record buffer that tolerates ragged and evolving schemas."""
+
+    def __init__(self):
+        self.columns = {}
+        self.rows = 0
+
+    def append(self, flat):
+        rows = self.rows
+        for path, value in flat.items():
+            col = self.columns.get(path)
+            if col is None:
+                col = self.columns[path] = []
+            if len(col) < rows:
+                # column missing from earlier records (or first seen mid-chunk); NaN like
+                # json_normalize, so a missing key and an explicit null stay distinguishable
+                col.extend([_MISSING] * (rows - len(col)))
+            col.append(value)
+        self.rows = rows + 1
+
+    def flush(self):
+        for col in self.columns.values():
+            if len(col) < self.rows:
+                col.extend([_MISSING] * (self.rows - len(col)))
+        frame = pd.DataFrame(self.columns)
+        self.columns, self.rows = {}, 0
+        return frame
+
+
+def read_json_stream(file, sep=".", chunk_rows=JSON_CHUNK_ROWS, read_size=JSON_READ_SIZE, unwrap=True):
+    """Load JSON / NDJSON records into a flat DataFrame chunk by chunk.
+
+    Nested objects are flattened into ``a.b.c`` columns like ``pd.json_normalize``;
+    lists are kept as cell values. Each chunk is materialized into typed columns
+    as soon as it fills up, so only one chunk of Python objects is alive at a time.
+    At the end each column's pieces are joined and released before the next
+    column, so peak memory stays close to the final frame rather than twice it.
+    ``unwrap=False`` reads NDJSON strictly; see :func:`iter_json_records`.
+    """
+    buffers = _ColumnBuffers()
+    pieces = {}  # column -> {chunk number: typed Series}, in first-seen order
+    lengths = []
+
+    def flush():
+        rows = buffers.rows
+        chunk = buffers.flush()
+        for col in chunk.columns:
+            pieces.setdefault(col, {})[len(lengths)] = chunk[col]
+        lengths.append(rows)
+
+    for record in iter_json_records(file, read_size=read_size, unwrap=unwrap):
+        flat = {}
+        if isinstance(record, dict):
+            _flatten_into(record, "", sep, flat)
+        else:
+            flat[0] = record  # scalar records, same column name json_normalize uses
+        buffers.append(flat)
+        if buffers.rows >= chunk_rows:
+            flush()
+    if buffers.rows or not lengths:
+        flush()
+
+    columns = {}
+    for col in list(pieces):
+        parts = pieces.pop(col)
+        if len(parts) == 1 and len(lengths) == 1:
+            columns[col] = parts[0]
+            continue
+        # chunks without the column contribute missing values, as concat of the frames would
+        column = pd.concat([parts.get(i, pd.Series(_MISSING, index=range(n)))
+                            for i, n in enumerate(lengths)], ignore_index=True)
+        del parts
+        if column.dtype == object:
+            # chunks are typed apart; an all-null chunk is object and drags the join with it
+            column = column.infer_objects()
+        columns[col] = column
+    return pd.DataFrame(columns, index=pd.RangeIndex(sum(lengths)), copy=False)
@@ -1,36 +1,34 @@
-import os
-import streamlit as st
-from openai import OpenAI
-
-# Set up Groq endpoint and API key
-groq_api_key = os.getenv("GROQ_API_KEY") or st.secrets["api_keys"]["groq"]
-
-client = OpenAI(
-    api_key=groq_api_key,
-    base_url="https://api.groq.com/openai/v1",  # Groq's endpoint
-)
-
-def generate_insights(df):
-    try:
-        user_message = f"""You are a data analyst AI that explains datasets in simple terms.
-Here is a preview of my data:
-{df.head().to_string(index=False)}
-
-Please provide insights and observations based on this dataset."""
-
-        response = client.chat.completions.create(
-            model="llama3-70b-8192",  # or another model Groq supports
-            messages=[
-                {"role": "system", "content": "You are a helpful data analysis assistant."},
-                {"role": "user", "content": user_message}
-            ],
-            max_tokens=500,
-            temperature=0.7
-        )
-
-        result = response.choices[0].message.content
-        st.subheader("🧠 AI-Generated Insights")
-        st.markdown(result.strip())
-
-    except Exception as e:
-        st.error(f"❌ Failed to generate insights:\n\n{e}")
+# app/insights.py
+
+import json
+
+# shares the process-wide gateway (coalescing, rate limits, 429 backoff)
+from chat_with_groq import chat_with_groq
+
+MAX_STATS_COLUMNS = 40  # wide frames: describe() of every column would blow the token budget
+
+
+def insights_messages(df, drift=None):
+    """Prompt for the "Generate Insights" button: summary stats, outliers and drift since the last upload."""
+    from outliers import detect_outliers, outlier_summary
+
+    stats = df.iloc[:, :MAX_STATS_COLUMNS].describe(include="all").T
+    user_message = f"""You are a data analyst AI that explains datasets in simple terms.
+My data has {len(df):,} rows and {df.shape[1]} columns. Summary statistics:
+{stats.to_string(max_colwidth=40)}
+
+Outliers:
+{json.dumps(outlier_summary(detect_outliers(df)), default=str)}
+"""
+    if drift:
+        user_message += f"\nChanges since the previous upload:\n{json.dumps(drift, default=str)}\n"
+    user_message += "\nPlease provide insights and observations based on this dataset."
+    return [
+        {"role": "system", "content": "You are a helpful data analysis assistant."},
+        {"role": "user", "content": user_message},
+    ]
+
+
+def generate_insights(df, drift=None, user=None):
+    """Insight text; raises ``LLMError`` (``RateLimited`` when the gateway queue is full)."""
+    return chat_with_groq(insights_messages(df, drift), user=user, max_tokens=500).strip()
@@ -0,0 +1,212 @@
+# app/llm_gateway.py
+"""One choke point between the app and the LLM provider.
+
+* **Singleflight** - identical requests from the same user that are already
+  in flight (a double-clicked button, two tabs asking the same thing) share
+  one provider call and all get its reply. The user is part of the key, so
+  one user's exhausted bucket never fails another user's request.
+* **Token buckets** - every call is charged its estimated tokens against the
+  caller's bucket and a global one. Callers over budget wait their turn (up
+  to ``LLM_MAX_QUEUE_WAIT`` seconds) instead of firing into a 429.
+* **Backoff** - provider 429s honour ``Retry-After`` (plus jitter) and pause
+  the global bucket so queued callers do not pile on; a ``Retry-After`` longer
+  than ``max_delay`` fails fast with :class:`RateLimited` instead of blocking
+  the caller. 5xx and connection errors retry with full-jitter exponential
+  backoff.
+
+The gateway is provider-agnostic: it takes a ``send(messages, **params)``
+callable and recognises errors by their ``status_code``/``response`` like the
+OpenAI SDK raises them.
+"""
+
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+
+
+class LLMError(Exception):
+    """The provider could not produce a reply."""
+
+
+class RateLimited(LLMError):
+    """The request would have to queue longer than the gateway allows."""
+
+
+def estimate_tokens(messages, max_tokens=0):
+    # ~4 characters per token for English text, plus the reply budget
+    chars = sum(len(str(m.get("content", ""))) for m in messages)
+    return chars // 4 + len(messages) * 4 + (max_tokens or 0)
+
+
+# ---------------- TOKEN BUCKET ----------------
+class TokenBucket:
+    """Refills ``rate`` tokens per second up to ``capacity``.
+
+    ``reserve`` takes the tokens immediately, letting the balance go
+    negative, and returns how long the caller must wait before using them.
+    Later callers see the debt, so waiting requests are served in arrival order.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount):
+        amount = min(amount, self.capacity)  # an oversized request must still fit eventually
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= amount
+            return max(0.0, -self.tokens / self.rate)
+
+    def refund(self, amount):
+        with self.lock:
+            self.tokens = min(self.capacity, self.tokens + min(amount, self.capacity))
+
+    def pause(self, seconds):
+        """Hold back new reservations for ``seconds`` (provider said Retry-After)."""
+        with self.lock:
+            self._refill(time.monotonic())
+            self.tokens = min(self.tokens, -seconds * self.rate)
+
+
+# ---------------- GATEWAY ----------------
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+def _status_and_retry_after(exc):
+    status = getattr(exc, "status_code", None)
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    retry_after = None
+    try:
+        retry_after = float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        pass
+    return status, retry_after
+
+
+def _is_transient(exc, status):
+    if status is not None:
+        return status == 429 or status >= 500
+    # the SDK's connection/timeout errors carry no status code
+    return isinstance(exc, (ConnectionError, TimeoutError)) or type(exc).__name__ in (
+        "APIConnectionError", "APITimeoutError")
+
+
+class LLMGateway:
+    def __init__(self, send, user_tokens_per_min=6_000, global_tokens_per_min=30_000,
+                 max_queue_wait=30.0, max_retries=4, base_delay=0.5, max_delay=20.0):
+        self.send = send
+        self.user_rate = user_tokens_per_min / 60.0
+        self.user_capacity = user_tokens_per_min
+        self.global_bucket = TokenBucket(global_tokens_per_min / 60.0, global_tokens_per_min)
+        self.max_queue_wait = max_queue_wait
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.user_buckets = {}
+        self.in_flight = {}
+        self.lock = threading.Lock()
+        self.stats = {"calls": 0, "coalesced": 0, "retries": 0, "queued_s": 0.0}
+
+    def _user_bucket(self, user):
+        with self.lock:
+            bucket = self.user_buckets.get(user)
+            if bucket is None:
+                bucket = self.user_buckets[user] = TokenBucket(self.user_rate, self.user_capacity)
+            return bucket
+
+    def complete(self, messages, user=None, **params):
+        """Reply text for ``messages``; raises :class:`LLMError` on failure."""
+        key = hashlib.sha256(json.dumps([user, messages, params], sort_keys=True,
+                                        default=str).encode("utf-8")).hexdigest()
+        with self.lock:
+            call = self.in_flight.get(key)
+            leader = call is None
+            if leader:
+                call = self.in_flight[key] = _Call()
+            else:
+                self.stats["coalesced"] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self._call(messages, user, params)
+        except LLMError as e:
+            call.error = e
+            raise
+        except Exception as e:
+            call.error = LLMError(str(e))
+            raise call.error from e
+        finally:
+            with self.lock:
+                self.in_flight.pop(key, None)
+            call.done.set()
+        return call.result
+
+    def _acquire(self, user, tokens):
+        user_bucket = self._user_bucket(user or "anonymous")
+        wait = max(user_bucket.reserve(tokens), self.global_bucket.reserve(tokens))
+        if wait > self.max_queue_wait:
+            user_bucket.refund(tokens)
+            self.global_bucket.refund(tokens)
+            raise RateLimited(f"LLM is busy; try again in {wait:.0f}s")
+        if wait:
+            with self.lock:
+                self.stats["queued_s"] += wait
+            time.sleep(wait)
+
+    def _call(self, messages, user, params):
+        self._acquire(user, estimate_tokens(messages, params.get("max_tokens")))
+        for attempt in range(self.max_retries + 1):
+            try:
+                with self.lock:
+                    self.stats["calls"] += 1
+                return self.send(messages, **params)
+            except Exception as e:
+                status, retry_after = _status_and_retry_after(e)
+                if not _is_transient(e, status) or attempt == self.max_retries:
+                    raise LLMError(str(e)) from e
+
+                if retry_after is not None:
+                    # the provider told us when; everyone else should hold off too
+                    self.global_bucket.pause(retry_after)
+                    if retry_after > self.max_delay:
+                        raise RateLimited(f"LLM provider is rate limiting; try again in {retry_after:.0f}s") from e
+                    delay = min(self.max_delay, retry_after + random.uniform(0, min(1.0, retry_after * 0.25)))
+                else:
+                    delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+                with self.lock:
+                    self.stats["retries"] += 1
+                time.sleep(delay)
+
+
+def gateway_from_env(send):
+    """Gateway configured by LLM_USER_TOKENS_PER_MIN, LLM_GLOBAL_TOKENS_PER_MIN,
+    LLM_MAX_QUEUE_WAIT (seconds) and LLM_MAX_RETRIES."""
+    return LLMGateway(
+        send,
+        user_tokens_per_min=int(os.getenv("LLM_USER_TOKENS_PER_MIN", "6000")),
+        global_tokens_per_min=int(os.getenv("LLM_GLOBAL_TOKENS_PER_MIN", "30000")),
+        max_queue_wait=float(os.getenv("LLM_MAX_QUEUE_WAIT", "30")),
+        max_retries=int(os.getenv("LLM_MAX_RETRIES", "4")),
+    )
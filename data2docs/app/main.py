@@ -1,53 +1,43 @@
 import os
+import sys
+
 import streamlit as st
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-import requests
-from file_handler import load_data
+
+# shared/ holds the modules app and backend both use (the model registry layout). Streamlit
+# puts this script's directory on the path; the entry script adds shared/ next to it.
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "shared"))
+
+# Feature modules are cheap to import; each one loads pandas, matplotlib,
+# seaborn, scikit-learn or requests the first time it is actually used.
+from api import post, safe_json, auth_headers
 from eda import (
     show_basic_info,
     show_missing_values,
+    auto_handle_missing,
     show_summary_stats,
+    show_outliers,
+    show_dataset_diff,
     show_correlation_heatmap,
     show_custom_plot
 )
-# ---------------- CONFIG ----------------
-# API_URL = "http://127.0.0.1:5000/api"  # Local testing
-API_URL = "https://ai-data-reporter.onrender.com/api"  # For deployment
+from charts import chart_options, render_chart
+from automl import show_automl
+from chat import show_chat
+from perf import start_run, render_perf_panel
+
+start_run()
 
 st.set_page_config(page_title="Data2Docs - Vijendra", layout="wide")
 st.title("📊 Data2Docs – AI Report Generator (by **Vijendra**)")
 
 # ---------------- SESSION STATE ----------------
-for key in ["token", "user", "stats", "insights", "df_clean"]:
+SESSION_KEYS = ["token", "user", "stats", "insights", "df_clean", "dataset", "dataset_file_id",
+                "baseline", "baseline_file_id", "dataset_diff", "drift", "automl_results", "automl_run"]
+for key in SESSION_KEYS:
     if key not in st.session_state:
         st.session_state[key] = None
 
 
-# ---------------- HELPERS ----------------
-def safe_json(res):
-    try:
-        return res.json()
-    ##
-    except Exception:
-        return {}
-
-
-def auto_handle_missing(df: pd.DataFrame) -> pd.DataFrame:
-    """Auto-fill missing values with mode for categorical & median for numeric"""
-    df_filled = df.copy()
-    for col in df.columns:
-        if df[col].dtype == "object":
-            if df[col].isnull().sum() > 0:
-                mode_val = df[col].mode()[0] if not df[col].mode().empty else "Unknown"
-                df_filled[col] = df[col].fillna(mode_val)
-        else:
-            if df[col].isnull().sum() > 0:
-                df_filled[col] = df[col].fillna(df[col].median())
-    return df_filled
-
-
 # ---------------- SIDEBAR: LOGIN / SIGNUP ----------------
 st.sidebar.title("🔐 Account")
 
@@ -62,7 +52,7 @@ if not st.session_state.token:
 
             if submitted:
                 try:
-                    res = requests.post(f"{API_URL}/signup", json={
+                    res = post("/signup", json={
                         "username": su_username,
                         "password": su_password
                     })
@@ -81,7 +71,7 @@ if not st.session_state.token:
 
             if login_clicked:
                 try:
-                    res = requests.post(f"{API_URL}/login", json={
+                    res = post("/login", json={
                         "username": li_username,
                         "password": li_password
                     })
@@ -98,7 +88,7 @@ if not st.session_state.token:
 else:
     st.sidebar.markdown(f"👤 **Logged in as:** {st.session_state.user}")
     if st.sidebar.button("Logout"):
-        for key in ["token", "user", "stats", "insights", "df_clean"]:
+        for key in SESSION_KEYS:
             st.session_state[key] = None
         st.rerun()
 
@@ -107,13 +97,22 @@ if not st.session_state.token:
     st.info("Please sign up or log in from the sidebar to continue.")
     st.stop()
 
-st.markdown("Upload a **CSV**, **Excel**, or **JSON** file to begin:")
-uploaded_file = st.file_uploader("📁 Choose a file", type=["csv", "xlsx", "json"])
+st.markdown("Upload a **CSV**, **Excel**, **JSON** or **NDJSON** file to begin:")
+uploaded_file = st.file_uploader("📁 Choose a file", type=["csv", "xlsx", "json", "ndjson", "jsonl"])
 df = None
 
 if uploaded_file:
     try:
-        df = load_data(uploaded_file)
+        from file_handler import load_data
+        from dataset_store import session_dataset
+
+        # one shared, immutable frame per distinct upload; parsed once, not on every rerun
+        dataset, is_new = session_dataset(uploaded_file, load_data)
+        if is_new:
+            st.session_state.df_clean = None  # cleaned data belonged to the previous file
+            st.session_state.drift = None
+            st.session_state.automl_results = None
+        df = dataset.frame
         st.success(f"✅ File loaded successfully! Shape: {df.shape}")
         st.subheader("🔍 Data Preview")
         st.dataframe(df.head())
@@ -132,8 +131,10 @@ if uploaded_file:
                 show_missing_values(df)
 
             if st.button("⚡ Auto Handle Missing Values"):
-                df_clean = auto_handle_missing(df)
-                st.session_state.df_clean = df_clean
+                from dataset_store import store
+
+                st.session_state.df_clean = store.derive(dataset, "auto_handle_missing", auto_handle_missing)
+                df_clean = st.session_state.df_clean.frame
                 st.success("✅ Missing values handled automatically!")
                 st.dataframe(df_clean.head())
                 st.download_button(
@@ -148,6 +149,39 @@ if uploaded_file:
             if st.checkbox("View Summary Stats"):
                 show_summary_stats(df)
 
+        # Outliers
+        with st.expander("🚨 Outliers & Anomalies"):
+            if st.checkbox("Detect Outliers"):
+                show_outliers(df)
+
+        # Compare with a previous upload of the same table
+        with st.expander("🆚 Compare with Previous Version"):
+            baseline_file = st.file_uploader("📁 Previous version", type=["csv", "xlsx", "json", "ndjson", "jsonl"],
+                                             key="baseline_upload")
+            if baseline_file:
+                from dataset_diff import diff_datasets, drift_summary
+
+                baseline, _ = session_dataset(baseline_file, load_data, slot="baseline")
+                df_old = baseline.frame
+                shared = [c for c in df.columns if c in df_old.columns]
+                key_cols = st.multiselect("🔑 Key columns (optional, must be unique per row)", shared,
+                                          key="diff_keys")
+                if st.checkbox("Compare Versions"):
+                    # the diff of 10M-row files takes seconds; keep it across reruns
+                    diff_key = (baseline.key, dataset.key, tuple(key_cols))
+                    cached = st.session_state.dataset_diff
+                    if cached is None or cached[0] != diff_key:
+                        with st.spinner("🔍 Comparing versions..."):
+                            try:
+                                cached = (diff_key, diff_datasets(df_old, df, key_cols))
+                            except (ValueError, TypeError) as e:
+                                cached = None
+                                st.error(f"❌ {e}")
+                        st.session_state.dataset_diff = cached
+                    if cached is not None:
+                        show_dataset_diff(cached[1], df_old, df)
+                        st.session_state.drift = drift_summary(cached[1])
+
         # Correlation Heatmap
         with st.expander("🔥 Correlation Heatmap"):
             if st.checkbox("Show Correlation Heatmap"):
@@ -161,29 +195,23 @@ if uploaded_file:
         # AI Insights
         with st.expander("🧠 Generate AI Insights with Groq"):
             if st.button("Generate Insights"):
-                headers = {"Authorization": f"Bearer {st.session_state.token}"}
                 with st.spinner("🤖 Generating AI insights..."):
                     try:
-                        res = requests.post(
-                            f"{API_URL}/insights",
-                            json={"stats": df.describe(include='all').to_dict()},
-                            headers=headers
-                        )
-                        data = safe_json(res)
-                        if res.status_code == 200:
-                            st.session_state.insights = data["insights"]
-                            st.markdown("### 💡 AI Insights")
-                            st.markdown(st.session_state.insights)
-                        else:
-                            st.error(data.get("error", "Failed to generate insights"))
+                        # through the LLM gateway: a double click or a second tab shares one provider call
+                        from insights import generate_insights
+
+                        st.session_state.insights = generate_insights(df, st.session_state.drift,
+                                                                      user=st.session_state.user)
+                        st.markdown("### 💡 AI Insights")
+                        st.markdown(st.session_state.insights)
                     except Exception as e:
-                        st.error(f"⚠️ Could not reach backend: {e}")
+                        st.error(f"❌ Failed to generate insights: {e}")
 
             if st.session_state.insights and st.button("📄 Download PDF Report"):
                 with st.spinner("📦 Generating PDF..."):
-                    headers = {"Authorization": f"Bearer {st.session_state.token}"}
+                    headers = auth_headers()
                     try:
-                        res = requests.post(f"{API_URL}/export", json={"insights": st.session_state.insights}, headers=headers)
+                        res = post("/export", json={"insights": st.session_state.insights}, headers=headers)
                         data = safe_json(res)
                         pdf_path = data.get("pdf_path")
                         if res.status_code == 200 and pdf_path:
@@ -209,120 +237,11 @@ else:
 st.header("📊 Interactive Dashboard")
 
 # Use cleaned data if available, else raw
-data_for_viz = st.session_state.df_clean if st.session_state.df_clean is not None else df
+data_for_viz = st.session_state.df_clean.frame if st.session_state.df_clean is not None else df
 
 if data_for_viz is None:
     st.info("Upload a file (and optionally clean it) to use the dashboard.")
 else:
-    # ---------------------------
-    # Chart options
-    # ---------------------------
-    chart_options = [
-        "Histogram",
-        "Boxplot",
-        "Correlation Heatmap",
-        "Scatter Plot",
-        "Line Chart",
-        "Bar Chart (Categorical)",
-        "Pie Chart (Categorical)"
-    ]
-
-    # ---------------------------
-    # Chart rendering function
-    # ---------------------------
-    def render_chart(df_in, chart_type, key_prefix=""):
-        numeric_cols = df_in.select_dtypes(include="number").columns.tolist()
-        cat_cols = df_in.select_dtypes(exclude="number").columns.tolist()
-
-        with st.expander(f"📊 {chart_type}"):
-            custom_title = st.text_input(
-                f"Title for {chart_type}:",
-                value=chart_type,
-                key=f"title_{key_prefix}_{chart_type}"
-            )
-
-            try:
-                if chart_type == "Histogram":
-                    if not numeric_cols:
-                        st.warning("⚠️ No numeric columns available.")
-                        return
-                    col = st.selectbox("Select column:", numeric_cols, key=f"hist_col_{key_prefix}")
-                    bins = st.slider("Bins:", 5, 100, 20, key=f"bins_{key_prefix}")
-                    fig, ax = plt.subplots()
-                    df_in[col].hist(ax=ax, bins=bins)
-                    ax.set_title(custom_title)
-                    st.pyplot(fig)
-
-                elif chart_type == "Boxplot":
-                    if not numeric_cols:
-                        st.warning("⚠️ No numeric columns available.")
-                        return
-                    cols = st.multiselect("Select columns:", numeric_cols, default=numeric_cols[:1],
-                                          key=f"box_cols_{key_prefix}")
-                    if cols:
-                        fig, ax = plt.subplots()
-                        sns.boxplot(data=df_in[cols], ax=ax)
-                        ax.set_title(custom_title)
-                        st.pyplot(fig)
-
-                elif chart_type == "Correlation Heatmap":
-                    if len(numeric_cols) < 2:
-                        st.info("ℹ️ Need at least two numeric columns.")
-                        return
-                    fig, ax = plt.subplots(figsize=(5, 4))
-                    sns.heatmap(df_in[numeric_cols].corr(), cmap="coolwarm", annot=True, ax=ax)
-                    ax.set_title(custom_title)
-                    st.pyplot(fig)
-
-                elif chart_type == "Scatter Plot":
-                    if len(numeric_cols) < 2:
-                        st.info("ℹ️ Need at least two numeric columns.")
-                        return
-                    x_col = st.selectbox("X-axis column:", numeric_cols, key=f"xcol_{key_prefix}")
-                    y_col = st.selectbox("Y-axis column:", numeric_cols, key=f"ycol_{key_prefix}")
-                    fig, ax = plt.subplots()
-                    ax.scatter(df_in[x_col], df_in[y_col], alpha=0.6)
-                    ax.set_title(custom_title)
-                    st.pyplot(fig)
-
-                elif chart_type == "Line Chart":
-                    if len(numeric_cols) < 2:
-                        st.info("ℹ️ Need at least two numeric columns.")
-                        return
-                    x_col = st.selectbox("X-axis column:", numeric_cols, key=f"xline_{key_prefix}")
-                    y_col = st.selectbox("Y-axis column:", numeric_cols, key=f"yline_{key_prefix}")
-                    fig, ax = plt.subplots()
-                    ax.plot(df_in[x_col], df_in[y_col], marker="o")
-                    ax.set_title(custom_title)
-                    st.pyplot(fig)
-
-                elif chart_type == "Bar Chart (Categorical)":
-                    if not cat_cols:
-                        st.warning("⚠️ No categorical columns available.")
-                        return
-                    col = st.selectbox("Select column:", cat_cols, key=f"bar_col_{key_prefix}")
-                    counts = df_in[col].value_counts().reset_index()
-                    counts.columns = [col, "Count"]
-                    fig, ax = plt.subplots()
-                    sns.barplot(x=col, y="Count", data=counts, ax=ax)
-                    ax.set_title(custom_title)
-                    plt.xticks(rotation=45)
-                    st.pyplot(fig)
-
-                elif chart_type == "Pie Chart (Categorical)":
-                    if not cat_cols:
-                        st.warning("⚠️ No categorical columns available.")
-                        return
-                    col = st.selectbox("Select column:", cat_cols, key=f"pie_col_{key_prefix}")
-                    counts = df_in[col].value_counts()
-                    fig, ax = plt.subplots()
-                    ax.pie(counts, labels=counts.index, autopct="%1.1f%%", startangle=90)
-                    ax.set_title(custom_title)
-                    st.pyplot(fig)
-
-            except Exception as e:
-                st.error(f"❌ Error rendering {chart_type}: {e}")
-
     # ---------------------------
     # Unified Dashboard (AI + Manual)
     # ---------------------------
@@ -330,29 +249,19 @@ else:
 
     ai_charts = []
     if st.button("🤖 Get AI Chart Suggestions"):
-        headers = {"Authorization": f"Bearer {st.session_state.token}"}
         try:
-            res = requests.post(
-                f"{API_URL}/chat",
-                json={
-                    "history": [
-                        {"role": "system", "content": "You are a data visualization expert."},
-                        {"role": "user",
-                         "content": f"Suggest the most suitable set of charts for this dataset with columns: {list(data_for_viz.columns)} and dtypes: {data_for_viz.dtypes.astype(str).to_dict()}. Reply ONLY with chart names from this list: {chart_options}"}
-                    ]
-                },
-                headers=headers
-            )
-            data = safe_json(res)
-            if res.status_code == 200:
-                suggestion_text = data["reply"]
-                st.markdown("### 💡 AI Suggested Charts")
-                st.write(suggestion_text)
-                ai_charts = [c for c in chart_options if c.lower() in suggestion_text.lower()]
-            else:
-                st.error(data.get("error", "AI suggestion failed"))
+            from chat_with_groq import chat_with_groq
+
+            suggestion_text = chat_with_groq([
+                {"role": "system", "content": "You are a data visualization expert."},
+                {"role": "user",
+                 "content": f"Suggest the most suitable set of charts for this dataset with columns: {list(data_for_viz.columns)} and dtypes: {data_for_viz.dtypes.astype(str).to_dict()}. Reply ONLY with chart names from this list: {chart_options}"}
+            ], user=st.session_state.user)
+            st.markdown("### 💡 AI Suggested Charts")
+            st.write(suggestion_text)
+            ai_charts = [c for c in chart_options if c.lower() in suggestion_text.lower()]
         except Exception as e:
-            st.error(f"⚠️ Could not reach backend: {e}")
+            st.error(f"⚠️ AI suggestion failed: {e}")
 
     # Manual selection
     manual_charts = st.multiselect(
@@ -364,15 +273,18 @@ else:
     # Merge AI + Manual (unique, ordered)
     all_charts = list(dict.fromkeys(ai_charts + manual_charts))
 
-    # Render
+    # Render (and remember what was drawn, for the report)
     cols_per_row = st.slider("Columns per row", 1, 3, 2)
+    chart_specs = []
     if all_charts:
         for i in range(0, len(all_charts), cols_per_row):
             row_charts = all_charts[i:i + cols_per_row]
             cols = st.columns(len(row_charts))
             for idx, (col_area, chart) in enumerate(zip(cols, row_charts)):
                 with col_area:
-                    render_chart(data_for_viz, chart, key_prefix=f"merged_{i}_{idx}")
+                    spec = render_chart(data_for_viz, chart, key_prefix=f"merged_{i}_{idx}")
+                    if spec:
+                        chart_specs.append(spec)
 
     # ---------------------------
     # AI Insights Section
@@ -399,102 +311,31 @@ else:
 st.header("🤖 AutoML – Automatic Prediction")
 
 if data_for_viz is not None:
-    target_col = st.selectbox("🎯 Select target column for prediction:", data_for_viz.columns)
-
-    if target_col:
-        from sklearn.model_selection import train_test_split
-        from sklearn.preprocessing import LabelEncoder
-        from sklearn.metrics import accuracy_score, classification_report, mean_squared_error, r2_score
-        from sklearn.linear_model import LogisticRegression, LinearRegression
-        from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
-        import numpy as np
-        import pickle
-
-        df_ml = data_for_viz.copy()
-
-        # Encode categorical target if needed
-        if df_ml[target_col].dtype == "object":
-            le = LabelEncoder()
-            df_ml[target_col] = le.fit_transform(df_ml[target_col].astype(str))
-
-        X = df_ml.drop(columns=[target_col])
-        y = df_ml[target_col]
-
-        # Handle categorical predictors
-        X = pd.get_dummies(X, drop_first=True)
-
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-
-        # Detect problem type
-        problem_type = "classification" if y.nunique() <= 10 and y.dtype != "float" else "regression"
-        st.write(f"Detected task: **{problem_type.capitalize()}**")
-
-        results = {}
-        best_model = None
-        best_score = -np.inf
-
-        if problem_type == "classification":
-            models = {
-                "Logistic Regression": LogisticRegression(max_iter=1000),
-                "Random Forest": RandomForestClassifier()
-            }
-            for name, model in models.items():
-                model.fit(X_train, y_train)
-                preds = model.predict(X_test)
-                acc = accuracy_score(y_test, preds)
-                results[name] = acc
-                if acc > best_score:
-                    best_score = acc
-                    best_model = model
-
-            st.subheader("📊 Model Performance")
-            st.json(results)
-            st.text("Detailed report (best model):")
-            st.text(classification_report(y_test, best_model.predict(X_test)))
-
-        else:  # Regression
-            models = {
-                "Linear Regression": LinearRegression(),
-                "Random Forest": RandomForestRegressor()
-            }
-            for name, model in models.items():
-                model.fit(X_train, y_train)
-                preds = model.predict(X_test)
-                rmse = np.sqrt(mean_squared_error(y_test, preds))
-                r2 = r2_score(y_test, preds)
-                results[name] = {"RMSE": rmse, "R2": r2}
-                if r2 > best_score:
-                    best_score = r2
-                    best_model = model
-
-            st.subheader("📊 Model Performance")
-            st.json(results)
-
-        # Save best model
-        if best_model:
-            with open("best_model.pkl", "wb") as f:
-                pickle.dump(best_model, f)
-            st.download_button(
-                label="📥 Download Best Model",
-                data=open("best_model.pkl", "rb").read(),
-                file_name="best_model.pkl"
-            )
-
-        # AI Explanation of results
-        if st.button("💡 Explain Results with AI"):
-            headers = {"Authorization": f"Bearer {st.session_state.token}"}
-            res = requests.post(
-                f"{API_URL}/chat",
-                json={"history": [
-                    {"role": "system", "content": "You are a data scientist explaining AutoML results."},
-                    {"role": "user", "content": f"Explain these results:\n{results}"}
-                ]},
-                headers=headers
-            )
-            data = safe_json(res)
-            if res.get("status_code", 200) == 200:
-                st.write("### 🤖 AI Explanation")
-                st.write(data.get("reply", "No response"))
+    # the store handle data_for_viz came from; its key identifies the content
+    handle = st.session_state.df_clean if st.session_state.df_clean is not None else st.session_state.dataset
+    show_automl(data_for_viz, handle.key)
+
+# ---------------------------
+# 📄 Report
+# ---------------------------
+if data_for_viz is not None:
+    st.header("📄 Report")
+    if st.button("🧩 Build HTML Report"):
+        from report_builder import build_report, standard_sections
+
+        with st.spinner("🧩 Assembling report..."):
+            sections = standard_sections(data_for_viz, chart_specs, st.session_state.automl_results,
+                                         st.session_state.insights, st.session_state.drift)
+            # unchanged sections come from the cache; only edited charts are redrawn
+            report_html, report_stats = build_report(sections)
+        st.caption(f"{report_stats['sections']} sections: {report_stats['rendered']} rendered, "
+                   f"{report_stats['cached']} reused ({report_stats['seconds']} s)")
+        st.download_button(
+            label="📥 Download HTML Report",
+            data=report_html.encode("utf-8"),
+            file_name="data2docs_report.html",
+            mime="text/html"
+        )
 
 # ------------------------
 # 💬 Chat with Groq AI
@@ -503,32 +344,9 @@ st.markdown("---")
 st.header("💬 Chat with Groq AI About Your Data")
 
 if df is not None:
-    if "chat_history" not in st.session_state:
-        st.session_state.chat_history = [
-            {"role": "system", "content": "You're a helpful data analyst."},
-            {"role": "user", "content": f"Here's a preview of the data:\n\n{df.head(3).to_string(index=False)}"}
-        ]
-
-    prompt = st.text_input("Ask something about your data:")
-
-    if prompt:
-        headers = {"Authorization": f"Bearer {st.session_state.token}"}
-        st.session_state.chat_history.append({"role": "user", "content": prompt})
-        with st.spinner("🤖 Thinking..."):
-            try:
-                res = requests.post(f"{API_URL}/chat", json={"history": st.session_state.chat_history}, headers=headers)
-                data = safe_json(res)
-                if res.status_code == 200:
-                    reply = data["reply"]
-                    st.session_state.chat_history.append({"role": "assistant", "content": reply})
-                else:
-                    st.error(data.get("error", "Chat failed"))
-            except Exception as e:
-                st.error(f"⚠️ Could not reach backend: {e}")
-
-    st.markdown("### 💬 Conversation History")
-    for msg in st.session_state.chat_history[2:]:
-        icon = "👤" if msg["role"] == "user" else "🤖"
-        st.markdown(f"{icon} **{msg['role'].capitalize()}**: {msg['content']}")
+    show_chat(df)
 else:
     st.warning("⚠️ Please upload a file first to enable chat.")
+
+# ---------------- PERFORMANCE PANEL ----------------
+render_perf_panel()
@@ -0,0 +1,75 @@
+# app/model_registry.py
+"""Versioned, per-user storage for AutoML models.
+
+    <MODEL_REGISTRY_DIR>/<user>/<dataset_id>/v<N>/model.joblib
+                                                 /meta.json
+
+``dataset_id`` is a content hash of the training frame, so re-running AutoML
+on the same upload adds a version next to the previous one, and concurrent
+users never write to the same file. The backend serves the same directory
+(see backend/model_serving.py) for batch scoring; the layout itself lives in
+shared/registry_layout.py.
+"""
+
+import hashlib
+import json
+import os
+import time
+
+# shared/ is on the path: app/main.py adds it for Streamlit
+from registry_layout import META_FILE, MODEL_FILE, VERSION_RE, dataset_dir
+
+
+def dataset_id(df):
+    """Short content hash of a frame: column names, dtypes and every row (cached per frame)."""
+    from dataset_store import cached_on_frame
+
+    return cached_on_frame(df, "dataset_id", lambda: _content_hash(df))
+
+
+def _content_hash(df):
+    import pandas as pd
+
+    h = hashlib.blake2b(digest_size=8)
+    h.update(json.dumps([[str(c), str(t)] for c, t in df.dtypes.items()]).encode("utf-8"))
+    try:
+        hashed = pd.util.hash_pandas_object(df, index=False)
+    except TypeError:
+        # list / dict cells (nested JSON) are unhashable: hash object columns by their text
+        text = {c: str for c in df.columns[df.dtypes == object]}
+        hashed = pd.util.hash_pandas_object(df.astype(text), index=False)
+    h.update(hashed.to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def _next_version_dir(ds_dir):
+    os.makedirs(ds_dir, exist_ok=True)
+    existing = [int(m.group(1)) for m in map(VERSION_RE.match, os.listdir(ds_dir)) if m]
+    version = max(existing, default=0) + 1
+    while True:
+        path = os.path.join(ds_dir, f"v{version}")
+        try:
+            os.mkdir(path)  # atomic: two sessions saving at once get different versions
+            return version, path
+        except FileExistsError:
+            version += 1
+
+
+def save_model(model, user, df, meta, root=None):
+    """Store ``model`` as the next version for ``(user, df)``; returns the meta dict."""
+    import joblib
+
+    ds_id = dataset_id(df)
+    version, path = _next_version_dir(dataset_dir(user, ds_id, root))
+
+    # uncompressed so the backend can memory-map the arrays
+    joblib.dump(model, os.path.join(path, MODEL_FILE))
+
+    meta = {**meta, "dataset_id": ds_id, "version": version, "created_at": time.time()}
+    # meta.json is written last and atomically: a version without it is incomplete
+    tmp = os.path.join(path, META_FILE + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2, default=str)
+    os.replace(tmp, os.path.join(path, META_FILE))
+    meta["path"] = os.path.join(path, MODEL_FILE)
+    return meta
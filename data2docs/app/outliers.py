@@ -0,0 +1,127 @@
+# app/outliers.py
+"""Outlier and anomaly detection for the EDA section.
+
+``detect_outliers`` flags every numeric column by three rules at once:
+
+* IQR   - outside ``[Q1 - k*IQR, Q3 + k*IQR]``
+* z     - ``|x - mean| / std`` above a threshold
+* MAD   - modified z-score ``|x - median| / (1.4826 * MAD)`` above a threshold
+
+Quantiles and medians come from a fixed-size random sample (accurate to well
+under a percentile at the default size), mean and std from the full column,
+and the flags themselves are plain vectorized comparisons over every row.
+``isolation_forest`` adds a multivariate view: the forest is fit on a
+subsample and scores at most ``score_rows`` rows, so it stays in seconds on
+very large frames.
+"""
+
+import numpy as np
+import pandas as pd
+
+METHODS = {"iqr": "IQR", "zscore": "Z-score", "mad": "MAD"}
+
+
+def _bounds(values, sample, iqr_k, z_thresh, mad_thresh):
+    q1, median, q3 = np.nanquantile(sample, [0.25, 0.5, 0.75])
+    iqr = q3 - q1
+    mad = 1.4826 * np.nanmedian(np.abs(sample - median))
+    mean = np.nanmean(values)
+    std = np.nanstd(values)
+    return {
+        "iqr": (q1 - iqr_k * iqr, q3 + iqr_k * iqr),
+        "zscore": (mean - z_thresh * std, mean + z_thresh * std),
+        "mad": (median - mad_thresh * mad, median + mad_thresh * mad),
+    }
+
+
+def detect_outliers(df, iqr_k=1.5, z_thresh=3.0, mad_thresh=3.5, sample_rows=1_000_000, seed=0):
+    """Per-column outlier counts and the flagged rows for each rule.
+
+    Returns a dict with ``columns`` (DataFrame: one row per numeric column with
+    counts and bounds per rule), ``rows`` (per rule, index labels of flagged
+    rows, most-flagged-columns first) and ``row_counts`` (per rule, number of
+    rows flagged in at least one column).
+    """
+    numeric_cols = df.select_dtypes(include="number").columns.tolist()
+    n = len(df)
+    rng = np.random.default_rng(seed)
+    # one set of sample positions shared by all columns
+    sample_idx = rng.integers(0, n, size=sample_rows) if n > sample_rows else None
+
+    per_row = {m: np.zeros(n, dtype=np.int16) for m in METHODS}
+    records = []
+    for col in numeric_cols:
+        values = df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+        sample = values if sample_idx is None else values[sample_idx]
+        if np.isnan(sample).all():
+            continue
+        bounds = _bounds(values, sample, iqr_k, z_thresh, mad_thresh)
+        record = {"column": col}
+        for method, (lo, hi) in bounds.items():
+            # NaN compares False, so missing cells are never outliers
+            flags = (values < lo) | (values > hi)
+            per_row[method] += flags
+            count = int(np.count_nonzero(flags))
+            record[f"{method}_count"] = count
+            record[f"{method}_pct"] = round(100 * count / n, 3) if n else 0.0
+            record[f"{method}_low"] = lo
+            record[f"{method}_high"] = hi
+        records.append(record)
+
+    rows, row_counts = {}, {}
+    for method, counts in per_row.items():
+        flagged = np.flatnonzero(counts)
+        order = flagged[np.argsort(-counts[flagged], kind="stable")]
+        rows[method] = df.index[order]
+        row_counts[method] = int(flagged.size)
+    return {"columns": pd.DataFrame(records), "rows": rows, "row_counts": row_counts, "n_rows": n}
+
+
+def isolation_forest(df, fit_rows=50_000, score_rows=200_000, top_n=100, seed=0):
+    """Multivariate anomalies over the numeric columns.
+
+    Returns ``index`` (up to ``top_n`` most anomalous row labels), ``scores``
+    (their anomaly scores, higher = more anomalous), ``scored_rows`` and the
+    share of scored rows the forest calls anomalous.
+    """
+    from sklearn.ensemble import IsolationForest
+
+    numeric = df.select_dtypes(include="number")
+    scored = numeric.sample(n=score_rows, random_state=seed) if len(numeric) > score_rows else numeric
+    fit = scored.sample(n=fit_rows, random_state=seed) if len(scored) > fit_rows else scored
+    medians = fit.median()
+    # a column with no values in the fit sample has no median to impute with; leave it out
+    medians = medians[medians.notna()]
+    if medians.empty or len(scored) == 0:
+        return {"index": df.index[:0], "scores": np.array([]), "scored_rows": 0, "anomaly_pct": 0.0}
+    scored, fit = scored[medians.index], fit[medians.index]
+    forest = IsolationForest(random_state=seed).fit(fit.fillna(medians).to_numpy(np.float32))
+
+    X = scored.fillna(medians).to_numpy(np.float32)
+    scores = -forest.score_samples(X)  # sklearn: lower = more abnormal
+    anomalous = scores > -forest.offset_  # what forest.predict(X) == -1 computes, without rescoring
+    top = np.argsort(-scores)[:top_n]
+    return {
+        "index": scored.index[top],
+        "scores": scores[top],
+        "scored_rows": len(scored),
+        "anomaly_pct": round(100 * float(anomalous.mean()), 3),
+    }
+
+
+def outlier_summary(report, method="iqr", max_columns=10):
+    """Compact, JSON-friendly summary for the insights prompt."""
+    cols = report["columns"]
+    if cols.empty:
+        return {}
+    top = cols.sort_values(f"{method}_count", ascending=False).head(max_columns)
+    return {
+        "rule": METHODS[method],
+        "rows_flagged": report["row_counts"][method],
+        "rows_total": report["n_rows"],
+        "columns": {
+            str(r["column"]): {"count": int(r[f"{method}_count"]), "pct": float(r[f"{method}_pct"]),
+                               "bounds": [float(r[f"{method}_low"]), float(r[f"{method}_high"])]}
+            for _, r in top.iterrows() if r[f"{method}_count"] > 0
+        },
+    }
@@ -0,0 +1,127 @@
+# app/perf.py
+"""Lightweight per-rerun tracing for the Streamlit app.
+
+    with span("load_data"):
+        ...
+
+    @traced("show_summary_stats")
+    def show_summary_stats(df): ...
+
+Every span records wall time, CPU time of the script thread and the
+process-wide peak RSS when it ended. That is a high-water mark for the whole
+Streamlit process: it never goes down and includes other sessions, so it
+shows when the process grew, not how much a span allocated. Spans are kept
+per thread (Streamlit runs each session's script in its own thread) and
+reset by ``start_run()`` at the top of every rerun, so the sidebar panel
+shows only the current rerun.
+"""
+
+import functools
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+import streamlit as st
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+_local = threading.local()
+
+
+def _peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def start_run():
+    _local.spans = []
+    _local.depth = 0
+    _local.t0 = time.perf_counter()
+
+
+def current_spans():
+    """Spans of the current rerun, in start order."""
+    return sorted(getattr(_local, "spans", []), key=lambda s: s["start_ms"])
+
+
+@contextmanager
+def span(name):
+    if not hasattr(_local, "spans"):
+        start_run()
+    depth = _local.depth
+    _local.depth += 1
+    wall0 = time.perf_counter()
+    cpu0 = time.thread_time()
+    try:
+        yield
+    finally:
+        wall1 = time.perf_counter()
+        _local.depth = depth
+        _local.spans.append({
+            "span": name,
+            "depth": depth,
+            "start_ms": (wall0 - _local.t0) * 1000,
+            "wall_ms": (wall1 - wall0) * 1000,
+            "cpu_ms": (time.thread_time() - cpu0) * 1000,
+            "process_peak_rss_mb": _peak_rss_mb(),
+        })
+
+
+def traced(name=None):
+    """Decorator form of :func:`span`; defaults to the function's name."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name or fn.__name__):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# ---------------- SIDEBAR PANEL ----------------
+def render_perf_panel():
+    if not st.sidebar.checkbox("⏱️ Show performance panel", key="perf_panel"):
+        return
+
+    spans = current_spans()
+    total_ms = (time.perf_counter() - getattr(_local, "t0", time.perf_counter())) * 1000
+    with st.sidebar.expander("⏱️ This rerun", expanded=True):
+        st.caption(f"Script time so far: **{total_ms:,.0f} ms** across {len(spans)} spans")
+        if not spans:
+            st.info("No traced work in this rerun.")
+            return
+
+        rows = [{
+            "span": "  " * s["depth"] + s["span"],
+            "start ms": round(s["start_ms"], 1),
+            "wall ms": round(s["wall_ms"], 1),
+            "cpu ms": round(s["cpu_ms"], 1),
+            "process peak RSS MB": None if s["process_peak_rss_mb"] is None
+            else round(s["process_peak_rss_mb"], 1),
+        } for s in spans]
+        st.dataframe(rows, hide_index=True)
+
+        # Gantt-style timeline of the rerun
+        timeline = [{
+            "span": f"{i:02d} {s['span']}",
+            "start": s["start_ms"],
+            "end": s["start_ms"] + max(s["wall_ms"], 0.5),
+            "wall_ms": round(s["wall_ms"], 1),
+        } for i, s in enumerate(spans)]
+        st.vega_lite_chart({
+            "data": {"values": timeline},
+            "mark": "bar",
+            "encoding": {
+                "y": {"field": "span", "type": "nominal", "sort": None, "title": None},
+                "x": {"field": "start", "type": "quantitative", "title": "ms since rerun start"},
+                "x2": {"field": "end"},
+                "tooltip": [{"field": "span"}, {"field": "wall_ms", "title": "wall ms"}],
+            },
+        })
@@ -0,0 +1,211 @@
+# app/progressive_automl.py
+"""AutoML on growing samples under a wall-clock budget.
+
+``progressive_search`` holds out one fixed, stratified test set, then fits
+every candidate model on nested stratified training samples of 10k, 100k,
+1M... rows, scoring each stage on the same holdout. After each stage the
+``on_stage`` callback receives the leaderboard so far. The search stops when
+
+* the budget would be exceeded: each model's next fit is projected from its
+  last one, and models that no longer fit are dropped from later stages,
+* the learning curve flattens: the best score gained less than ``min_gain``
+  over the previous stage, or
+* the next sample would already be the whole training set.
+
+The winner is refit on the full training set only when that is worthwhile:
+the curve was still rising and the projected refit fits the remaining budget.
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from perf import span
+
+FIRST_STAGE = 10_000
+STAGE_FACTOR = 10
+HOLDOUT_SHARE = 0.2
+HOLDOUT_MAX = 100_000
+MIN_GAIN = 0.002
+MIN_ROWS = 10  # below this the holdout would be empty or a single row
+# fit time grows a little faster than linearly with rows (trees sort at every split)
+_GROWTH = 1.15
+
+
+def candidate_models(problem_type):
+    """Fresh, unfitted candidates for ``problem_type``."""
+    from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+    from sklearn.linear_model import LinearRegression, LogisticRegression
+
+    if problem_type == "classification":
+        return {"Logistic Regression": LogisticRegression(max_iter=1000),
+                "Random Forest": RandomForestClassifier()}
+    return {"Linear Regression": LinearRegression(),
+            "Random Forest": RandomForestRegressor()}
+
+
+def evaluate(problem_type, model, X, y):
+    """``(score, metrics)``: accuracy for classification, R² (with RMSE alongside) for regression."""
+    from sklearn.metrics import accuracy_score, mean_squared_error, r2_score
+
+    preds = model.predict(X)
+    if problem_type == "classification":
+        acc = accuracy_score(y, preds)
+        return acc, acc
+    r2 = r2_score(y, preds)
+    return r2, {"RMSE": float(np.sqrt(mean_squared_error(y, preds))), "R2": r2}
+
+
+# ---------------- SAMPLING ----------------
+def _class_ranks(codes):
+    """Rank of each row within its class (in row order), and the class sizes."""
+    counts = np.bincount(codes)
+    by_class = np.argsort(codes, kind="stable")
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    rank = np.empty(len(codes), dtype=np.int64)
+    rank[by_class] = np.arange(len(codes)) - np.repeat(starts, counts)
+    return rank, counts
+
+
+def stratified_order(y, stratify=True, seed=42):
+    """A row order whose every prefix is (close to) stratified by ``y``.
+
+    Rows are shuffled and then interleaved class by class, each row placed
+    at its rank within its class divided by the class size, so taking the
+    first ``n`` rows gives each class about its share of ``n``. Every class's
+    first row sorts to the front, so even the smallest sample sees every
+    class. Samples taken as prefixes of one order are nested, which keeps
+    learning curves smooth.
+    """
+    rng = np.random.default_rng(seed)
+    order = rng.permutation(len(y))
+    if not stratify:
+        return order
+    codes, _ = pd.factorize(np.asarray(y)[order], use_na_sentinel=False)
+    rank, counts = _class_ranks(codes)
+    return order[np.argsort(rank / counts[codes], kind="stable")]
+
+
+def holdout_mask(y_ordered, share, stratify=True):
+    """Every ``1/share``-th row of each class of ``y_ordered``, never a class's first row.
+
+    Classes too small to give up a row stay entirely in training; if no class
+    can, the holdout is taken across classes instead.
+    """
+    def every_nth(codes):
+        rank, _ = _class_ranks(codes)
+        return np.floor((rank + 1) * share) > np.floor(rank * share)
+
+    one_class = np.zeros(len(y_ordered), dtype=np.int64)
+    mask = every_nth(pd.factorize(np.asarray(y_ordered), use_na_sentinel=False)[0] if stratify else one_class)
+    return mask if mask.any() else every_nth(one_class)
+
+
+def stage_sizes(n_train, first=FIRST_STAGE, factor=STAGE_FACTOR):
+    """Sample sizes below ``n_train``; a single full stage for small data."""
+    sizes = []
+    size = first
+    while size < n_train:
+        sizes.append(size)
+        size *= factor
+    return sizes or [n_train]
+
+
+# ---------------- SEARCH ----------------
+def progressive_search(X, y, problem_type, budget_s=60.0, min_gain=MIN_GAIN, refit=True,
+                       on_stage=None, seed=42):
+    """Run the progressive search; see the module docstring.
+
+    Returns a dict with ``best_name``, ``best_model``, ``best_score``, ``scores`` (latest
+    metrics per model, in the format the AutoML block shows), ``leaderboard``
+    (one row per model and stage), ``stop_reason``, ``refit`` (whether the
+    winner was refit on all training rows), ``train_rows`` and the holdout
+    ``X_test`` / ``y_test``.
+    """
+    if len(y) < MIN_ROWS:
+        raise ValueError(f"AutoML needs at least {MIN_ROWS} rows; got {len(y)}.")
+    started = time.perf_counter()
+
+    def remaining():
+        return budget_s - (time.perf_counter() - started)
+
+    stratify = problem_type == "classification"
+    order = stratified_order(y, stratify=stratify, seed=seed)
+    share = min(HOLDOUT_SHARE, HOLDOUT_MAX / len(order))
+    test_mask = holdout_mask(y.to_numpy()[order], share, stratify=stratify)
+    test_idx, train_idx = order[test_mask], order[~test_mask]
+    X_test, y_test = X.iloc[test_idx], y.iloc[test_idx]
+
+    active = list(candidate_models(problem_type))
+    fitted, scores, latest, seconds = {}, {}, {}, {}
+    rows = []
+    stop_reason = "all stages done"
+    best_prev = None
+    sizes = stage_sizes(len(train_idx))
+
+    for stage, size in enumerate(sizes):
+        if stage:
+            growth = (size / sizes[stage - 1]) ** _GROWTH
+            fits = [name for name in active if seconds[name] * growth <= remaining()]
+            if not fits:
+                stop_reason = "time budget"
+                break
+            active = fits
+        sample = train_idx[:size]
+        X_stage, y_stage = X.iloc[sample], y.iloc[sample]
+        for name in active:
+            model = candidate_models(problem_type)[name]
+            t0 = time.perf_counter()
+            with span(f"automl: fit {name} on {size:,} rows"):
+                model.fit(X_stage, y_stage)
+            score, metrics = evaluate(problem_type, model, X_test, y_test)
+            seconds[name] = time.perf_counter() - t0
+            fitted[name], latest[name], scores[name] = model, score, metrics
+            rows.append({"stage": stage + 1, "rows": size, "model": name, "score": score,
+                         "seconds": round(seconds[name], 2)})
+
+        leaderboard = pd.DataFrame(rows)
+        if on_stage is not None:
+            on_stage(leaderboard, stage + 1, len(sizes))
+
+        best = max(latest[name] for name in active)
+        if best_prev is not None and best - best_prev < min_gain:
+            stop_reason = "learning curve flattened"
+            break
+        best_prev = best
+        if remaining() <= 0:
+            stop_reason = "time budget"
+            break
+
+    leaderboard = pd.DataFrame(rows)
+    best_name = max(latest, key=latest.get)
+    best_model = fitted[best_name]
+    last_size = int(leaderboard.loc[leaderboard["model"] == best_name, "rows"].iloc[-1])
+    train_rows = last_size
+
+    refitted = False
+    projected = seconds[best_name] * (len(train_idx) / last_size) ** _GROWTH
+    if (refit and last_size < len(train_idx) and stop_reason != "learning curve flattened"
+            and projected <= remaining()):
+        model = candidate_models(problem_type)[best_name]
+        with span(f"automl: refit {best_name} on {len(train_idx):,} rows"):
+            model.fit(X.iloc[train_idx], y.iloc[train_idx])
+        score, metrics = evaluate(problem_type, model, X_test, y_test)
+        if score >= latest[best_name]:
+            best_model, scores[best_name], latest[best_name] = model, metrics, score
+            train_rows, refitted = len(train_idx), True
+
+    return {
+        "best_name": best_name,
+        "best_model": best_model,
+        "best_score": latest[best_name],
+        "scores": scores,
+        "leaderboard": leaderboard,
+        "stop_reason": stop_reason,
+        "refit": refitted,
+        "train_rows": train_rows,
+        "seconds": round(time.perf_counter() - started, 2),
+        "X_test": X_test,
+        "y_test": y_test,
+    }
@@ -0,0 +1,291 @@
+# app/report_builder.py
+"""Compose HTML reports from cached, independently rendered sections.
+
+A report is a list of :class:`Section` objects: profile tables, charts,
+AutoML results, key/value summaries and the AI narrative. Each section is
+rendered by the function registered for its ``kind`` in ``RENDERERS`` and
+wrapped in ``SECTION_TEMPLATE``. The rendered HTML is cached under a hash of
+the section's kind, title and inputs (frames are fingerprinted by content),
+so rebuilding after one chart changes renders that chart and reuses every
+other section. Misses are rendered on a thread pool: charts are drawn on
+pyplot-free ``Figure`` objects, and PNG encoding, numpy and pandas release
+the GIL for much of their work.
+"""
+
+import base64
+import hashlib
+import html
+import io
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from perf import span
+
+# bump when a template or renderer changes, so stale cached sections are not reused
+TEMPLATE_VERSION = 1
+REPORT_CACHE_MB = float(os.environ.get("REPORT_CACHE_MB", "256"))
+REPORT_WORKERS = int(os.environ.get("REPORT_WORKERS", str(min(8, (os.cpu_count() or 1) + 2))))
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>
+body {{ font-family: -apple-system, "Segoe UI", Roboto, sans-serif; max-width: 1000px; margin: 2em auto; color: #222; }}
+section {{ margin: 2em 0; page-break-inside: avoid; }}
+table {{ border-collapse: collapse; font-size: 0.85em; }}
+th, td {{ border: 1px solid #ddd; padding: 4px 8px; text-align: right; }}
+th {{ background: #f4f4f4; }}
+img {{ max-width: 100%; }}
+.note {{ color: #a33; }}
+</style>
+</head>
+<body>
+<h1>📊 {title}</h1>
+<nav><ol>
+{toc}
+</ol></nav>
+{sections}
+</body>
+</html>
+"""
+TOC_TEMPLATE = '<li><a href="#{anchor}">{title}</a></li>'
+SECTION_TEMPLATE = """<section id="{anchor}">
+<h2>{title}</h2>
+{body}
+</section>"""
+
+
+class Section:
+    """One block of a report: ``kind`` selects the renderer, ``inputs`` are its keyword arguments."""
+
+    def __init__(self, kind, title, **inputs):
+        if kind not in RENDERERS:
+            raise ValueError(f"Unknown section kind: {kind}")
+        self.kind = kind
+        self.title = title
+        self.inputs = inputs
+
+    @property
+    def key(self):
+        h = hashlib.blake2b(digest_size=16)
+        h.update(f"{TEMPLATE_VERSION}|{self.kind}|{self.title}|".encode())
+        h.update(_digest(self.inputs).encode())
+        return h.hexdigest()
+
+    def __repr__(self):
+        return f"Section({self.kind!r}, {self.title!r})"
+
+
+# ---------------- INPUT FINGERPRINTS ----------------
+def frame_fingerprint(frame):
+    """Content hash of a DataFrame or Series, cached for as long as the object lives."""
+    from dataset_store import cached_on_frame
+
+    return cached_on_frame(frame, "fingerprint", lambda: _fingerprint(frame))
+
+
+def _fingerprint(frame):
+    from dataset_diff import row_hashes
+
+    data = frame.to_frame() if isinstance(frame, pd.Series) else frame
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr((list(data.columns), [str(t) for t in data.dtypes])).encode())
+    try:
+        h.update(row_hashes(data).tobytes())
+    except TypeError:  # unhashable cells (lists, dicts from nested JSON)
+        h.update(row_hashes(data.astype(str)).tobytes())
+    h.update(pd.util.hash_pandas_object(data.index).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def _digest(value):
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return frame_fingerprint(value)
+    if isinstance(value, dict):
+        items = sorted(value.items(), key=lambda kv: repr(kv[0]))
+        return "{" + ",".join(f"{k!r}:{_digest(v)}" for k, v in items) + "}"
+    if isinstance(value, (list, tuple)):
+        return "[" + ",".join(_digest(v) for v in value) + "]"
+    return repr(value)
+
+
+# ---------------- RENDERERS ----------------
+RENDERERS = {}
+
+
+def renderer(kind):
+    """Register ``fn(**inputs) -> html`` as the body renderer for sections of ``kind``."""
+    def register(fn):
+        RENDERERS[kind] = fn
+        return fn
+    return register
+
+
+@renderer("text")
+def render_text(text):
+    """Plain or lightly formatted text (e.g. the AI narrative): escaped, one paragraph per blank line."""
+    paragraphs = [p.strip() for p in str(text or "").split("\n\n") if p.strip()]
+    return "\n".join("<p>" + html.escape(p).replace("\n", "<br>\n") + "</p>" for p in paragraphs)
+
+
+@renderer("table")
+def render_table(frame, max_rows=50):
+    return frame.to_html(max_rows=max_rows, border=0, float_format=lambda v: f"{v:,.4g}")
+
+
+@renderer("profile")
+def render_profile(frame):
+    """One row per column: dtype, non-null count, missing share and distinct values."""
+    profile = pd.DataFrame({
+        "dtype": frame.dtypes.astype(str),
+        "non-null": frame.notna().sum(),
+        "missing %": (frame.isna().mean() * 100).round(2),
+        "unique": frame.nunique(),
+    })
+    return f"<p>{len(frame):,} rows × {frame.shape[1]} columns.</p>\n" + render_table(profile, max_rows=500)
+
+
+@renderer("summary")
+def render_summary(frame):
+    return render_table(frame.describe())
+
+
+@renderer("outliers")
+def render_outliers(frame, method="iqr"):
+    from outliers import detect_outliers, outlier_summary
+
+    summary = outlier_summary(detect_outliers(frame), method=method)
+    if not summary.get("columns"):
+        return "<p>No outliers found.</p>"
+    items = {col: f"{v['count']:,} rows ({v['pct']}%)" for col, v in summary["columns"].items()}
+    return (f"<p>{summary['rows_flagged']:,} of {summary['rows_total']:,} rows flagged by the "
+            f"{summary['rule']} rule.</p>\n" + render_kv(items))
+
+
+@renderer("kv")
+def render_kv(items):
+    """A dict as a two-column table; nested values are shown as their string form."""
+    rows = "\n".join(f"<tr><th>{html.escape(str(k))}</th><td>{html.escape(str(v))}</td></tr>"
+                     for k, v in items.items())
+    return f"<table>\n{rows}\n</table>"
+
+
+@renderer("chart")
+def render_chart_section(frame, spec, dpi=100):
+    from charts import draw_chart
+
+    fig = draw_chart(frame, spec)
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", dpi=dpi, bbox_inches="tight")
+    data = base64.b64encode(buf.getvalue()).decode("ascii")
+    return f'<img alt="{html.escape(spec.get("title", ""))}" src="data:image/png;base64,{data}">'
+
+
+@renderer("automl")
+def render_automl(results):
+    """AutoML results as stored by ``show_automl``: target, task, best model and per-model scores."""
+    scores = pd.DataFrame({name: (m if isinstance(m, dict) else {"Accuracy": m})
+                           for name, m in results["scores"].items()}).T
+    head = (f"<p>Target <b>{html.escape(str(results['target']))}</b> "
+            f"({html.escape(results['problem_type'])}); best model: "
+            f"<b>{html.escape(str(results['best_model']))}</b>.</p>")
+    return head + "\n" + scores.to_html(border=0, float_format=lambda v: f"{v:,.4f}")
+
+
+# ---------------- CACHE ----------------
+class SectionCache:
+    """Thread-safe LRU of rendered section HTML, bounded by total size."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.nbytes = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            value = self.entries.get(key)
+            if value is not None:
+                self.entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self.lock:
+            if key in self.entries:
+                return
+            self.entries[key] = value
+            self.nbytes += len(value)
+            while self.nbytes > self.max_bytes and len(self.entries) > 1:
+                _, old = self.entries.popitem(last=False)
+                self.nbytes -= len(old)
+
+
+cache = SectionCache(int(REPORT_CACHE_MB * 1024 * 1024))
+
+
+# ---------------- BUILD ----------------
+def _render(section):
+    """``(body, cacheable)``; a failing section becomes a note instead of failing the report."""
+    try:
+        with span(f"report section: {section.kind} / {section.title}"):
+            return RENDERERS[section.kind](**section.inputs), True
+    except Exception as e:
+        return f'<p class="note">Could not render this section: {html.escape(str(e))}</p>', False
+
+
+def build_report(sections, title="Data2Docs Report", section_cache=None, max_workers=None):
+    """Render ``sections`` into one HTML page.
+
+    Returns ``(html, stats)``; ``stats`` counts sections rendered and served
+    from the cache and the wall time of the build.
+    """
+    section_cache = cache if section_cache is None else section_cache
+    started = time.perf_counter()
+    with span("report: fingerprint sections"):
+        keys = [s.key for s in sections]
+
+    bodies = [section_cache.get(key) for key in keys]
+    missing = [i for i, body in enumerate(bodies) if body is None]
+    if missing:
+        workers = max_workers or REPORT_WORKERS
+        with span(f"report: render {len(missing)} sections"), ThreadPoolExecutor(max_workers=workers) as pool:
+            for i, (body, cacheable) in zip(missing, pool.map(lambda i: _render(sections[i]), missing)):
+                bodies[i] = body
+                if cacheable:
+                    section_cache.put(keys[i], body)
+
+    anchors = [f"s{i}" for i in range(len(sections))]
+    toc = "\n".join(TOC_TEMPLATE.format(anchor=a, title=html.escape(s.title)) for s, a in zip(sections, anchors))
+    page = PAGE_TEMPLATE.format(title=html.escape(title), toc=toc, sections="\n".join(
+        SECTION_TEMPLATE.format(anchor=a, title=html.escape(s.title), body=b)
+        for s, a, b in zip(sections, anchors, bodies)))
+    stats = {"sections": len(sections), "rendered": len(missing), "cached": len(sections) - len(missing),
+             "seconds": round(time.perf_counter() - started, 3)}
+    return page, stats
+
+
+# ---------------- STANDARD REPORT ----------------
+def standard_sections(df, chart_specs=(), automl_results=None, insights=None, drift=None):
+    """The sections of the app's report: what the user looked at, in the order they saw it."""
+    sections = [
+        Section("profile", "Column Profile", frame=df),
+        Section("summary", "Summary Statistics", frame=df),
+        Section("outliers", "Outliers", frame=df),
+    ]
+    for spec in chart_specs:
+        sections.append(Section("chart", spec["title"], frame=df, spec=spec))
+    if automl_results:
+        sections.append(Section("automl", "AutoML Results", results=automl_results))
+    if drift:
+        sections.append(Section("kv", "Changes Since Previous Version",
+                                items={k: v for k, v in drift.items() if v not in ([], {}, None)}))
+    if insights:
+        sections.append(Section("text", "AI Insights", text=insights))
+    return sections
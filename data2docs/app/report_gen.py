@@ -3,18 +3,15 @@
 import pdfkit
 import os
 
-def save_insights_to_html(insights, html_path="templates/report.html"):
+def save_insights_to_html(insights, html_path="templates/report.html", sections=None):
+    """Write the report page: ``sections`` (see report_builder) followed by the AI insights."""
+    from report_builder import Section, build_report
+
+    sections = list(sections or []) + [Section("text", "AI Insights", text=insights)]
+    page, _ = build_report(sections, title="Data2Docs – AI Insights Report")
     os.makedirs(os.path.dirname(html_path), exist_ok=True)
     with open(html_path, "w", encoding="utf-8") as f:
-        f.write(f"""
-        <html>
-        <head><title>Data2Docs Report</title></head>
-        <body>
-            <h1>📊 Data2Docs – AI Insights Report</h1>
-            <pre>{insights}</pre>
-        </body>
-        </html>
-        """)
+        f.write(page)
     return html_path
 
 def generate_pdf(html_file="templates/report.html", output_path="reports/output.pdf"):
@@ -0,0 +1,129 @@
+# app/rollups.py
+"""Pre-aggregated time buckets for trend charts.
+
+``build_rollups`` sorts a timestamp column once and computes count, sum,
+mean, min, max and percentiles of a value column for minute, hour, day and
+week buckets. ``Rollups.select`` then picks the finest granularity that keeps
+a zoom range under ``MAX_POINTS`` buckets, so a chart over years of events
+draws a few hundred weekly points and a zoomed-in hour draws minutes, without
+touching the raw rows again. ``get_rollups`` caches the result per frame and
+column pair for as long as the frame is alive.
+"""
+
+import numpy as np
+import pandas as pd
+
+from perf import span
+
+LEVELS = [("minute", 60), ("hour", 3_600), ("day", 86_400), ("week", 7 * 86_400)]
+PERCENTILES = (50, 90, 99)
+STATS = ["count", "sum", "mean", "min", "max"] + [f"p{p}" for p in PERCENTILES]
+MAX_POINTS = 1_500
+
+# 1970-01-01 was a Thursday; shifting by 3 days makes weeks start on Monday
+_WEEK_SHIFT_DAYS = 3
+
+
+class Rollups:
+    def __init__(self, tables):
+        self.tables = tables  # level -> DataFrame indexed by bucket start
+
+    @property
+    def start(self):
+        return self.tables["minute"].index.min()
+
+    @property
+    def end(self):
+        return self.tables["minute"].index.max()
+
+    def choose_level(self, start, end, max_points=MAX_POINTS):
+        span_s = max((pd.Timestamp(end) - pd.Timestamp(start)).total_seconds(), 1)
+        for level, width in LEVELS:
+            if span_s / width <= max_points:
+                return level
+        return LEVELS[-1][0]
+
+    def select(self, start=None, end=None, max_points=MAX_POINTS):
+        """``(level, table)`` for the zoom range ``[start, end]``."""
+        start = self.start if start is None else pd.Timestamp(start)
+        end = self.end if end is None else pd.Timestamp(end)
+        level = self.choose_level(start, end, max_points)
+        table = self.tables[level]
+        # keep the bucket that contains ``start`` even though it begins before it
+        first = start - pd.Timedelta(seconds=dict(LEVELS)[level])
+        return level, table.loc[(table.index > first) & (table.index <= end)]
+
+
+def _bucket_starts(keys):
+    """Positions where a new bucket begins in a sorted key array."""
+    return np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+
+
+def build_rollups(timestamps, values=None):
+    """Rollups of ``values`` (a numeric Series, or ``None`` for counts only) over ``timestamps``."""
+    ts = pd.to_datetime(timestamps)
+    if getattr(ts.dt, "tz", None) is not None:
+        ts = ts.dt.tz_convert(None)
+    valid = ts.notna().to_numpy()
+    secs = ts.to_numpy(dtype="datetime64[s]")[valid].astype(np.int64)
+    v = None if values is None else values.to_numpy(dtype=np.float64, na_value=np.nan)[valid]
+
+    # the one sort by time that every level reuses
+    order = np.argsort(secs)
+    secs = secs[order]
+    if v is not None:
+        v = v[order]
+        finite = ~np.isnan(v)
+        v_zero = np.where(finite, v, 0.0)
+        # global value ranks: sorting (bucket, rank) as one int64 key is much cheaper than lexsort
+        by_value = np.argsort(v)  # NaN last
+        rank = np.empty(len(v), dtype=np.int64)
+        rank[by_value] = np.arange(len(v))
+
+    tables = {}
+    for level, width in LEVELS:
+        offset = _WEEK_SHIFT_DAYS * 86_400 if level == "week" else 0
+        keys = (secs + offset) // width
+        if not len(keys):
+            tables[level] = pd.DataFrame({s: [] for s in STATS}, index=pd.DatetimeIndex([]))
+            continue
+        starts = _bucket_starts(keys)
+        counts = np.diff(np.r_[starts, len(keys)])
+        index = pd.to_datetime(keys[starts] * width - offset, unit="s")
+        table = {"count": counts}
+
+        if v is not None and len(v):
+            n_valid = np.add.reduceat(finite.astype(np.int64), starts)
+            sums = np.add.reduceat(v_zero, starts)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                table["sum"] = sums
+                table["mean"] = np.where(n_valid > 0, sums / n_valid, np.nan)
+            table["min"] = np.fmin.reduceat(v, starts)
+            table["max"] = np.fmax.reduceat(v, starts)
+
+            dense = np.repeat(np.arange(len(starts), dtype=np.int64), counts)
+            # composite[i] % n is the row at sorted position i: values ordered within each bucket, NaN last
+            composite = np.sort(dense * len(v) + rank)
+            last = starts + np.maximum(n_valid - 1, 0)
+            for p in PERCENTILES:
+                pos = starts + (p / 100) * (last - starts)
+                lo = np.floor(pos).astype(np.int64)
+                hi = np.minimum(lo + 1, last)
+                frac = pos - lo
+                # gather only the two neighbours per bucket, not the whole sorted column
+                pct = v[by_value[composite[lo] % len(v)]] * (1 - frac) + v[by_value[composite[hi] % len(v)]] * frac
+                table[f"p{p}"] = np.where(n_valid > 0, pct, np.nan)
+        tables[level] = pd.DataFrame(table, index=index)
+    return Rollups(tables)
+
+
+# ---------------- CACHE ----------------
+def get_rollups(df, ts_col, value_col=None):
+    """Cached :func:`build_rollups` for ``df[ts_col]`` / ``df[value_col]``, for as long as ``df`` lives."""
+    from dataset_store import cached_on_frame
+
+    def build():
+        with span(f"rollups: {ts_col} / {value_col or 'count'}"):
+            return build_rollups(df[ts_col], None if value_col is None else df[value_col])
+
+    return cached_on_frame(df, ("rollups", ts_col, value_col), build)
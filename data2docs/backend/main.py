@@ -1,5 +1,5 @@
 # backend/main.py
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_sqlalchemy import SQLAlchemy
 from flask_jwt_extended import JWTManager, create_access_token, jwt_required, get_jwt_identity
 from werkzeug.security import generate_password_hash, check_password_hash
@@ -8,6 +8,11 @@ from flask_cors import CORS
 import math
 import os
 
+# flat imports like the rest of the backend: backend/ and shared/ must be on sys.path (see Procfile)
+from metrics import init_metrics, span
+import model_serving
+from report_store import ReportStore
+
 # ----------------- HELPER -----------------
 def sanitize_for_json(data):
     """Fix NaN/Infinity for valid JSON (works recursively)."""
@@ -41,6 +46,7 @@ app.config["JWT_SECRET_KEY"] = os.environ.get("FLASK_JWT_SECRET_KEY", "supersecr
 
 db = SQLAlchemy(app)
 jwt = JWTManager(app)
+init_metrics(app)  # per-route timings, served at /api/metrics
 
 # ----------------- MODELS -----------------
 class User(db.Model):
@@ -49,11 +55,39 @@ class User(db.Model):
     password = db.Column(db.String(200), nullable=False)
 
 class Report(db.Model):
+    """Legacy single-content reports; copied into ReportMeta/ReportRevision by ``flask migrate-reports``."""
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
     content = db.Column(db.Text, nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
 
+class ReportMeta(db.Model):
+    """What listings need; content lives in ReportRevision."""
+    __tablename__ = "report_meta"
+    id = db.Column(db.Integer, primary_key=True)
+    title = db.Column(db.String(200), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
+    latest_version = db.Column(db.Integer, nullable=False, default=1)
+    legacy_id = db.Column(db.Integer, unique=True)  # the ``report`` row this was migrated from
+    size_bytes = db.Column(db.Integer, nullable=False, default=0)    # latest content, uncompressed
+    stored_bytes = db.Column(db.Integer, nullable=False, default=0)  # all revisions, as stored
+    created_at = db.Column(db.DateTime, nullable=False)
+    updated_at = db.Column(db.DateTime, nullable=False)
+
+class ReportRevision(db.Model):
+    """One version of a report's content: whole (latest, snapshots) or a delta against version + 1."""
+    __tablename__ = "report_revision"
+    report_id = db.Column(db.Integer, db.ForeignKey('report_meta.id'), primary_key=True)
+    version = db.Column(db.Integer, primary_key=True)
+    codec = db.Column(db.String(16), nullable=False)
+    base_version = db.Column(db.Integer)
+    size_bytes = db.Column(db.Integer, nullable=False)
+    stored_bytes = db.Column(db.Integer, nullable=False)
+    payload = db.Column(db.LargeBinary, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False)
+
+reports = ReportStore(db, ReportMeta, ReportRevision)
+
 # ----------------- API PREFIX -----------------
 API_PREFIX = "/api"
 
@@ -74,7 +108,8 @@ def signup():
     if User.query.filter_by(username=data["username"]).first():
         return jsonify({"error": "User already exists"}), 400
 
-    hashed_pw = generate_password_hash(data["password"])
+    with span("password_hash"):
+        hashed_pw = generate_password_hash(data["password"])
     new_user = User(username=data["username"], password=hashed_pw)
     db.session.add(new_user)
     db.session.commit()
@@ -87,12 +122,23 @@ def login():
         return jsonify({"error": "Invalid request"}), 400
 
     user = User.query.filter_by(username=data["username"]).first()
-    if not user or not check_password_hash(user.password, data["password"]):
+    with span("password_check"):
+        valid = user is not None and check_password_hash(user.password, data["password"])
+    if not valid:
         return jsonify({"error": "Invalid credentials"}), 401
 
     token = create_access_token(identity=user.username)
     return jsonify({"access_token": token}), 200
 
+def _report_meta_json(meta):
+    return {
+        "id": meta.id,
+        "title": meta.title,
+        "latest_version": meta.latest_version,
+        "size_bytes": meta.size_bytes,
+        "updated_at": meta.updated_at.isoformat(),
+    }
+
 @app.route(f"{API_PREFIX}/reports", methods=["GET", "POST"])
 @jwt_required()
 def handle_reports():
@@ -103,36 +149,146 @@ def handle_reports():
         data = request.get_json()
         if not data or "title" not in data or "content" not in data:
             return jsonify({"error": "Invalid request"}), 400
-        new_report = Report(title=data["title"], content=data["content"], user_id=user.id)
-        db.session.add(new_report)
+        with span("report_compress"):
+            meta = reports.create(user.id, data["title"], data["content"])
         db.session.commit()
-        return jsonify({"message": "Report created"}), 201
+        return jsonify({"message": "Report created", "id": meta.id, "version": 1}), 201
 
-    reports = Report.query.filter_by(user_id=user.id).all()
-    reports_data = [{"id": r.id, "title": r.title, "content": r.content} for r in reports]
-    return jsonify(reports_data), 200
+    metas = ReportMeta.query.filter_by(user_id=user.id).order_by(ReportMeta.updated_at.desc()).all()
+    listing = [_report_meta_json(m) for m in metas]
+    # ?content=false lists metadata only, without loading or decompressing any content
+    if request.args.get("content", "true").lower() not in ("false", "0"):
+        with span("report_decompress"):
+            texts = reports.latest_contents(metas)
+        for item in listing:
+            item["content"] = texts[item["id"]]
+    return jsonify(listing), 200
 
-@app.route(f"{API_PREFIX}/reports/<int:report_id>", methods=["PUT", "DELETE"])
+@app.route(f"{API_PREFIX}/reports/<int:report_id>", methods=["GET", "PUT", "DELETE"])
 @jwt_required()
 def modify_report(report_id):
     current_user = get_jwt_identity()
     user = User.query.filter_by(username=current_user).first()
-    report = Report.query.filter_by(id=report_id, user_id=user.id).first()
+    query = ReportMeta.query.filter_by(id=report_id, user_id=user.id)
+    if request.method == "PUT":
+        query = query.with_for_update()  # concurrent PUTs would both claim the next version
+    meta = query.first()
 
-    if not report:
+    if not meta:
         return jsonify({"error": "Report not found"}), 404
 
+    if request.method == "GET":
+        try:
+            with span("report_decompress"):
+                content = reports.content(meta, request.args.get("version", type=int))
+        except LookupError as e:
+            return jsonify({"error": str(e)}), 404
+        version = request.args.get("version", meta.latest_version, type=int)
+        return jsonify({**_report_meta_json(meta), "version": version, "content": content}), 200
+
     if request.method == "PUT":
-        data = request.get_json()
-        report.title = data.get("title", report.title)
-        report.content = data.get("content", report.content)
+        data = request.get_json() or {}
+        with span("report_compress"):
+            reports.update(meta, title=data.get("title"), content=data.get("content"))
         db.session.commit()
-        return jsonify({"message": "Report updated"}), 200
+        return jsonify({"message": "Report updated", "version": meta.latest_version}), 200
 
-    db.session.delete(report)
+    reports.delete(meta)
     db.session.commit()
     return jsonify({"message": "Report deleted"}), 200
 
+@app.route(f"{API_PREFIX}/reports/<int:report_id>/versions", methods=["GET"])
+@jwt_required()
+def report_versions(report_id):
+    user = User.query.filter_by(username=get_jwt_identity()).first()
+    meta = ReportMeta.query.filter_by(id=report_id, user_id=user.id).first()
+    if not meta:
+        return jsonify({"error": "Report not found"}), 404
+    return jsonify(reports.versions(meta)), 200
+
+# ----------------- MODEL REGISTRY -----------------
+@app.route(f"{API_PREFIX}/models", methods=["GET"])
+@jwt_required()
+def list_models():
+    return jsonify(sanitize_for_json(model_serving.list_models(get_jwt_identity()))), 200
+
+@app.route(f"{API_PREFIX}/models/<dataset_id>/predict", methods=["POST"])
+@jwt_required()
+def predict(dataset_id):
+    """Score a CSV/Parquet upload (multipart field "file" or raw body) and stream CSV back."""
+    version = request.args.get("version", type=int)
+    id_column = request.args.get("id_column")
+    try:
+        with span("model_load"):
+            model, meta = model_serving.load_model(get_jwt_identity(), dataset_id, version)
+    except LookupError as e:
+        return jsonify({"error": str(e)}), 404
+
+    upload = request.files.get("file")
+    if upload is not None:
+        chunks = model_serving.iter_input_chunks(upload.stream, upload.filename, upload.mimetype)
+    else:
+        import io
+        chunks = model_serving.iter_input_chunks(io.BytesIO(request.get_data()), content_type=request.mimetype)
+
+    def reject(body):
+        chunks.close()  # while the upload is still open; Flask closes it after the view
+        return jsonify(body), 400
+
+    # read the first chunk eagerly so bad input is a 400, not a truncated stream
+    try:
+        first = next(chunks, None)
+    except Exception as e:
+        return reject({"error": f"Could not parse input: {e}"})
+    if first is None:
+        return reject({"error": "No rows to score"})
+    missing = model_serving.missing_columns(meta, first)
+    if id_column and id_column not in first.columns:
+        missing.append(id_column)
+    if missing:
+        return reject({"error": "Missing columns", "columns": missing})
+
+    def score(chunk, header):
+        import pandas as pd
+
+        with span("score_chunk"):
+            out = pd.DataFrame({"prediction": model_serving.score_chunk(model, meta, chunk)})
+            if id_column:
+                out.insert(0, id_column, chunk[id_column].to_numpy())
+            return out.to_csv(index=False, header=header)
+
+    # score the first chunk before any headers go out, so a model/input mismatch is a 400
+    try:
+        first_csv = score(first, header=True)
+    except Exception as e:
+        return reject({"error": f"Could not score input: {e}"})
+
+    # Flask closes request.files as soon as this view returns, before the body streams:
+    # take the upload's stream over (chunks reads from it) and close it when done
+    stream = None
+    if upload is not None:
+        import io
+        stream, upload.stream = upload.stream, io.BytesIO()
+
+    def generate():
+        yield first_csv
+        rows = len(first)
+        try:
+            for chunk in chunks:
+                yield score(chunk, header=False)
+                rows += len(chunk)
+        except Exception as e:
+            # the 200 is already sent: log it and end the body with a marker clients can check for
+            app.logger.exception("Scoring %s failed after %d rows", dataset_id, rows)
+            yield f"#ERROR: scoring failed after {rows} rows: {e}\n"
+        finally:
+            chunks.close()
+            if stream is not None:
+                stream.close()
+
+    return Response(stream_with_context(generate()), mimetype="text/csv",
+                    headers={"X-Model-Version": str(meta["version"])})
+
 # ----------------- DEBUG ROUTE -----------------
 @app.route(f"{API_PREFIX}/debug", methods=["GET"])
 def debug():
@@ -150,7 +306,20 @@ with app.app_context():
     except Exception as e:
         print("❌ DB Init Error:", e)
 
+# ----------------- MIGRATIONS -----------------
+# Run once per deploy (Procfile "release"), not at import: every gunicorn
+# worker imports this module and would race on the same legacy rows.
+@app.cli.command("migrate-reports")
+def migrate_reports():
+    """Copy legacy ``report`` rows into versioned storage; safe to re-run."""
+    migrated, remapped = reports.migrate_legacy(Report)  # errors propagate: a failed release must fail loudly
+    print(f"✅ Migrated {migrated} reports to versioned storage")
+    for legacy_id, new_id in remapped.items():
+        print(f"⚠️ Legacy report {legacy_id} collided with an existing report and is now report {new_id}")
+
 # ----------------- RUN -----------------
 if __name__ == "__main__":
+    with app.app_context():
+        reports.migrate_legacy(Report)  # the dev server is a single process
     port = int(os.environ.get("PORT", 5000))
     app.run(host="0.0.0.0", port=port)
@@ -0,0 +1,191 @@
+# backend/metrics.py
+"""Per-route timing for the Flask backend, exported in Prometheus text format.
+
+``init_metrics(app)`` times every request (wall time, CPU time of the worker
+thread) and registers ``GET /api/metrics``. ``span``/``traced`` time any
+inner block (a DB commit, an LLM call) under the ``data2docs_span_*`` series.
+Metrics live in process memory, so with several gunicorn workers each worker
+reports its own numbers; Prometheus sums them per instance.
+"""
+
+import functools
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import Response, g, request
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by a tuple of label values."""
+
+    def __init__(self, name, help_text, labels, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.buckets = buckets
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def observe(self, label_values, value):
+        with self.lock:
+            counts = self.series.get(label_values)
+            if counts is None:
+                # one slot per bucket, then +Inf, sum and count
+                counts = self.series[label_values] = [0] * len(self.buckets) + [0, 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            counts[-3] += 1
+            counts[-2] += value
+            counts[-1] += 1
+
+    def expose(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self.lock:
+            items = sorted(self.series.items())
+            for label_values, counts in items:
+                base = _labels(self.labels, label_values)
+                for bound, count in zip(self.buckets, counts):
+                    lines.append(f'{self.name}_bucket{_labels(self.labels, label_values, le=bound)} {count}')
+                lines.append(f'{self.name}_bucket{_labels(self.labels, label_values, le="+Inf")} {counts[-3]}')
+                lines.append(f"{self.name}_sum{base} {counts[-2]:.6f}")
+                lines.append(f"{self.name}_count{base} {counts[-1]}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name, help_text, labels):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def inc(self, label_values, amount=1.0):
+        with self.lock:
+            self.series[label_values] = self.series.get(label_values, 0.0) + amount
+
+    def expose(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self.lock:
+            for label_values, value in sorted(self.series.items()):
+                lines.append(f"{self.name}{_labels(self.labels, label_values)} {value:g}")
+        return lines
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, le=None):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if le is not None:
+        pairs.append(f'le="{le}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+# ----------------- REGISTRY -----------------
+REQUEST_SECONDS = Histogram("data2docs_request_duration_seconds", "Wall time per request.",
+                            ("method", "route", "status"))
+REQUEST_CPU_SECONDS = Counter("data2docs_request_cpu_seconds_total", "CPU time spent serving requests.",
+                              ("method", "route"))
+SPAN_SECONDS = Histogram("data2docs_span_duration_seconds", "Wall time of traced blocks.", ("span",))
+SPAN_CPU_SECONDS = Counter("data2docs_span_cpu_seconds_total", "CPU time of traced blocks.", ("span",))
+
+_in_flight = 0
+_in_flight_lock = threading.Lock()
+_started = time.time()
+
+
+def _peak_rss_bytes():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+@contextmanager
+def span(name):
+    wall0 = time.perf_counter()
+    cpu0 = time.thread_time()
+    try:
+        yield
+    finally:
+        SPAN_SECONDS.observe((name,), time.perf_counter() - wall0)
+        SPAN_CPU_SECONDS.inc((name,), time.thread_time() - cpu0)
+
+
+def traced(name=None):
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name or fn.__name__):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def render_metrics():
+    lines = []
+    for metric in (REQUEST_SECONDS, REQUEST_CPU_SECONDS, SPAN_SECONDS, SPAN_CPU_SECONDS):
+        lines.extend(metric.expose())
+    lines += ["# HELP data2docs_requests_in_flight Requests currently being served.",
+              "# TYPE data2docs_requests_in_flight gauge",
+              f"data2docs_requests_in_flight {_in_flight}"]
+    peak = _peak_rss_bytes()
+    if peak is not None:
+        lines += ["# HELP data2docs_process_peak_rss_bytes Peak resident set size of this worker.",
+                  "# TYPE data2docs_process_peak_rss_bytes gauge",
+                  f"data2docs_process_peak_rss_bytes {peak}"]
+    lines += ["# HELP data2docs_process_start_time_seconds Start time of this worker (unix).",
+              "# TYPE data2docs_process_start_time_seconds gauge",
+              f"data2docs_process_start_time_seconds {_started:.3f}"]
+    return "\n".join(lines) + "\n"
+
+
+# ----------------- FLASK HOOKS -----------------
+def init_metrics(app, path="/api/metrics"):
+    @app.before_request
+    def _start_timer():
+        global _in_flight
+        g._metrics_wall0 = time.perf_counter()
+        g._metrics_cpu0 = time.thread_time()
+        g._metrics_in_flight = True
+        with _in_flight_lock:
+            _in_flight += 1
+
+    @app.after_request
+    def _record(response):
+        wall0 = g.pop("_metrics_wall0", None)
+        if wall0 is None:
+            return response
+        # the rule pattern (/api/reports/<int:report_id>) keeps label cardinality bounded
+        route = request.url_rule.rule if request.url_rule is not None else "<unmatched>"
+        REQUEST_SECONDS.observe((request.method, route, str(response.status_code)),
+                                time.perf_counter() - wall0)
+        REQUEST_CPU_SECONDS.inc((request.method, route), time.thread_time() - g.pop("_metrics_cpu0"))
+        return response
+
+    @app.teardown_request
+    def _finish(exc):
+        # teardown runs even when the request died before after_request
+        global _in_flight
+        if g.pop("_metrics_in_flight", False):
+            with _in_flight_lock:
+                _in_flight -= 1
+
+    @app.route(path, methods=["GET"])
+    def metrics():
+        return Response(render_metrics(), mimetype="text/plain; version=0.0.4")
+
+    return app
@@ -0,0 +1,133 @@
+# backend/model_serving.py
+"""Read side of the AutoML model registry, plus vectorized batch scoring.
+
+The Streamlit app writes ``<MODEL_REGISTRY_DIR>/<user>/<dataset_id>/v<N>/``
+(see app/model_registry.py and shared/registry_layout.py). Models are
+loaded with ``joblib.load(mmap_mode="r")`` so their arrays are paged in from
+the file and shared between gunicorn workers via the page cache, and are kept
+in an in-process LRU so a request never reloads a model that is already warm.
+
+Artifacts are only ever read from the server-side directory. Uploading a
+pickle over HTTP would let any account run code on the server.
+"""
+
+import json
+import os
+import threading
+from collections import OrderedDict
+
+# shared/ is on the path next to backend/ (gunicorn --pythonpath, see Procfile)
+from registry_layout import DATASET_RE, META_FILE, MODEL_FILE, VERSION_RE, dataset_dir, user_dir
+
+MODEL_CACHE_SIZE = int(os.environ.get("MODEL_CACHE_SIZE", "8"))
+SCORE_CHUNK_ROWS = int(os.environ.get("SCORE_CHUNK_ROWS", "100000"))
+
+
+def _versions(ds_dir):
+    """Complete versions (meta.json present), ascending."""
+    try:
+        names = os.listdir(ds_dir)
+    except FileNotFoundError:
+        return []
+    found = [int(m.group(1)) for m in map(VERSION_RE.match, names) if m]
+    return sorted(v for v in found if os.path.exists(os.path.join(ds_dir, f"v{v}", META_FILE)))
+
+
+def _read_meta(path):
+    with open(os.path.join(path, META_FILE), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def list_models(user, root=None):
+    root_dir = user_dir(user, root)
+    if not os.path.isdir(root_dir):
+        return []
+    models = []
+    for ds_id in sorted(os.listdir(root_dir)):
+        for version in _versions(os.path.join(root_dir, ds_id)):
+            meta = _read_meta(os.path.join(root_dir, ds_id, f"v{version}"))
+            models.append({k: meta.get(k) for k in
+                           ("dataset_id", "version", "target", "problem_type", "model_name", "score", "created_at")})
+    return models
+
+
+# ----------------- LRU OF LOADED MODELS -----------------
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def load_model(user, ds_id, version=None, root=None):
+    """Return ``(model, meta)``; raises ``LookupError`` if there is no such model."""
+    if not DATASET_RE.match(ds_id or ""):
+        raise LookupError("Unknown dataset")
+    ds_dir = dataset_dir(user, ds_id, root)
+    versions = _versions(ds_dir)
+    if version is None:
+        if not versions:
+            raise LookupError("No model saved for this dataset")
+        version = versions[-1]
+    elif version not in versions:
+        raise LookupError(f"Version {version} not found")
+
+    path = os.path.join(ds_dir, f"v{version}")
+    key = os.path.abspath(path)
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+
+    import joblib
+
+    # loading happens outside the lock so a slow load does not block warm hits
+    entry = (joblib.load(os.path.join(path, MODEL_FILE), mmap_mode="r"), _read_meta(path))
+    with _cache_lock:
+        _cache[key] = entry
+        _cache.move_to_end(key)
+        while len(_cache) > MODEL_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return entry
+
+
+# ----------------- BATCH SCORING -----------------
+def iter_input_chunks(stream, filename="", content_type="", chunk_rows=None):
+    """Yield DataFrames of at most ``chunk_rows`` (default ``SCORE_CHUNK_ROWS``) rows from a CSV or Parquet upload."""
+    import pandas as pd
+
+    chunk_rows = chunk_rows or SCORE_CHUNK_ROWS
+
+    name = (filename or "").lower()
+    if name.endswith((".parquet", ".pq")) or "parquet" in (content_type or ""):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(stream).iter_batches(batch_size=chunk_rows):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(stream, chunksize=chunk_rows)
+
+
+def missing_columns(meta, chunk):
+    return [c for c in meta["input_columns"] if c not in chunk.columns]
+
+
+def score_chunk(model, meta, chunk):
+    """Predictions for one chunk, encoded exactly like the training frame.
+
+    Numeric gaps are filled with the training medians saved in ``fill_values``,
+    as AutoML did before fitting; the linear models cannot take NaN at all.
+    """
+    import pandas as pd
+
+    X = chunk[meta["input_columns"]]
+    fill = meta.get("fill_values")  # absent for models saved before training imputed
+    if fill:
+        X = X.fillna({c: v for c, v in fill.items() if c in X.columns})
+    categorical = [c for c in meta.get("categorical_columns", []) if c in X.columns]
+    # no drop_first here: a chunk may not contain the level that training dropped,
+    # so encode every level and let reindex keep only the training columns
+    X = pd.get_dummies(X, columns=categorical).reindex(columns=meta["feature_columns"], fill_value=0)
+
+    preds = model.predict(X)
+    classes = meta.get("label_classes")
+    if classes:
+        preds = pd.Series(classes, dtype=object).to_numpy()[preds.astype(int)]
+    return preds
@@ -1,12 +1,16 @@
-import pdfkit, tempfile
+import html, pdfkit, tempfile
 
 def save_insights_to_html(insights: str) -> str:
-    html_path = tempfile.mktemp(suffix=".html")
-    with open(html_path, "w", encoding="utf-8") as f:
-        f.write(f"<html><body><h2>AI Insights</h2><p>{insights}</p></body></html>")
+    """Insights page; the text is escaped, so it cannot inject markup into the PDF render."""
+    paragraphs = "".join(f"<p>{html.escape(p)}</p>" for p in insights.split("\n\n") if p.strip())
+    fd, html_path = tempfile.mkstemp(suffix=".html")
+    with open(fd, "w", encoding="utf-8") as f:
+        f.write(f'<html><head><meta charset="utf-8"></head><body>'
+                f"<h2>AI Insights</h2>{paragraphs}</body></html>")
     return html_path
 
 def generate_pdf(html_path: str) -> str:
     pdf_path = html_path.replace(".html", ".pdf")
-    pdfkit.from_file(html_path, pdf_path)
+    # the page is self-contained: wkhtmltopdf has no reason to read other local files
+    pdfkit.from_file(html_path, pdf_path, options={"disable-local-file-access": ""})
     return pdf_path
@@ -0,0 +1,232 @@
+# backend/report_store.py
+"""Compressed, versioned report content.
+
+Every revision of a report is kept in ``report_revision``; ``report_meta``
+holds what listings need (title, owner, latest version, sizes) and never
+touches content.
+
+The newest revision is stored whole, zstd-compressed. When a new revision
+arrives, the previous newest is re-encoded as a *reverse* delta against it:
+zstd with the newer text as a raw-content dictionary, so the stored bytes are
+roughly the size of the edit. Reverse deltas keep the common read (the latest
+version, for viewing and export) a single decompress; only history reads walk
+back, from the nearest full revision. Every ``SNAPSHOT_EVERY``-th revision
+stays full to bound that walk.
+
+Without ``zstandard`` installed, zlib is used and deltas fall back to
+trimming the common prefix and suffix.
+"""
+
+import struct
+import zlib
+from datetime import datetime, timezone
+
+from sqlalchemy import text as sql_text
+
+try:
+    import zstandard
+except ModuleNotFoundError as e:  # optional: zlib is the fallback codec
+    if e.name != "zstandard":
+        raise
+    zstandard = None
+
+ZSTD_LEVEL = 3
+ZLIB_LEVEL = 6
+SNAPSHOT_EVERY = 20
+_DICT_HASH_LOG_MAX = 22  # match tables large enough to find edits across a multi-MB reference
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+# ----------------- CODECS -----------------
+def compress(text):
+    """``(codec, payload)`` for a whole revision."""
+    data = text.encode("utf-8")
+    if zstandard is not None:
+        return "zstd", zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return "zlib", zlib.compress(data, ZLIB_LEVEL)
+
+
+def _zstd_reference(base):
+    return zstandard.ZstdCompressionDict(base, dict_type=zstandard.DICT_TYPE_RAWCONTENT)
+
+
+def delta(text, base):
+    """``(codec, payload)`` encoding ``text`` against ``base`` (the next, newer revision)."""
+    data, ref = text.encode("utf-8"), base.encode("utf-8")
+    if zstandard is not None:
+        window_log = max((len(data) + len(ref)).bit_length(), 10)
+        params = zstandard.ZstdCompressionParameters.from_level(
+            ZSTD_LEVEL, source_size=len(data), window_log=window_log,
+            hash_log=min(window_log, _DICT_HASH_LOG_MAX), chain_log=min(window_log, _DICT_HASH_LOG_MAX))
+        return "zstd+delta", zstandard.ZstdCompressor(compression_params=params,
+                                                      dict_data=_zstd_reference(ref)).compress(data)
+    prefix = _common_prefix(data, ref)
+    suffix = _common_prefix(data[prefix:][::-1], ref[prefix:][::-1])
+    middle = data[prefix:len(data) - suffix]
+    return "zlib+delta", struct.pack("<QQ", prefix, suffix) + zlib.compress(middle, ZLIB_LEVEL)
+
+
+def _common_prefix(a, b):
+    """Length of the common prefix, by bisection over C-speed slice comparisons."""
+    lo, hi = 0, min(len(a), len(b))
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[:mid] == b[:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def decompress(codec, payload, base=None):
+    """Text of a revision; ``base`` is the newer revision's text for delta codecs."""
+    if codec == "zstd":
+        return zstandard.ZstdDecompressor().decompress(payload).decode("utf-8")
+    if codec == "zlib":
+        return zlib.decompress(payload).decode("utf-8")
+    if base is None:
+        raise ValueError(f"{codec} revision needs the newer revision to decode")
+    ref = base.encode("utf-8")
+    if codec == "zstd+delta":
+        return zstandard.ZstdDecompressor(dict_data=_zstd_reference(ref),
+                                          max_window_size=1 << 31).decompress(payload).decode("utf-8")
+    if codec == "zlib+delta":
+        prefix, suffix = struct.unpack_from("<QQ", payload)
+        middle = zlib.decompress(payload[16:])
+        return (ref[:prefix] + middle + ref[len(ref) - suffix:]).decode("utf-8")
+    raise ValueError(f"Unknown codec: {codec}")
+
+
+# ----------------- STORE -----------------
+class ReportStore:
+    """Report CRUD over the ``ReportMeta`` / ``ReportRevision`` models defined in main.py."""
+
+    def __init__(self, db, meta_model, revision_model):
+        self.db = db
+        self.Meta = meta_model
+        self.Revision = revision_model
+
+    def _revision(self, report_id, version, text):
+        codec, payload = compress(text)
+        return self.Revision(report_id=report_id, version=version, codec=codec, payload=payload,
+                             size_bytes=len(text.encode("utf-8")), stored_bytes=len(payload),
+                             created_at=_now())
+
+    def create(self, user_id, title, content, report_id=None, legacy_id=None):
+        now = _now()
+        meta = self.Meta(id=report_id, title=title, user_id=user_id, latest_version=1,
+                         legacy_id=legacy_id, created_at=now, updated_at=now)
+        self.db.session.add(meta)
+        self.db.session.flush()  # assigns meta.id
+        revision = self._revision(meta.id, 1, content)
+        meta.size_bytes, meta.stored_bytes = revision.size_bytes, revision.stored_bytes
+        self.db.session.add(revision)
+        return meta
+
+    def update(self, meta, title=None, content=None):
+        """Apply a PUT; returns True if ``content`` made a new revision."""
+        if title is not None:
+            meta.title = title
+            meta.updated_at = _now()
+        if content is None:
+            return False
+
+        latest = self.db.session.get(self.Revision, (meta.id, meta.latest_version))
+        previous = decompress(latest.codec, latest.payload)
+        if content == previous:
+            return False
+
+        new = self._revision(meta.id, meta.latest_version + 1, content)
+        self.db.session.add(new)
+        if latest.version % SNAPSHOT_EVERY:
+            codec, payload = delta(previous, content)
+            if len(payload) < latest.stored_bytes:
+                meta.stored_bytes -= latest.stored_bytes - len(payload)
+                latest.codec, latest.payload, latest.stored_bytes = codec, payload, len(payload)
+                latest.base_version = new.version
+        meta.latest_version = new.version
+        meta.size_bytes = new.size_bytes
+        meta.stored_bytes += new.stored_bytes
+        meta.updated_at = _now()
+        return True
+
+    def content(self, meta, version=None):
+        """Text of ``version`` (default: latest); raises LookupError for unknown versions."""
+        version = meta.latest_version if version is None else version
+        if not 1 <= version <= meta.latest_version:
+            raise LookupError(f"Report {meta.id} has no version {version}")
+        # the nearest full revision at or above ``version``: a snapshot or the latest
+        top = min(meta.latest_version, -(-version // SNAPSHOT_EVERY) * SNAPSHOT_EVERY)
+        R = self.Revision
+        rows = (R.query.filter(R.report_id == meta.id, R.version >= version, R.version <= top)
+                .order_by(R.version.desc()).all())
+        text = None
+        for row in rows:  # newest first; each delta is against the row before it
+            text = decompress(row.codec, row.payload, text)
+        return text
+
+    def latest_contents(self, metas, batch=500):
+        """``{report id: latest text}`` for ``metas``; latest revisions are whole, one decompress each."""
+        R, M = self.Revision, self.Meta
+        ids = [m.id for m in metas]
+        texts = {}
+        for start in range(0, len(ids), batch):
+            rows = (self.db.session.query(R.report_id, R.codec, R.payload)
+                    .join(M, (M.id == R.report_id) & (M.latest_version == R.version))
+                    .filter(M.id.in_(ids[start:start + batch])))
+            texts.update((report_id, decompress(codec, payload)) for report_id, codec, payload in rows)
+        return texts
+
+    def versions(self, meta):
+        """Revision metadata, newest first, without loading payloads."""
+        R = self.Revision
+        rows = (self.db.session.query(R.version, R.codec, R.size_bytes, R.stored_bytes, R.created_at)
+                .filter(R.report_id == meta.id).order_by(R.version.desc()).all())
+        return [{"version": v, "delta": codec.endswith("+delta"), "size_bytes": size,
+                 "stored_bytes": stored, "created_at": created.isoformat() if created else None}
+                for v, codec, size, stored, created in rows]
+
+    def delete(self, meta):
+        self.Revision.query.filter_by(report_id=meta.id).delete()
+        self.db.session.delete(meta)
+
+    def migrate_legacy(self, legacy_model, batch=100):
+        """Copy rows of the old single-``content`` table in as version 1.
+
+        A legacy row keeps its id unless a report created since already has
+        it; then it gets a new id. Returns ``(count, remapped)`` with
+        ``remapped`` mapping those legacy ids to their new ones. Each report
+        records the legacy row it came from, so re-running skips it. Legacy
+        rows are left in place (no longer read) so the table can be dropped
+        once the migration has been checked.
+        """
+        done = self.db.session.query(self.Meta.legacy_id).filter(self.Meta.legacy_id.isnot(None))
+        ids = [i for (i,) in self.db.session.query(legacy_model.id)
+               .filter(~legacy_model.id.in_(done)).order_by(legacy_model.id)]
+        taken = set()
+        for start in range(0, len(ids), batch):
+            taken.update(i for (i,) in self.db.session.query(self.Meta.id)
+                         .filter(self.Meta.id.in_(ids[start:start + batch])))
+        keep = [i for i in ids if i not in taken]
+
+        for start in range(0, len(keep), batch):
+            for row in legacy_model.query.filter(legacy_model.id.in_(keep[start:start + batch])):
+                self.create(row.user_id, row.title, row.content, report_id=row.id, legacy_id=row.id)
+            self.db.session.commit()
+        if keep and self.db.engine.dialect.name == "postgresql":
+            # explicit ids do not advance the serial; move it past them before new ids are drawn
+            self.db.session.execute(sql_text(
+                f"SELECT setval(pg_get_serial_sequence('{self.Meta.__tablename__}', 'id'), "
+                f"(SELECT MAX(id) FROM {self.Meta.__tablename__}))"))
+            self.db.session.commit()
+
+        remapped = {}
+        moved = sorted(taken)
+        for start in range(0, len(moved), batch):
+            for row in legacy_model.query.filter(legacy_model.id.in_(moved[start:start + batch])):
+                remapped[row.id] = self.create(row.user_id, row.title, row.content, legacy_id=row.id).id
+            self.db.session.commit()
+        return len(ids), remapped
@@ -0,0 +1,90 @@
+# benchmarks/cold_start.py
+"""Cold-start benchmark for the Streamlit app.
+
+Runs ``app/main.py`` once per fresh interpreter through Streamlit's AppTest
+harness (no browser or server needed) and reports how long the first,
+logged-out script run takes and which heavy libraries it pulled in.
+
+    python benchmarks/cold_start.py --runs 5 --budget 1.5
+
+Exits with status 1 when the median run exceeds ``--budget`` seconds or when a
+heavy module is imported on the login screen, so it can gate CI.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app")
+
+# Libraries that must not be loaded before the user has logged in
+HEAVY_MODULES = ["pandas", "matplotlib", "seaborn", "sklearn", "scipy", "requests", "openai"]
+
+_PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+t1 = time.perf_counter()
+at = AppTest.from_file("main.py", default_timeout=120)
+at.run()
+t2 = time.perf_counter()
+print(json.dumps({
+    "streamlit_import_s": t1 - t0,
+    "first_run_s": t2 - t1,
+    "total_s": t2 - t0,
+    "exception": [str(e.value) for e in at.exception],
+    "heavy_loaded": [m for m in %r if m in sys.modules],
+}))
+"""
+
+
+def measure_once():
+    proc = subprocess.run(
+        [sys.executable, "-c", _PROBE % HEAVY_MODULES],
+        cwd=APP_DIR, capture_output=True, text=True, check=True,
+    )
+    # the probe prints exactly one JSON line; Streamlit may log around it
+    line = [l for l in proc.stdout.splitlines() if l.startswith("{")][-1]
+    return json.loads(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget", type=float, default=None, help="fail if median first run exceeds this (s)")
+    parser.add_argument("--json", dest="json_out", default=None, help="write raw results to this file")
+    args = parser.parse_args()
+
+    runs = [measure_once() for _ in range(args.runs)]
+    first = [r["first_run_s"] for r in runs]
+    total = [r["total_s"] for r in runs]
+    heavy = sorted({m for r in runs for m in r["heavy_loaded"]})
+    errors = [e for r in runs for e in r["exception"]]
+
+    print(f"runs:                {args.runs}")
+    print(f"first run (median):  {statistics.median(first):.3f}s  (min {min(first):.3f}s, max {max(first):.3f}s)")
+    print(f"incl. streamlit:     {statistics.median(total):.3f}s")
+    print(f"heavy modules:       {', '.join(heavy) or 'none'}")
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump({"runs": runs, "heavy_loaded": heavy}, f, indent=2)
+
+    failed = False
+    if errors:
+        print(f"❌ app raised during the first run: {errors[0]}")
+        failed = True
+    if heavy:
+        print(f"❌ heavy modules imported on the login screen: {', '.join(heavy)}")
+        failed = True
+    if args.budget is not None and statistics.median(first) > args.budget:
+        print(f"❌ median first run {statistics.median(first):.3f}s exceeds budget {args.budget:.3f}s")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
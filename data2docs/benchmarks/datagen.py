@@ -0,0 +1,117 @@
+# benchmarks/datagen.py
+"""Seeded synthetic datasets for the benchmark suite.
+
+Every generator is deterministic for a given ``(rows, seed)`` so runs on
+different machines or commits see exactly the same data.
+"""
+
+import io
+import json
+
+import numpy as np
+import pandas as pd
+
+DATASETS = ["wide", "tall", "high_cardinality", "missing_heavy", "nested_json"]
+
+
+def _rng(seed):
+    return np.random.default_rng(seed)
+
+
+def make_wide(rows=2_000, cols=400, seed=0):
+    """Many numeric columns, a few of them correlated, plus a handful of categoricals."""
+    rng = _rng(seed)
+    base = rng.normal(size=(rows, 8))
+    mix = rng.normal(size=(8, cols))
+    data = base @ mix * 0.5 + rng.normal(size=(rows, cols))
+    df = pd.DataFrame(data.astype("float64"), columns=[f"num_{i}" for i in range(cols)])
+    for i in range(5):
+        df[f"cat_{i}"] = rng.choice(["a", "b", "c", "d"], size=rows)
+    return df
+
+
+def make_tall(rows=1_000_000, seed=0):
+    """Event-log shape: many rows, a timestamp, a few numeric and categorical columns."""
+    rng = _rng(seed)
+    start = np.datetime64("2022-01-01T00:00:00")
+    df = pd.DataFrame({
+        "event_time": start + rng.integers(0, 3 * 365 * 24 * 3600, size=rows).astype("timedelta64[s]"),
+        "user_id": rng.integers(0, 50_000, size=rows),
+        "amount": rng.gamma(2.0, 30.0, size=rows).round(2),
+        "latency_ms": rng.lognormal(3.0, 0.6, size=rows).round(1),
+        "quantity": rng.integers(1, 10, size=rows),
+        "country": rng.choice(["IN", "US", "DE", "BR", "JP", "GB"], size=rows, p=[.4, .2, .1, .1, .1, .1]),
+        "status": rng.choice(["ok", "failed", "refunded"], size=rows, p=[.9, .07, .03]),
+    })
+    return df
+
+
+def make_high_cardinality(rows=200_000, seed=0):
+    """String columns with up to one distinct value per row."""
+    rng = _rng(seed)
+    df = pd.DataFrame({
+        "order_id": [f"ORD-{i:09d}" for i in rng.permutation(rows)],
+        "customer": [f"cust_{i}" for i in rng.integers(0, rows // 2, size=rows)],
+        "sku": [f"sku_{i}" for i in rng.zipf(1.3, size=rows) % 20_000],
+        "price": rng.uniform(1, 500, size=rows).round(2),
+        "qty": rng.integers(1, 5, size=rows),
+    })
+    return df
+
+
+def make_missing_heavy(rows=200_000, cols=20, missing=0.35, seed=0):
+    """Mixed numeric/categorical columns with a large share of NaNs."""
+    rng = _rng(seed)
+    df = pd.DataFrame(rng.normal(100, 15, size=(rows, cols)), columns=[f"m_{i}" for i in range(cols)])
+    for i in range(0, cols, 4):
+        df[f"m_{i}"] = rng.choice(["low", "mid", "high"], size=rows).astype(object)
+    mask = rng.random(size=df.shape) < missing
+    return df.mask(mask)
+
+
+def make_nested_records(rows=100_000, seed=0):
+    """List of nested JSON records with a schema that evolves halfway through."""
+    rng = _rng(seed)
+    ids = rng.integers(0, 10**9, size=rows)
+    scores = rng.normal(size=rows).round(4)
+    records = []
+    for i in range(rows):
+        rec = {
+            "id": int(ids[i]),
+            "user": {"name": f"user_{i % 5000}", "geo": {"lat": float(scores[i]), "country": "IN"}},
+            "metrics": {"clicks": i % 17, "views": i % 101},
+            "tags": ["a", "b"] if i % 3 else [],
+        }
+        if i > rows // 2:
+            rec["metrics"]["dwell_s"] = float(i % 300)  # column that only appears later
+        if i % 11 == 0:
+            del rec["user"]["geo"]  # ragged records
+        records.append(rec)
+    return records
+
+
+def make_dataset(kind, rows=None, seed=0):
+    """Return a DataFrame (or a list of records for ``nested_json``)."""
+    makers = {
+        "wide": make_wide,
+        "tall": make_tall,
+        "high_cardinality": make_high_cardinality,
+        "missing_heavy": make_missing_heavy,
+        "nested_json": make_nested_records,
+    }
+    if kind not in makers:
+        raise ValueError(f"Unknown dataset kind: {kind}")
+    return makers[kind](seed=seed) if rows is None else makers[kind](rows=rows, seed=seed)
+
+
+def as_upload(data, name):
+    """Wrap a dataset the way Streamlit hands uploads to ``load_data``."""
+    if isinstance(data, pd.DataFrame):
+        raw = data.to_csv(index=False).encode("utf-8")
+    elif isinstance(data, (list, dict)):
+        raw = json.dumps(data).encode("utf-8")
+    else:
+        raw = data
+    buf = io.BytesIO(raw)
+    buf.name = name
+    return buf
@@ -0,0 +1,80 @@
+# benchmarks/import_profile.py
+"""Import-time profile of the app's modules.
+
+Imports each module in a fresh interpreter under ``python -X importtime`` and
+prints the slowest imports it triggered, grouped by top-level package.
+
+    python benchmarks/import_profile.py                  # login-path modules
+    python benchmarks/import_profile.py eda charts automl --top 15
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app")
+
+DEFAULT_MODULES = ["api", "eda", "charts", "automl", "chat", "file_handler"]
+
+
+def profile_import(stmt):
+    """Return ``[(module, self_us, cumulative_us), ...]`` for one import statement."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", stmt],
+        cwd=APP_DIR, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"{stmt!r} failed:\n{proc.stderr.strip().splitlines()[-1]}")
+    rows = []
+    for line in proc.stderr.splitlines():
+        # "import time:       self [us] |  cumulative | imported package"
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, self_us, cum_us, name = [p.strip() for p in line.replace("import time:", "|", 1).split("|")]
+        rows.append((name.strip(), int(self_us), int(cum_us)))
+    return rows
+
+
+def summarize(rows, top):
+    by_package = defaultdict(int)
+    for name, self_us, _ in rows:
+        by_package[name.split(".")[0]] += self_us
+    total_us = sum(by_package.values())
+    ranked = sorted(by_package.items(), key=lambda kv: kv[1], reverse=True)[:top]
+    return total_us, ranked
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--baseline", default="streamlit",
+                        help="module imported first and excluded from the report (use '' for none)")
+    parser.add_argument("--json", dest="json_out", default=None)
+    args = parser.parse_args()
+
+    baseline = set()
+    if args.baseline:
+        baseline = {name for name, _, _ in profile_import(f"import {args.baseline}")}
+
+    report = {}
+    for module in args.modules:
+        stmt = f"import {args.baseline}; import {module}" if args.baseline else f"import {module}"
+        rows = [r for r in profile_import(stmt) if r[0] not in baseline]
+        total_us, ranked = summarize(rows, args.top)
+        report[module] = {"total_ms": total_us / 1000, "packages": {k: v / 1000 for k, v in ranked}}
+
+        print(f"\n== import {module}: {total_us / 1000:.1f} ms on top of '{args.baseline or 'nothing'}'")
+        for package, us in ranked:
+            print(f"   {us / 1000:9.1f} ms  {package}")
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+# benchmarks/llm_stub.py
+"""Local stand-in for the Groq/OpenAI chat-completions API.
+
+    with running_stub() as stub:
+        os.environ["GROQ_BASE_URL"] = stub.base_url
+        ...
+        print(stub.calls)
+
+``script`` is a list of HTTP status codes served in order (then 200 forever),
+e.g. ``[429, 429, 200]`` to exercise retry paths. 429s carry a Retry-After
+header of ``retry_after`` seconds.
+"""
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubState:
+    def __init__(self, script=None, latency=0.0, retry_after=0.05, reply="Stub insight: the data looks fine."):
+        self.script = list(script or [])
+        self.latency = latency
+        self.retry_after = retry_after
+        self.reply = reply
+        self.calls = 0
+        self.base_url = None
+        self.lock = threading.Lock()
+
+    def next_status(self):
+        with self.lock:
+            self.calls += 1
+            return self.script.pop(0) if self.script else 200
+
+
+def _make_handler(state):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status, body, headers=None):
+            payload = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            if not self.path.rstrip("/").endswith("/chat/completions"):
+                self._send(404, {"error": {"message": "not found"}})
+                return
+
+            status = state.next_status()
+            if state.latency:
+                time.sleep(state.latency)
+            if status == 429:
+                self._send(429, {"error": {"message": "Rate limit reached", "type": "rate_limit_exceeded"}},
+                           {"Retry-After": str(state.retry_after)})
+                return
+            if status != 200:
+                self._send(status, {"error": {"message": f"stub error {status}"}})
+                return
+
+            prompt_chars = sum(len(str(m.get("content", ""))) for m in request.get("messages", []))
+            self._send(200, {
+                "id": f"stub-{state.calls}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": request.get("model", "stub"),
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": state.reply},
+                    "finish_reason": "stop",
+                }],
+                "usage": {
+                    "prompt_tokens": prompt_chars // 4,
+                    "completion_tokens": len(state.reply) // 4,
+                    "total_tokens": (prompt_chars + len(state.reply)) // 4,
+                },
+            })
+
+    return Handler
+
+
+@contextmanager
+def running_stub(script=None, latency=0.0, retry_after=0.05, reply=None):
+    """Serve the stub on a free localhost port; yields its :class:`StubState`."""
+    state = StubState(script, latency, retry_after, **({"reply": reply} if reply else {}))
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _make_handler(state))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        host, port = server.server_address
+        state.base_url = f"http://{host}:{port}/v1"
+        yield state
+    finally:
+        server.shutdown()
+        server.server_close()
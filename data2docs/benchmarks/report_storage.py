@@ -0,0 +1,122 @@
+# benchmarks/report_storage.py
+"""Storage benchmark for versioned reports.
+
+Creates one report through the Flask API (temporary SQLite database), PUTs
+``--revisions`` locally edited versions of it, and reports raw versus stored
+bytes, write latency, read latency for the latest, a middle and the oldest
+version, and listing latency.
+
+    python benchmarks/report_storage.py --revisions 100 --size-kb 512
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from run_benchmarks import _load_backend  # noqa: E402
+
+
+def _document(size_kb, rng):
+    """Report-like text: a table of numbers with the occasional paragraph."""
+    lines, size = [], 0
+    while size < size_kb * 1024:
+        if rng.random() < 0.05:
+            line = "<p>" + " ".join(rng.choice(["revenue", "latency", "region", "growth", "outlier", "median"])
+                                    for _ in range(30)) + "</p>"
+        else:
+            line = "<tr>" + "".join(f"<td>{rng.gauss(0, 1000):.3f}</td>" for _ in range(8)) + "</tr>"
+        lines.append(line)
+        size += len(line) + 1
+    return lines
+
+
+def _edit(lines, rng):
+    """A local edit: rewrite a few nearby lines and sometimes append one."""
+    at = rng.randrange(len(lines))
+    for i in range(at, min(at + rng.randint(1, 5), len(lines))):
+        lines[i] = "<tr>" + "".join(f"<td>{rng.gauss(0, 1000):.3f}</td>" for _ in range(8)) + "</tr>"
+    if rng.random() < 0.3:
+        lines.append(f"<p>note {rng.random():.6f}</p>")
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    response = fn()
+    elapsed = time.perf_counter() - start
+    assert response.status_code < 300, response.get_json()
+    return elapsed, response
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--revisions", type=int, default=100)
+    parser.add_argument("--size-kb", type=int, default=512, help="approximate size of each version")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", dest="json_out", default=None, help="write raw results to this file")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        backend = _load_backend(os.path.join(tmp, "reports.db"))
+        client = backend.app.test_client()
+        creds = {"username": "bench", "password": "bench-pass"}
+        client.post("/api/signup", json=creds)
+        headers = {"Authorization": f"Bearer {client.post('/api/login', json=creds).get_json()['access_token']}"}
+
+        lines = _document(args.size_kb, rng)
+        raw_bytes = 0
+        content = "\n".join(lines)
+        _, response = _timed(lambda: client.post("/api/reports", json={"title": "bench", "content": content},
+                                                 headers=headers))
+        report_id = response.get_json()["id"]
+        raw_bytes += len(content.encode("utf-8"))
+
+        writes = []
+        for _ in range(args.revisions - 1):
+            _edit(lines, rng)
+            content = "\n".join(lines)
+            raw_bytes += len(content.encode("utf-8"))
+            elapsed, _ = _timed(lambda: client.put(f"/api/reports/{report_id}", json={"content": content},
+                                                   headers=headers))
+            writes.append(elapsed)
+
+        with backend.app.app_context():
+            stored_bytes = backend.db.session.get(backend.ReportMeta, report_id).stored_bytes
+
+        reads = {}
+        for label, version in [("latest", args.revisions), ("middle", args.revisions // 2 or 1), ("oldest", 1)]:
+            times = [_timed(lambda: client.get(f"/api/reports/{report_id}?version={version}", headers=headers))[0]
+                     for _ in range(5)]
+            reads[label] = statistics.median(times)
+        listing = statistics.median(_timed(lambda: client.get("/api/reports", headers=headers))[0]
+                                    for _ in range(5))
+
+    results = {
+        "revisions": args.revisions,
+        "raw_bytes": raw_bytes,
+        "stored_bytes": stored_bytes,
+        "ratio": round(raw_bytes / max(stored_bytes, 1), 1),
+        "write_median_s": statistics.median(writes) if writes else None,
+        "write_max_s": max(writes) if writes else None,
+        "read_s": reads,
+        "list_s": listing,
+    }
+    print(f"{args.revisions} revisions of ~{args.size_kb} KB: {raw_bytes / 1e6:.1f} MB raw, "
+          f"{stored_bytes / 1e6:.2f} MB stored ({results['ratio']}x)")
+    if writes:
+        print(f"write: median {results['write_median_s'] * 1000:.1f} ms, max {results['write_max_s'] * 1000:.1f} ms")
+    print("read: " + ", ".join(f"{k} {v * 1000:.1f} ms" for k, v in reads.items()))
+    print(f"list: {listing * 1000:.1f} ms")
+    if args.json_out:
+        with open(args.json_out, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
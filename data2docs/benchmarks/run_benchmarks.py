@@ -0,0 +1,599 @@
+# benchmarks/run_benchmarks.py
+"""End-to-end performance benchmarks for Data2Docs.
+
+Times and memory-profiles the stages a user hits: loading an upload, cleaning
+it, the EDA panels, every dashboard chart type, AutoML, the Flask API and an
+LLM round-trip (against a local stub, never the real provider).
+
+    python benchmarks/run_benchmarks.py --scale small
+    python benchmarks/run_benchmarks.py --scale medium --only load_data eda
+    python benchmarks/run_benchmarks.py --compare benchmarks/results/<old>.json --fail-over 1.3
+
+Results are written as JSON to ``benchmarks/results/`` so runs can be compared
+across commits. Streamlit calls run in "bare mode": widgets return their
+defaults and nothing is sent to a browser, so only the computation is measured.
+"""
+
+import argparse
+import datetime
+import importlib.util
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+APP_DIR = os.path.join(ROOT_DIR, "app")
+BACKEND_DIR = os.path.join(ROOT_DIR, "backend")
+SHARED_DIR = os.path.join(ROOT_DIR, "shared")
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+
+os.environ.setdefault("MPLBACKEND", "Agg")
+sys.path.insert(0, APP_DIR)
+sys.path.insert(0, BENCH_DIR)
+sys.path.append(SHARED_DIR)  # what app/main.py and the Procfile's --pythonpath provide
+
+# rows per dataset for each scale
+SCALES = {
+    "small": {"wide": 2_000, "tall": 50_000, "high_cardinality": 20_000, "missing_heavy": 20_000,
+              "nested_json": 10_000, "automl": 5_000},
+    "medium": {"wide": 20_000, "tall": 1_000_000, "high_cardinality": 200_000, "missing_heavy": 200_000,
+               "nested_json": 100_000, "automl": 50_000},
+    "large": {"wide": 100_000, "tall": 10_000_000, "high_cardinality": 2_000_000, "missing_heavy": 2_000_000,
+              "nested_json": 1_000_000, "automl": 500_000},
+}
+
+STAGES = ["load_data", "dataset_store", "auto_handle_missing", "eda", "dataset_diff", "charts", "report", "automl", "flask", "llm"]
+
+
+# ---------------- MEASUREMENT ----------------
+def _rss_mb():
+    """Current resident set size, or None where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class _RssSampler(threading.Thread):
+    """Polls RSS while a call runs; cheap enough to leave on for every case."""
+
+    def __init__(self, interval=0.005):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.baseline = _rss_mb()
+        self.peak = self.baseline
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            rss = _rss_mb()
+            if rss is not None and rss > self.peak:
+                self.peak = rss
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+        if self.baseline is None:
+            return None
+        return max(self.peak - self.baseline, 0.0)
+
+
+def measure(fn, repeat=3, warmup=1, trace_alloc=False):
+    """Run ``fn`` and return wall-time stats plus memory growth.
+
+    ``peak_rss_delta_mb`` is the RSS high-water mark above the starting RSS
+    during the first timed run. ``trace_alloc`` adds an extra tracemalloc pass
+    (exact Python/NumPy allocations, but very slow around matplotlib).
+    """
+    for _ in range(warmup):
+        fn()
+    times = []
+    rss_delta = None
+    for i in range(repeat):
+        sampler = _RssSampler() if i == 0 else None
+        if sampler:
+            sampler.start()
+        t0 = time.perf_counter()
+        try:
+            fn()
+        finally:
+            elapsed = time.perf_counter() - t0
+            if sampler:
+                rss_delta = sampler.stop()
+        times.append(elapsed)
+    stats = {
+        "median_s": statistics.median(times),
+        "min_s": min(times),
+        "max_s": max(times),
+        "runs": repeat,
+        "peak_rss_delta_mb": rss_delta,
+    }
+    if trace_alloc:
+        tracemalloc.start()
+        try:
+            fn()
+            stats["peak_alloc_mb"] = tracemalloc.get_traced_memory()[1] / 1e6
+        finally:
+            tracemalloc.stop()
+    return stats
+
+
+class Runner:
+    def __init__(self, repeat, trace_alloc=False):
+        self.repeat = repeat
+        self.trace_alloc = trace_alloc
+        self.results = []
+
+    def bench(self, stage, case, fn, **meta):
+        print(f"  {stage:<20} {case:<40}", end="", flush=True)
+        try:
+            stats = measure(fn, repeat=self.repeat, trace_alloc=self.trace_alloc)
+        except Exception as e:
+            print(f"FAILED: {e}")
+            self.results.append({"stage": stage, "case": case, "error": str(e), **meta})
+            return
+        rss = stats["peak_rss_delta_mb"]
+        print(f"{stats['median_s'] * 1000:10.1f} ms" + (f"  +{rss:7.1f} MB" if rss is not None else ""))
+        self.results.append({"stage": stage, "case": case, **stats, **meta})
+
+
+# ---------------- STAGES ----------------
+def bench_load_data(runner, data):
+    from file_handler import load_data
+    from datagen import as_upload
+
+    for kind, frame in data.items():
+        if kind == "nested_json":
+            raw = json.dumps(frame).encode("utf-8")
+            names = ["nested.json"]
+        else:
+            raw = frame.to_csv(index=False).encode("utf-8")
+            names = [f"{kind}.csv"]
+        for name in names:
+            runner.bench("load_data", name, lambda: load_data(as_upload(raw, name)),
+                         bytes=len(raw), rows=len(frame))
+
+
+def bench_dataset_store(runner, frames):
+    import gc
+    from datagen import as_upload
+    from dataset_store import DatasetStore, content_key
+    from file_handler import load_data
+
+    raw = frames["tall"].to_csv(index=False).encode("utf-8")
+
+    def sessions(n=12):
+        """n sessions open the same upload; only the first one parses it."""
+        store = DatasetStore(1 << 40, tempfile.gettempdir())
+        handles = []
+        for _ in range(n):
+            upload = as_upload(raw, "tall.csv")
+            handles.append(store.get_or_load(content_key(upload), lambda upload=upload: load_data(upload)))
+        if store.stats()["datasets"] != 1:
+            raise RuntimeError("sessions did not share the dataset")
+
+    runner.bench("dataset_store", "12 sessions, one upload", sessions, bytes=len(raw), rows=len(frames["tall"]))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = DatasetStore(0, tmp)  # zero budget: every other access spills
+        a = store.get_or_load("a", lambda: frames["tall"])
+        b = store.get_or_load("b", lambda: frames["wide"])
+        runner.bench("dataset_store", "reload after spill (tall)", lambda: (a.frame, b.frame),
+                     rows=len(frames["tall"]))
+        del a, b
+        gc.collect()  # release the memory maps before the temp dir goes
+
+
+def bench_auto_handle_missing(runner, frames):
+    from eda import auto_handle_missing
+
+    for kind in ("missing_heavy", "wide", "high_cardinality"):
+        df = frames[kind]
+        runner.bench("auto_handle_missing", kind, lambda: auto_handle_missing(df), rows=len(df), cols=df.shape[1])
+
+
+def bench_eda(runner, frames):
+    import matplotlib.pyplot as plt
+    import eda
+
+    from outliers import isolation_forest
+
+    funcs = [eda.show_basic_info, eda.show_missing_values, eda.show_summary_stats,
+             eda.show_outliers, eda.show_correlation_heatmap, eda.show_custom_plot]
+    for kind in ("wide", "tall", "missing_heavy"):
+        df = frames[kind]
+        for fn in funcs:
+            if fn is eda.show_custom_plot and len(df) > 200_000:
+                continue  # seaborn scatter of every row; measured on the smaller frames
+
+            def run(fn=fn, df=df):
+                fn(df)
+                plt.close("all")
+
+            runner.bench("eda", f"{fn.__name__}[{kind}]", run, rows=len(df), cols=df.shape[1])
+        # behind a checkbox in the app, so bare mode never reaches it
+        runner.bench("eda", f"isolation_forest[{kind}]", lambda df=df: isolation_forest(df),
+                     rows=len(df), cols=df.shape[1])
+
+
+def bench_dataset_diff(runner, frames):
+    import numpy as np
+    import pandas as pd
+    from dataset_diff import diff_datasets
+
+    # "today's extract": 1% of rows gone, 1% edited, 1% new
+    old = frames["tall"].assign(row_id=np.arange(len(frames["tall"])))
+    n = len(old)
+    rng = np.random.default_rng(0)
+    new = old.drop(index=rng.choice(n, n // 100, replace=False))
+    edited = rng.random(len(new)) < 0.01
+    new = new.assign(amount=np.where(edited, new["amount"] * 1.1, new["amount"]))
+    fresh = old.head(n // 100).assign(row_id=np.arange(n, n + n // 100))
+    new = pd.concat([new, fresh], ignore_index=True)
+
+    runner.bench("dataset_diff", "by content (tall)", lambda: diff_datasets(old, new), rows=n)
+    runner.bench("dataset_diff", "by key (tall)", lambda: diff_datasets(old, new, ["row_id"]), rows=n)
+
+
+def bench_charts(runner, frames):
+    import matplotlib.pyplot as plt
+    from charts import chart_options, render_chart
+
+    for kind in ("tall", "wide"):
+        df = frames[kind]
+        for chart in chart_options:
+            def run(chart=chart, df=df):
+                render_chart(df, chart, key_prefix="bench")
+                plt.close("all")
+
+            runner.bench("charts", f"{chart}[{kind}]", run, rows=len(df), cols=df.shape[1])
+
+    # the line chart above hits the rollup cache after its first run; measure the build itself
+    import pandas as pd
+    from rollups import build_rollups
+
+    tall = frames["tall"]
+    runner.bench("charts", "build_rollups[tall]", lambda: build_rollups(tall["event_time"], tall["amount"]),
+                 rows=len(tall))
+    rollups = build_rollups(tall["event_time"], tall["amount"])
+    runner.bench("charts", "rollups zoom: full / one day", lambda: (rollups.select(),
+                 rollups.select(rollups.start, rollups.start + pd.Timedelta(days=1))))
+
+
+def bench_report(runner, frames):
+    from report_builder import SectionCache, build_report, standard_sections
+
+    df = frames["tall"]
+    numeric = df.select_dtypes(include="number").columns.tolist()
+    specs = []
+    for i in range(25):  # 3 profile sections + 25 charts + AutoML + narrative = 30 sections
+        col = numeric[i % len(numeric)]
+        kind = i % 5
+        if kind == 0:
+            specs.append({"chart": "Histogram", "title": f"Histogram {i}", "column": col, "bins": 20 + i})
+        elif kind == 1:
+            specs.append({"chart": "Boxplot", "title": f"Boxplot {i}", "columns": [col]})
+        elif kind == 2:
+            specs.append({"chart": "Line Chart", "title": f"Trend {i}", "x": "event_time", "y": col, "stat": "mean"})
+        elif kind == 3:
+            specs.append({"chart": "Bar Chart (Categorical)", "title": f"Bar {i}", "column": "country"})
+        else:
+            specs.append({"chart": "Scatter Plot", "title": f"Scatter {i}", "x": col,
+                          "y": numeric[(i + 1) % len(numeric)]})
+    automl = {"target": "status", "problem_type": "classification", "best_model": "Random Forest",
+              "scores": {"Logistic Regression": 0.61, "Random Forest": 0.74}}
+    insights = "The dataset looks healthy.\n\nAmounts are right-skewed; latency has a long tail."
+
+    def sections(edited=0):
+        specs[0]["title"] = f"Histogram 0 (edit {edited})"
+        return standard_sections(df, specs, automl, insights)
+
+    if len(sections()) != 30:
+        raise RuntimeError("expected a 30-section report")
+    runner.bench("report", "full build (30 sections)",
+                 lambda: build_report(sections(), section_cache=SectionCache(1 << 30)), rows=len(df))
+
+    warm = SectionCache(1 << 30)
+    build_report(sections(), section_cache=warm)
+    edits = iter(range(1, 10**6))
+    runner.bench("report", "rebuild after one chart edit",
+                 lambda: build_report(sections(next(edits)), section_cache=warm), rows=len(df))
+
+
+def bench_automl(runner, frames, rows):
+    from automl import train_automl
+
+    tall = frames["tall"].head(rows)
+    cls = tall[["status", "amount", "latency_ms", "quantity", "country"]]
+    reg = tall[["amount", "latency_ms", "quantity", "country", "status"]]
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)  # the model registry defaults to ./model_registry under the cwd
+        try:
+            runner.bench("automl", "classification", lambda: train_automl(cls, "status"), rows=len(cls))
+            runner.bench("automl", "regression", lambda: train_automl(reg, "amount"), rows=len(reg))
+        finally:
+            os.chdir(cwd)
+
+    # progressive search over the whole tall frame, as the UI runs it past 100k rows
+    import pandas as pd
+    from progressive_automl import progressive_search
+
+    tall = frames["tall"]
+    runs = {}
+
+    def progressive(problem_type, target, inputs):
+        X = pd.get_dummies(tall[inputs], drop_first=True)
+        runs[problem_type] = progressive_search(X, tall[target], problem_type, budget_s=30)
+
+    runner.bench("automl", "progressive classification (30s budget)",
+                 lambda: progressive("classification", "status", ["amount", "latency_ms", "quantity", "country"]),
+                 rows=len(tall))
+    runner.bench("automl", "progressive regression (30s budget)",
+                 lambda: progressive("regression", "amount", ["latency_ms", "quantity", "country", "status"]),
+                 rows=len(tall))
+    for problem_type, run in runs.items():
+        print(f"    {problem_type}: {run['best_name']} = {run['best_score']:.4f} on {run['train_rows']:,} rows, "
+              f"stopped on {run['stop_reason']}, refit={run['refit']}")
+
+
+def _load_backend(db_path):
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.environ["MODEL_REGISTRY_DIR"] = os.path.join(os.path.dirname(db_path), "models")
+    os.environ.setdefault("FLASK_JWT_SECRET_KEY", "bench-secret-key-with-enough-bytes-for-hs256")
+    # appended, not prepended: app/ and backend/ both have a chat_with_groq module
+    if BACKEND_DIR not in sys.path:
+        sys.path.append(BACKEND_DIR)
+    spec = importlib.util.spec_from_file_location("backend_main", os.path.join(BACKEND_DIR, "main.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def bench_flask(runner, frames):
+    with tempfile.TemporaryDirectory() as tmp:
+        backend = _load_backend(os.path.join(tmp, "bench.db"))
+        client = backend.app.test_client()
+        creds = {"username": "bench", "password": "bench-pass"}
+        client.post("/api/signup", json=creds)
+        token = client.post("/api/login", json=creds).get_json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        content = frames["tall"].head(2_000).describe(include="all").to_json()
+        report_id = {"id": None}
+
+        def create():
+            client.post("/api/reports", json={"title": "bench", "content": content}, headers=headers)
+
+        create()
+        report_id["id"] = client.get("/api/reports", headers=headers).get_json()[0]["id"]
+
+        counter = {"n": 0}
+
+        def signup():
+            counter["n"] += 1
+            client.post("/api/signup", json={"username": f"user{counter['n']}", "password": "pw"})
+
+        runner.bench("flask", "POST /api/signup", signup)
+        runner.bench("flask", "POST /api/login", lambda: client.post("/api/login", json=creds))
+        runner.bench("flask", "POST /api/reports", create, bytes=len(content))
+        runner.bench("flask", "GET /api/reports", lambda: client.get("/api/reports", headers=headers))
+        runner.bench("flask", "PUT /api/reports/<id>",
+                     lambda: client.put(f"/api/reports/{report_id['id']}", json={"content": content + " "},
+                                        headers=headers))
+        runner.bench("flask", "GET /api/reports/<id>",
+                     lambda: client.get(f"/api/reports/{report_id['id']}", headers=headers))
+
+        # batch scoring: a model saved the way the AutoML block saves it, scored over the whole tall frame
+        import pandas as pd
+        from sklearn.ensemble import RandomForestClassifier
+        from model_registry import save_model
+
+        tall = frames["tall"]
+        inputs = ["amount", "latency_ms", "quantity", "country"]
+        X = pd.get_dummies(tall[inputs].head(5_000), drop_first=True)
+        model = RandomForestClassifier(random_state=0).fit(X, tall["status"].head(5_000))
+        meta = save_model(model, "bench", tall.head(5_000), {
+            "input_columns": inputs, "categorical_columns": ["country"],
+            "feature_columns": X.columns.tolist(),
+        }, root=os.environ["MODEL_REGISTRY_DIR"])
+        payload = tall[["user_id"] + inputs].to_csv(index=False).encode("utf-8")
+
+        def predict():
+            res = client.post(f"/api/models/{meta['dataset_id']}/predict?id_column=user_id",
+                              data=payload, content_type="text/csv", headers=headers)
+            if res.status_code != 200:
+                raise RuntimeError(res.get_data(as_text=True))
+            res.get_data()  # drain the streamed body
+
+        runner.bench("flask", "POST /api/models/<id>/predict", predict, rows=len(tall), bytes=len(payload))
+        with backend.app.app_context():
+            backend.db.engine.dispose()  # release the SQLite file before the temp dir goes
+
+
+def bench_llm(runner, frames):
+    from llm_stub import running_stub
+
+    with running_stub(latency=0.02) as stub:
+        os.environ["GROQ_BASE_URL"] = stub.base_url
+        os.environ.setdefault("GROQ_API_KEY", "stub-key")
+        # measure the gateway's overhead, not its rate limits
+        os.environ.setdefault("LLM_USER_TOKENS_PER_MIN", "100000000")
+        os.environ.setdefault("LLM_GLOBAL_TOKENS_PER_MIN", "100000000")
+        from chat_with_groq import chat_with_groq
+
+        preview = frames["tall"].head(5).to_string(index=False)
+        messages = [
+            {"role": "system", "content": "You're a helpful data analyst."},
+            {"role": "user", "content": f"Here's a preview of the data:\n\n{preview}"},
+        ]
+        runner.bench("llm", "chat_with_groq (stub, 20ms)", lambda: chat_with_groq(messages))
+
+        def burst(n=8):
+            """n sessions ask the same question at once; the stub must see one call."""
+            calls = stub.calls
+            barrier = threading.Barrier(n)
+            errors = []
+
+            def ask():
+                barrier.wait()
+                try:
+                    chat_with_groq(messages, user="bench")
+                except Exception as e:
+                    errors.append(e)
+
+            threads = [threading.Thread(target=ask) for _ in range(n)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            if errors:
+                raise errors[0]
+            if stub.calls - calls != 1:
+                raise RuntimeError(f"{stub.calls - calls} provider calls for one coalesced burst")
+
+        runner.bench("llm", "coalesced burst x8 (stub, 20ms)", burst)
+
+        def after_429s():
+            calls = stub.calls
+            stub.script.extend([429, 429])
+            chat_with_groq(messages)
+            if stub.calls - calls != 3:
+                raise RuntimeError(f"expected 2 retries, saw {stub.calls - calls - 1}")
+
+        runner.bench("llm", "2x 429 + Retry-After 50ms (stub)", after_429s)
+
+
+# ---------------- RESULTS ----------------
+def _git_sha():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def _versions():
+    from importlib.metadata import PackageNotFoundError, version
+
+    out = {}
+    for name in ("pandas", "numpy", "matplotlib", "seaborn", "scikit-learn", "streamlit", "flask", "pyarrow"):
+        try:
+            out[name] = version(name)
+        except PackageNotFoundError:
+            pass
+    return out
+
+
+def compare(current, baseline_path, fail_over=None):
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    base = {(r["stage"], r["case"]): r for r in baseline["results"] if "median_s" in r}
+    regressions = []
+    print(f"\n== compared with {os.path.basename(baseline_path)} ({baseline['meta'].get('git_sha')})")
+    for r in current:
+        old = base.get((r["stage"], r["case"]))
+        if not old or "median_s" not in r:
+            continue
+        ratio = r["median_s"] / old["median_s"] if old["median_s"] else float("inf")
+        flag = ""
+        if fail_over and ratio > fail_over:
+            flag = "  ❌ regression"
+            regressions.append(r)
+        print(f"  {r['stage']:<20} {r['case']:<40} {old['median_s'] * 1000:9.1f} -> "
+              f"{r['median_s'] * 1000:9.1f} ms  x{ratio:5.2f}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", choices=SCALES, default="small")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--only", nargs="*", choices=STAGES, default=None)
+    parser.add_argument("--trace-alloc", action="store_true",
+                        help="also record tracemalloc peaks (slow for plotting stages)")
+    parser.add_argument("--out", default=None, help="results file (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--compare", default=None, help="earlier results file to compare against")
+    parser.add_argument("--fail-over", type=float, default=None,
+                        help="with --compare: exit 1 if any case is slower by more than this factor")
+    args = parser.parse_args()
+
+    # Streamlit warns on every widget call outside `streamlit run`
+    logging.disable(logging.WARNING)
+    import streamlit  # noqa: F401  (import before the app modules, as the app does)
+    from datagen import make_dataset
+
+    stages = args.only or STAGES
+    rows = SCALES[args.scale]
+    print(f"Generating '{args.scale}' datasets (seed={args.seed})...")
+    data = {kind: make_dataset(kind, rows=rows[kind], seed=args.seed)
+            for kind in ("wide", "tall", "high_cardinality", "missing_heavy", "nested_json")}
+    frames = {k: v for k, v in data.items() if k != "nested_json"}
+
+    runner = Runner(args.repeat, trace_alloc=args.trace_alloc)
+
+    for stage in stages:
+        print(f"\n[{stage}]")
+        if stage == "load_data":
+            bench_load_data(runner, data)
+        elif stage == "dataset_store":
+            bench_dataset_store(runner, frames)
+        elif stage == "auto_handle_missing":
+            bench_auto_handle_missing(runner, frames)
+        elif stage == "eda":
+            bench_eda(runner, frames)
+        elif stage == "dataset_diff":
+            bench_dataset_diff(runner, frames)
+        elif stage == "charts":
+            bench_charts(runner, frames)
+        elif stage == "report":
+            bench_report(runner, frames)
+        elif stage == "automl":
+            bench_automl(runner, frames, rows["automl"])
+        elif stage == "flask":
+            bench_flask(runner, frames)
+        elif stage == "llm":
+            bench_llm(runner, frames)
+
+    now = datetime.datetime.now(datetime.timezone.utc)
+    payload = {
+        "meta": {
+            "timestamp": now.isoformat(),
+            "git_sha": _git_sha(),
+            "scale": args.scale,
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "versions": _versions(),
+        },
+        "results": runner.results,
+    }
+    out = args.out or os.path.join(RESULTS_DIR, f"{now:%Y%m%d-%H%M%S}-{args.scale}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2)
+    print(f"\n📄 Results written to {out}")
+
+    if args.compare:
+        regressions = compare(runner.results, args.compare, args.fail_over)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
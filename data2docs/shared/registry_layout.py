@@ -0,0 +1,39 @@
+# shared/registry_layout.py
+"""On-disk layout of the AutoML model registry, shared by app and backend.
+
+    <MODEL_REGISTRY_DIR>/<user_slug>/<dataset_id>/v<N>/model.joblib
+                                                      /meta.json
+
+The Streamlit app writes versions (app/model_registry.py) and the backend
+reads them for batch scoring (backend/model_serving.py). Both import this
+module, so the two sides cannot drift apart.
+"""
+
+import hashlib
+import os
+import re
+
+MODEL_FILE = "model.joblib"
+META_FILE = "meta.json"
+VERSION_RE = re.compile(r"^v(\d+)$")
+DATASET_RE = re.compile(r"^[0-9a-f]{16}$")
+
+
+def user_slug(user):
+    """Filesystem-safe, collision-free directory name for a username."""
+    user = str(user or "anonymous")
+    readable = re.sub(r"[^A-Za-z0-9_.-]", "_", user)[:40]
+    return f"{readable}-{hashlib.sha1(user.encode('utf-8')).hexdigest()[:8]}"
+
+
+def registry_root():
+    """``$MODEL_REGISTRY_DIR``, read on use so app and backend in one process can point elsewhere."""
+    return os.environ.get("MODEL_REGISTRY_DIR", "model_registry")
+
+
+def user_dir(user, root=None):
+    return os.path.join(root or registry_root(), user_slug(user))
+
+
+def dataset_dir(user, ds_id, root=None):
+    return os.path.join(user_dir(user, root), ds_id)
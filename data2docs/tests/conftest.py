@@ -0,0 +1,42 @@
+# tests/conftest.py
+
+import importlib.util
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_DIR = os.path.join(ROOT, "app")
+BACKEND_DIR = os.path.join(ROOT, "backend")
+SHARED_DIR = os.path.join(ROOT, "shared")
+
+# the app's flat imports first; backend/ is appended because both have a chat_with_groq module
+if APP_DIR not in sys.path:
+    sys.path.insert(0, APP_DIR)
+if BACKEND_DIR not in sys.path:
+    sys.path.append(BACKEND_DIR)
+if SHARED_DIR not in sys.path:
+    sys.path.append(SHARED_DIR)
+
+
+@pytest.fixture(scope="session")
+def backend(tmp_path_factory):
+    """backend/main.py on a fresh SQLite database and model registry, with one user "tester"."""
+    tmp = tmp_path_factory.mktemp("backend")
+    os.environ["DATABASE_URL"] = f"sqlite:///{tmp / 'test.db'}"
+    os.environ["MODEL_REGISTRY_DIR"] = str(tmp / "models")
+    os.environ.setdefault("FLASK_JWT_SECRET_KEY", "test-secret-key-with-enough-bytes-for-hs256")
+    spec = importlib.util.spec_from_file_location("backend_main", os.path.join(BACKEND_DIR, "main.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    client = module.app.test_client()
+    creds = {"username": "tester", "password": "tester-pass"}
+    client.post("/api/signup", json=creds)
+    token = client.post("/api/login", json=creds).get_json()["access_token"]
+    module.client = client
+    module.auth = {"Authorization": f"Bearer {token}"}
+    with module.app.app_context():
+        module.user_id = module.User.query.filter_by(username="tester").one().id
+        yield module
@@ -0,0 +1,63 @@
+# tests/test_correlation.py
+
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from correlation import cramers_v_pairs, top_correlations
+
+
+@pytest.fixture
+def numeric():
+    rng = np.random.default_rng(1)
+    base = rng.normal(size=500)
+    return pd.DataFrame({
+        "a": base,
+        "b": base * 2 + rng.normal(scale=0.5, size=500),
+        "c": -base + rng.normal(scale=2.0, size=500),
+        "d": rng.normal(size=500),
+        "e": np.exp(base),
+        "const": 1.0,
+    })
+
+
+@pytest.mark.parametrize("method", ["pearson", "spearman"])
+@pytest.mark.parametrize("block_size", [256, 2])
+def test_top_correlations_match_df_corr(numeric, method, block_size):
+    pairs = top_correlations(numeric, method=method, k=100, block_size=block_size)
+    expected = numeric.drop(columns="const").corr(method=method)
+    n = expected.shape[0]
+    assert len(pairs) == n * (n - 1) // 2  # every pair once; the constant column is dropped
+    for row in pairs.itertuples():
+        assert row.corr == pytest.approx(expected.loc[row.column_a, row.column_b], abs=1e-3)
+    assert (pairs["corr"].abs().diff().dropna() <= 0).all()  # strongest first
+
+
+def test_top_correlations_keeps_the_k_strongest(numeric):
+    expected = numeric.drop(columns="const").corr()
+    strongest = sorted((abs(expected.loc[a, b]), frozenset((a, b)))
+                       for a, b in itertools.combinations(expected.columns, 2))[-3:]
+    pairs = top_correlations(numeric, k=3, block_size=2)
+    assert {frozenset((r.column_a, r.column_b)) for r in pairs.itertuples()} == {p for _, p in strongest}
+
+
+def test_cramers_v_ranks_dependent_pairs_first():
+    rng = np.random.default_rng(2)
+    n = 2_000
+    city = rng.choice(["x", "y", "z"], size=n)
+    df = pd.DataFrame({
+        "city": city,
+        "region": pd.Series(city).map({"x": "north", "y": "south", "z": "south"}),
+        "same": pd.Series(city).map({"x": "X", "y": "Y", "z": "Z"}),
+        "noise": rng.choice(["p", "q"], size=n),
+        "amount": rng.normal(size=n),  # numeric columns are ignored
+    })
+    pairs = cramers_v_pairs(df)
+    v = {frozenset((r.column_a, r.column_b)): r.corr for r in pairs.itertuples()}
+    assert len(v) == 6
+    assert v[frozenset(("city", "same"))] == pytest.approx(1.0)
+    assert v[frozenset(("city", "region"))] > 0.5
+    assert v[frozenset(("city", "noise"))] < 0.05
+    assert pairs.iloc[0]["corr"] == pytest.approx(1.0)
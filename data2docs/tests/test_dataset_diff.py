@@ -0,0 +1,91 @@
+# tests/test_dataset_diff.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dataset_diff import PSI_MAJOR, PSI_MODERATE, column_drift, diff_datasets, drift_summary, severity
+
+
+@pytest.fixture
+def versions():
+    old = pd.DataFrame({"id": [1, 2, 3, 4], "city": ["a", "b", "c", "d"], "amount": [10.0, 20.0, 30.0, 40.0]})
+    # id 2 removed, id 3 changed, id 5 added; rows also reordered
+    new = pd.DataFrame({"id": [4, 5, 1, 3], "city": ["d", "e", "a", "c"], "amount": [40.0, 50.0, 10.0, 31.0]})
+    return old, new
+
+
+def test_content_diff(versions):
+    old, new = versions
+    diff = diff_datasets(old, new)
+    assert (diff["added"], diff["removed"], diff["changed"]) == (2, 2, 0)
+    assert sorted(new.iloc[diff["added_rows"]]["id"]) == [3, 5]
+    assert sorted(old.iloc[diff["removed_rows"]]["id"]) == [2, 3]
+
+
+def test_key_diff(versions):
+    old, new = versions
+    diff = diff_datasets(old, new, key_columns=["id"])
+    assert (diff["added"], diff["removed"], diff["changed"]) == (1, 1, 1)
+    assert new.iloc[diff["added_rows"]]["id"].tolist() == [5]
+    assert old.iloc[diff["removed_rows"]]["id"].tolist() == [2]
+    assert new.iloc[diff["changed_rows"]]["id"].tolist() == [3]
+    assert diff["changed_by_column"].to_dict() == {"amount": 1, "city": 0}
+    assert "id" not in set(diff["drift"]["column"])
+
+
+def test_dtype_change_alone_is_not_a_change(versions):
+    old, new = versions
+    diff = diff_datasets(old.assign(amount=old["amount"].astype("int64")), old, key_columns=["id"])
+    assert (diff["added"], diff["removed"], diff["changed"]) == (0, 0, 0)
+    assert diff["dtype_changes"] == {"amount": ("int64", "float64")}
+
+
+def test_duplicate_keys_raise(versions):
+    old, new = versions
+    with pytest.raises(ValueError, match="not unique in the new version"):
+        diff_datasets(old, pd.concat([new, new.head(1)]), key_columns=["id"])
+    with pytest.raises(ValueError, match="missing"):
+        diff_datasets(old, new.drop(columns="city"), key_columns=["city"])
+
+
+def test_list_cells_are_compared_by_value():
+    old = pd.DataFrame({"id": [1, 2, 3], "tags": [["x"], ["y", "z"], []], "meta": [{"a": 1}, {"b": 2}, None]})
+    new = pd.DataFrame({"id": [1, 2, 3], "tags": [["x"], ["z", "y"], []], "meta": [{"a": 1}, {"b": 2}, None]})
+    diff = diff_datasets(old, new, key_columns=["id"])
+    assert diff["changed"] == 1
+    assert new.iloc[diff["changed_rows"]]["id"].tolist() == [2]
+    assert diff["changed_by_column"].to_dict() == {"tags": 1, "meta": 0}
+    assert diff_datasets(old, new)["added"] == 1
+    drift = diff["drift"].set_index("column")
+    assert drift.loc["meta", "psi"] == pytest.approx(0.0)
+    assert drift.loc["tags", "new_categories"] == 1
+
+
+def test_psi_thresholds():
+    rng = np.random.default_rng(0)
+    base = pd.DataFrame({"x": rng.normal(0, 1, 20_000), "c": rng.choice(list("abc"), 20_000)})
+    same = pd.DataFrame({"x": rng.normal(0, 1, 20_000), "c": rng.choice(list("abc"), 20_000)})
+    shifted = pd.DataFrame({"x": rng.normal(1, 1, 20_000), "c": rng.choice(list("abcd"), 20_000)})
+
+    stable = column_drift(base, same, ["x", "c"]).set_index("column")
+    assert (stable["psi"] < PSI_MODERATE).all()
+    assert (stable["severity"] == "stable").all()
+
+    drift = column_drift(base, shifted, ["x", "c"]).set_index("column")
+    assert drift.loc["x", "psi"] >= PSI_MAJOR
+    assert drift.loc["x", "kind"] == "numeric"
+    assert drift.loc["c", "new_categories"] == 1
+    assert drift.loc["c", "psi"] >= PSI_MODERATE
+
+    assert [severity(p) for p in (0.0, PSI_MODERATE, PSI_MAJOR)] == ["stable", "moderate", "major"]
+
+
+def test_drift_summary_lists_only_drifted_columns():
+    rng = np.random.default_rng(1)
+    old = pd.DataFrame({"x": rng.normal(0, 1, 5_000), "y": rng.normal(0, 1, 5_000)})
+    new = pd.DataFrame({"x": rng.normal(2, 1, 5_000), "y": rng.normal(0, 1, 5_000)})
+    summary = drift_summary(diff_datasets(old, new))
+    assert list(summary["drifted_columns"]) == ["x"]
+    assert summary["drifted_columns"]["x"]["severity"] == "major"
+    assert summary["rows"] == [5_000, 5_000]
@@ -0,0 +1,111 @@
+# tests/test_dataset_store.py
+
+import gc
+import io
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dataset_store import DatasetStore, content_key
+
+
+def _frame(n=1_000, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({"x": rng.normal(size=n), "city": rng.choice(["a", "b"], size=n)})
+
+
+class Loader:
+    def __init__(self, frame):
+        self.frame = frame
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.frame
+
+
+@pytest.fixture
+def store(tmp_path):
+    return DatasetStore(1 << 30, str(tmp_path))
+
+
+def test_identical_uploads_share_one_frame(store):
+    assert content_key(io.BytesIO(b"a,b\n1,2\n")) == content_key(io.BytesIO(b"a,b\n1,2\n"))
+    loader = Loader(_frame())
+    first = store.get_or_load("k", loader)
+    second = store.get_or_load("k", loader)
+    assert loader.calls == 1
+    assert first.frame is second.frame
+    assert store.stats()["datasets"] == 1 and store.stats()["sessions"] == 2
+
+
+def test_entry_is_dropped_with_its_last_handle(store):
+    first = store.get_or_load("k", Loader(_frame()))
+    second = store.get_or_load("k", Loader(_frame()))
+    del first
+    gc.collect()
+    assert store.stats()["datasets"] == 1
+    del second
+    gc.collect()
+    assert store.stats()["datasets"] == 0
+
+
+def test_spill_and_reload_over_budget(tmp_path):
+    store = DatasetStore(0, str(tmp_path))  # zero budget: everything but the latest spills
+    a_frame, b_frame = _frame(seed=1), _frame(seed=2)
+    a = store.get_or_load("a", lambda: a_frame)
+    b = store.get_or_load("b", lambda: b_frame)
+    assert store.stats()["resident"] == 1
+    assert os.listdir(tmp_path) == ["a.arrow"]
+    pd.testing.assert_frame_equal(a.frame, a_frame)  # reloaded from the spill file; b spills now
+    pd.testing.assert_frame_equal(b.frame, b_frame)
+    del a, b
+    gc.collect()
+    assert os.listdir(tmp_path) == []  # spill files go with their entries
+
+
+def test_frames_arrow_cannot_store_stay_resident(tmp_path):
+    store = DatasetStore(0, str(tmp_path))
+    mixed = pd.DataFrame({"v": [1, "two", 3.0]}, dtype=object)
+    handle = store.get_or_load("mixed", lambda: mixed)
+    store.get_or_load("other", lambda: _frame())
+    assert handle.frame is mixed
+
+
+def test_derive_is_shared_per_parent_and_operation(store):
+    parent = store.get_or_load("k", Loader(_frame()))
+    calls = []
+
+    def double(df):
+        calls.append(1)
+        out = df.copy(deep=False)
+        out["x"] = df["x"] * 2
+        return out
+
+    first = store.derive(parent, "double", double)
+    second = store.derive(parent, "double", double)
+    assert len(calls) == 1 and first.key == "k:double"
+    assert first.frame is second.frame
+    np.testing.assert_array_equal(first.frame["x"], parent.frame["x"] * 2)
+    assert not np.shares_memory(first.frame["x"].to_numpy(), parent.frame["x"].to_numpy())
+
+
+def test_cached_on_frame_lives_as_long_as_the_frame():
+    import dataset_store
+
+    frame, calls = _frame(), []
+
+    def compute():
+        calls.append(1)
+        return len(calls)
+
+    assert dataset_store.cached_on_frame(frame, "n", compute) == 1
+    assert dataset_store.cached_on_frame(frame, "n", compute) == 1
+    assert dataset_store.cached_on_frame(frame, ("other", 1), compute) == 2
+    assert id(frame) in dataset_store._derived
+    frame_id = id(frame)
+    del frame
+    gc.collect()
+    assert frame_id not in dataset_store._derived
@@ -0,0 +1,72 @@
+# tests/test_file_handler.py
+
+import io
+import json
+
+import pandas as pd
+import pytest
+
+from file_handler import parse_datetime_columns, read_json_stream
+
+RAGGED = [
+    {"id": 1, "user": {"name": "a", "geo": {"lat": 1.5}}},
+    {"id": 2, "tags": ["x", "y"]},
+    {},
+    {"id": 4, "user": {"name": None}, "extra": "late column"},
+    {"id": 5, "user": {}},
+    {"id": 6, "user": {"name": "f", "geo": {"lat": -2.0, "lon": 3.0}}},
+]
+
+
+def _upload(text):
+    return io.BytesIO(text.encode("utf-8"))
+
+
+@pytest.mark.parametrize("chunk_rows,read_size", [(50_000, 1 << 20), (2, 7), (1, 3)])
+def test_ragged_ndjson_matches_json_normalize(chunk_rows, read_size):
+    ndjson = "\n".join(json.dumps(r) for r in RAGGED)
+    got = read_json_stream(_upload(ndjson), chunk_rows=chunk_rows, read_size=read_size)
+    expected = pd.json_normalize(RAGGED)
+    pd.testing.assert_frame_equal(got[expected.columns.tolist()], expected, check_dtype=False)
+    assert sorted(got.columns) == sorted(expected.columns)
+
+
+@pytest.mark.parametrize("read_size", [1 << 20, 5])
+def test_wrapped_array_matches_json_normalize(read_size):
+    doc = json.dumps({"meta": {"source": "export"}, "data": RAGGED})
+    got = read_json_stream(_upload(doc), chunk_rows=2, read_size=read_size)
+    expected = pd.json_normalize(RAGGED)
+    pd.testing.assert_frame_equal(got[expected.columns.tolist()], expected, check_dtype=False)
+
+
+def test_empty_objects_keep_their_rows():
+    got = read_json_stream(_upload("[{}, {}, {}]"), chunk_rows=2)
+    assert got.shape == (3, 0)
+
+
+def test_datetime_column_with_non_dates_stays_text():
+    df = pd.DataFrame({
+        "shipped": ["2024-01-05", "2024-01-06", "pending", None],
+        "ordered": ["2024-01-01", "2024-01-02", "2024-01-03", None],
+    })
+    out = parse_datetime_columns(df)
+    assert not pd.api.types.is_datetime64_any_dtype(out["shipped"])
+    assert out["shipped"].tolist()[:3] == ["2024-01-05", "2024-01-06", "pending"]
+    assert pd.api.types.is_datetime64_any_dtype(out["ordered"])
+    assert out["ordered"].isna().tolist() == [False, False, False, True]
+
+
+@pytest.mark.parametrize("read_size", [1 << 20, 5])
+def test_wrapper_rule_same_for_small_and_large_documents(read_size):
+    doc = json.dumps({"data": [{"a": 1}, {"a": 2}, 3]})
+    got = read_json_stream(_upload(doc), read_size=read_size)
+    assert got["a"].tolist()[:2] == [1, 2] and len(got) == 3
+
+
+@pytest.mark.parametrize("read_size", [1 << 20, 5])
+def test_ndjson_lines_are_never_unwrapped(read_size):
+    lines = [{"id": i, "items": [{"sku": "x"}, {"sku": "y"}]} for i in range(3)]
+    ndjson = "\n".join(json.dumps(r) for r in lines)
+    got = read_json_stream(_upload(ndjson), read_size=read_size, unwrap=False)
+    assert got["id"].tolist() == [0, 1, 2]
+    assert got["items"].tolist() == [r["items"] for r in lines]
@@ -0,0 +1,20 @@
+# tests/test_model_registry.py
+
+import pandas as pd
+
+from model_registry import dataset_id, save_model
+
+
+def test_dataset_id_hashes_nested_json_cells():
+    df = pd.DataFrame({"tags": [["a"], ["b", "c"], []], "n": [1, 2, 3]})
+    same = pd.DataFrame({"tags": [["a"], ["b", "c"], []], "n": [1, 2, 3]})
+    other = pd.DataFrame({"tags": [["a"], ["b"], []], "n": [1, 2, 3]})
+    assert dataset_id(df) == dataset_id(same) != dataset_id(other)
+
+
+def test_save_model_adds_versions(tmp_path):
+    df = pd.DataFrame({"x": [1.0, 2.0], "y": [0, 1]})
+    first = save_model({"weights": [1]}, "ana", df, {"target": "y"}, root=str(tmp_path))
+    second = save_model({"weights": [2]}, "ana", df, {"target": "y"}, root=str(tmp_path))
+    assert (first["dataset_id"], first["version"]) == (second["dataset_id"], 1)
+    assert second["version"] == 2
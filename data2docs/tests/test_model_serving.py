@@ -0,0 +1,74 @@
+# tests/test_model_serving.py
+
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from automl import train_automl
+
+
+def _frame(n=200, seed=0):
+    rng = np.random.default_rng(seed)
+    x = rng.normal(size=n)
+    df = pd.DataFrame({
+        "x": x,
+        "noise": rng.normal(size=n),
+        "country": rng.choice(["de", "fr", "us"], size=n),
+        "label": np.where(x > 0, "high", "low"),
+    })
+    df.loc[::7, "noise"] = np.nan  # training rows with gaps: the linear model needs them filled
+    return df
+
+
+@pytest.fixture(scope="module")
+def saved(backend):
+    run = train_automl(_frame(), "label", user="tester")
+    return run["meta"]
+
+
+def _predict(backend, meta, csv, **params):
+    return backend.client.post(f"/api/models/{meta['dataset_id']}/predict", query_string=params,
+                               data={"file": (io.BytesIO(csv.encode()), "rows.csv")}, headers=backend.auth)
+
+
+def test_predict_fills_missing_values_like_training(backend, saved):
+    assert saved["fill_values"].keys() >= {"x", "noise"}
+    rows = _frame(20, seed=1).drop(columns="label").assign(id=range(20))
+    rows.loc[:4, ["x", "noise"]] = np.nan
+    res = _predict(backend, saved, rows.to_csv(index=False), id_column="id")
+    assert res.status_code == 200, res.get_data(as_text=True)
+    out = pd.read_csv(io.StringIO(res.get_data(as_text=True)))
+    assert out["id"].tolist() == list(range(20))
+    assert set(out["prediction"]) <= {"high", "low"}
+    assert res.headers["X-Model-Version"] == str(saved["version"])
+
+
+def test_predict_rejects_missing_columns_and_unknown_models(backend, saved):
+    res = _predict(backend, saved, "x,noise\n1,2\n")
+    assert res.status_code == 400 and res.get_json()["columns"] == ["country"]
+    res = _predict(backend, {"dataset_id": "0" * 16}, "x\n1\n")
+    assert res.status_code == 404
+
+
+def test_models_are_listed_per_user(backend, saved):
+    listed = backend.client.get("/api/models", headers=backend.auth).get_json()
+    assert [(m["dataset_id"], m["version"]) for m in listed] == [(saved["dataset_id"], saved["version"])]
+
+
+def test_multipart_upload_streams_every_chunk(backend, saved, monkeypatch):
+    monkeypatch.setattr(backend.model_serving, "SCORE_CHUNK_ROWS", 7)
+    rows = _frame(30, seed=2).drop(columns="label").assign(id=range(30))
+    res = _predict(backend, saved, rows.to_csv(index=False), id_column="id")
+    body = res.get_data(as_text=True)
+    assert "#ERROR" not in body
+    assert pd.read_csv(io.StringIO(body))["id"].tolist() == list(range(30))
+
+
+def test_failure_after_the_first_chunk_ends_with_a_marker(backend, saved, monkeypatch):
+    monkeypatch.setattr(backend.model_serving, "SCORE_CHUNK_ROWS", 5)
+    rows = _frame(10, seed=3).drop(columns="label")
+    csv = rows.to_csv(index=False) + "not-a-number,1,de\n"  # third chunk: x cannot be parsed
+    body = _predict(backend, saved, csv).get_data(as_text=True)
+    assert body.splitlines()[-1].startswith("#ERROR: scoring failed after 10 rows")
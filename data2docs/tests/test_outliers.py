@@ -0,0 +1,65 @@
+# tests/test_outliers.py
+
+import numpy as np
+import pandas as pd
+
+from outliers import detect_outliers, isolation_forest
+
+
+def _frame():
+    rng = np.random.default_rng(0)
+    values = rng.normal(50, 5, 1_000)
+    values[[10, 20]] = [500.0, -400.0]
+    values[30] = np.nan
+    return pd.DataFrame({"x": values, "flat": np.arange(1_000) % 7, "label": "a"},
+                        index=pd.RangeIndex(1_000) + 100)
+
+
+def test_flags_match_each_rule_on_the_full_column():
+    df = _frame()
+    report = detect_outliers(df)
+    x = df["x"]
+    q1, q3 = x.quantile([0.25, 0.75])
+    median = x.median()
+    mad = 1.4826 * (x - median).abs().median()
+    expected = {
+        "iqr": (x < q1 - 1.5 * (q3 - q1)) | (x > q3 + 1.5 * (q3 - q1)),
+        "zscore": ((x - x.mean()) / x.std(ddof=0)).abs() > 3.0,
+        "mad": ((x - median) / mad).abs() > 3.5,
+    }
+    row = report["columns"].set_index("column").loc["x"]
+    for method, flags in expected.items():
+        assert row[f"{method}_count"] == flags.sum()
+        assert set(df.index[flags]) <= set(report["rows"][method])
+    # the two planted values are flagged by every rule and are labels, not positions
+    for method in expected:
+        assert {110, 120} <= set(report["rows"][method])
+    # NaN is never an outlier
+    assert 130 not in set(report["rows"]["iqr"])
+    assert report["n_rows"] == 1_000
+    assert "label" not in set(report["columns"]["column"])
+
+
+def test_sampled_bounds_stay_close_to_the_exact_ones():
+    df = _frame()
+    exact = detect_outliers(df)["columns"].set_index("column")
+    sampled = detect_outliers(df, sample_rows=500)["columns"].set_index("column")
+    assert abs(sampled.loc["x", "iqr_high"] - exact.loc["x", "iqr_high"]) < 2.0
+    assert sampled.loc["x", "zscore_high"] == exact.loc["x", "zscore_high"]
+
+
+def test_all_nan_column_is_skipped():
+    df = _frame().assign(empty=np.nan)
+    report = detect_outliers(df)
+    assert "empty" not in set(report["columns"]["column"])
+
+
+def test_isolation_forest_drops_all_nan_columns():
+    df = _frame()[["x", "label"]].assign(empty=np.nan)
+    result = isolation_forest(df, top_n=10)
+    assert result["scored_rows"] == 1_000
+    assert np.isfinite(result["scores"]).all()
+    assert {110, 120} <= set(result["index"])
+
+    only_nan = pd.DataFrame({"empty": [np.nan] * 10, "label": list("abcdefghij")})
+    assert isolation_forest(only_nan)["scored_rows"] == 0
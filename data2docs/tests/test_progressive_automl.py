@@ -0,0 +1,84 @@
+# tests/test_progressive_automl.py
+
+import functools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import progressive_automl
+from progressive_automl import holdout_mask, progressive_search, stage_sizes, stratified_order
+
+
+@pytest.fixture
+def small_stages(monkeypatch):
+    """Stages of 100, 1,000... rows, so a couple of thousand rows make several stages."""
+    monkeypatch.setattr(progressive_automl, "stage_sizes", functools.partial(stage_sizes, first=100))
+
+
+def _linear(n=2_000, seed=0):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame({"a": rng.normal(size=n), "b": rng.normal(size=n)})
+    return X, 3 * X["a"] - 2 * X["b"] + 1
+
+
+def test_stage_sizes():
+    assert stage_sizes(5_000) == [5_000]
+    assert stage_sizes(10_000) == [10_000]
+    assert stage_sizes(250_000) == [10_000, 100_000]
+    assert stage_sizes(1_600, first=100) == [100, 1_000]
+
+
+def test_all_stages_then_refit_on_every_training_row(small_stages):
+    X, y = _linear()
+    seen = []
+    result = progressive_search(X, y, "regression", budget_s=600, min_gain=-np.inf,
+                                on_stage=lambda board, stage, total: seen.append((stage, total, len(board))))
+    assert seen == [(1, 2, 2), (2, 2, 4)]
+    assert result["stop_reason"] == "all stages done"
+    assert result["leaderboard"]["rows"].tolist() == [100, 100, 1_000, 1_000]
+    assert result["best_name"] == "Linear Regression"
+    assert result["refit"] and result["train_rows"] == 1_600
+    assert len(result["y_test"]) == 400
+
+
+def test_flat_learning_curve_stops_without_refit(small_stages):
+    X, y = _linear()
+    result = progressive_search(X, y, "regression", budget_s=600, min_gain=1.0)
+    assert result["stop_reason"] == "learning curve flattened"
+    assert not result["refit"] and result["train_rows"] == 1_000
+
+
+def test_budget_stops_after_the_first_stage(small_stages):
+    X, y = _linear()
+    result = progressive_search(X, y, "regression", budget_s=0.0, min_gain=-np.inf)
+    assert result["stop_reason"] == "time budget"
+    assert result["leaderboard"]["stage"].max() == 1
+    assert not result["refit"] and result["train_rows"] == 100
+
+
+def test_rare_classes_are_in_the_first_stage_and_not_held_out():
+    y = pd.Series(["common"] * 99_990 + ["rare"] * 3 + ["uncommon"] * 7)
+    order = stratified_order(y)
+    y_ordered = y.to_numpy()[order]
+    test = holdout_mask(y_ordered, 0.2)
+    first_stage = pd.Series(y_ordered[~test][:100])
+    assert set(first_stage) == {"common", "rare", "uncommon"}
+    assert pd.Series(y_ordered[test]).value_counts().to_dict() == {"common": 19_998, "uncommon": 1}
+    # prefixes stay stratified
+    assert (pd.Series(y_ordered[:50_000]) == "common").sum() == pytest.approx(49_995, abs=5)
+
+
+def test_holdout_falls_back_when_every_class_is_tiny():
+    y = pd.Series(list("aabbccddee"))
+    assert holdout_mask(y.to_numpy()[stratified_order(y)], 0.2).sum() == 2
+
+
+def test_classification_with_a_singleton_class(small_stages):
+    rng = np.random.default_rng(1)
+    X = pd.DataFrame({"a": rng.normal(size=2_000)})
+    y = pd.Series(np.where(X["a"] > 0, "pos", "neg"))
+    y.iloc[0] = "odd"
+    result = progressive_search(X, y, "classification", budget_s=600)
+    assert "odd" not in set(result["y_test"])
+    assert result["best_score"] > 0.9
@@ -0,0 +1,79 @@
+# tests/test_report_builder.py
+
+import pandas as pd
+import pytest
+
+from report_builder import RENDERERS, Section, SectionCache, build_report, frame_fingerprint
+
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame({"x": [1.0, 2.0, 3.0], "y": ["a", "b", "c"]})
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    """Renderer calls per section kind, counted while still rendering for real."""
+    counts = {}
+    for kind, fn in list(RENDERERS.items()):
+        def counting(*args, _kind=kind, _fn=fn, **kwargs):
+            counts[_kind] = counts.get(_kind, 0) + 1
+            return _fn(*args, **kwargs)
+        monkeypatch.setitem(RENDERERS, kind, counting)
+    return counts
+
+
+def _sections(frame, text="First finding."):
+    return [
+        Section("profile", "Profile", frame=frame),
+        Section("summary", "Summary", frame=frame),
+        Section("kv", "Changes", items={"added": 3}),
+        Section("text", "AI Insights", text=text),
+    ]
+
+
+def test_rebuild_renders_only_the_edited_section(frame, calls):
+    cache = SectionCache(1 << 20)
+    first, stats = build_report(_sections(frame), section_cache=cache)
+    assert (stats["rendered"], stats["cached"]) == (4, 0)
+
+    again, stats = build_report(_sections(frame), section_cache=cache)
+    assert (stats["rendered"], stats["cached"]) == (0, 4)
+    assert again == first
+
+    edited, stats = build_report(_sections(frame, text="Second finding."), section_cache=cache)
+    assert (stats["rendered"], stats["cached"]) == (1, 3)
+    assert calls == {"profile": 1, "summary": 1, "kv": 1, "text": 2}
+    assert "Second finding." in edited and "First finding." not in edited
+
+
+def test_equal_frames_share_cache_entries_and_edits_miss(frame):
+    cache = SectionCache(1 << 20)
+    build_report([Section("profile", "Profile", frame=frame)], section_cache=cache)
+    _, stats = build_report([Section("profile", "Profile", frame=frame.copy())], section_cache=cache)
+    assert stats["cached"] == 1
+
+    changed = frame.assign(x=[1.0, 2.0, 4.0])
+    assert frame_fingerprint(changed) != frame_fingerprint(frame)
+    _, stats = build_report([Section("profile", "Profile", frame=changed)], section_cache=cache)
+    assert stats["rendered"] == 1
+
+
+def test_failed_section_is_a_note_and_not_cached(frame):
+    cache = SectionCache(1 << 20)
+    broken = Section("table", "Broken", frame=None)
+    page, _ = build_report([broken], section_cache=cache)
+    assert "Could not render this section" in page
+    _, stats = build_report([broken], section_cache=cache)
+    assert stats["rendered"] == 1
+
+
+def test_cache_evicts_least_recently_used():
+    cache = SectionCache(10)
+    cache.put("a", "aaaa")
+    cache.put("b", "bbbb")
+    assert cache.get("a") == "aaaa"  # "b" is now the oldest
+    cache.put("c", "cccc")
+    assert cache.get("b") is None
+    assert cache.get("a") == "aaaa" and cache.get("c") == "cccc"
+    assert cache.nbytes == 8
@@ -0,0 +1,90 @@
+# tests/test_report_store.py
+
+import pytest
+
+import report_store
+from report_store import SNAPSHOT_EVERY
+
+
+def _revisions(n):
+    body = "\n".join(f"line {i}: some report text" for i in range(500))
+    return [f"{body}\nedit {v}\n{body[:v * 40]}" for v in range(1, n + 1)]
+
+
+@pytest.fixture(params=["zstd", "zlib"])
+def codec(request, monkeypatch):
+    if request.param == "zlib":
+        monkeypatch.setattr(report_store, "zstandard", None)
+    return request.param
+
+
+def test_versions_round_trip_across_snapshots(backend, codec):
+    texts = _revisions(2 * SNAPSHOT_EVERY + 5)
+    store = backend.reports
+    meta = store.create(backend.user_id, "history", texts[0])
+    for text in texts[1:]:
+        assert store.update(meta, content=text)
+    backend.db.session.commit()
+
+    assert meta.latest_version == len(texts)
+    for version, text in enumerate(texts, start=1):
+        assert store.content(meta, version) == text
+    assert store.content(meta) == texts[-1]
+
+    listed = {v["version"]: v for v in store.versions(meta)}
+    assert not listed[len(texts)]["delta"]
+    assert not listed[SNAPSHOT_EVERY]["delta"]
+    assert listed[1]["delta"] and listed[SNAPSHOT_EVERY + 1]["delta"]
+    R = backend.ReportRevision
+    codecs = [c for (c,) in backend.db.session.query(R.codec).filter(R.report_id == meta.id)]
+    assert len(codecs) == len(texts) and all(c.startswith(codec) for c in codecs)
+
+    with pytest.raises(LookupError):
+        store.content(meta, len(texts) + 1)
+
+
+def test_unchanged_content_makes_no_revision(backend):
+    meta = backend.reports.create(backend.user_id, "same", "text")
+    assert not backend.reports.update(meta, content="text")
+    assert meta.latest_version == 1
+
+
+def test_legacy_migration_is_idempotent(backend):
+    # an id no report created above can have, since migrated reports keep theirs
+    backend.db.session.add(backend.Report(id=10_000, title="old", content="legacy text", user_id=backend.user_id))
+    backend.db.session.commit()
+    assert backend.reports.migrate_legacy(backend.Report) == (1, {})
+    assert backend.reports.migrate_legacy(backend.Report) == (0, {})
+    meta = backend.db.session.get(backend.ReportMeta, 10_000)
+    assert (meta.title, backend.reports.content(meta)) == ("old", "legacy text")
+
+
+def test_legacy_id_taken_by_a_new_report_is_remapped(backend):
+    store, db = backend.reports, backend.db
+    current = store.create(backend.user_id, "new", "new text")
+    db.session.commit()
+    db.session.add(backend.Report(id=current.id, title="old", content="legacy text", user_id=backend.user_id))
+    db.session.add(backend.Report(id=20_000, title="free", content="free id", user_id=backend.user_id))
+    db.session.commit()
+
+    count, remapped = store.migrate_legacy(backend.Report)
+    assert count == 2 and list(remapped) == [current.id]
+    moved = db.session.get(backend.ReportMeta, remapped[current.id])
+    assert (moved.title, moved.legacy_id, store.content(moved)) == ("old", current.id, "legacy text")
+    assert (current.title, store.content(current)) == ("new", "new text")
+    assert db.session.get(backend.ReportMeta, 20_000).legacy_id == 20_000
+    assert store.migrate_legacy(backend.Report) == (0, {})
+
+
+def test_listing_includes_latest_content_unless_asked_not_to(backend):
+    client, auth = backend.client, backend.auth
+    report_id = client.post("/api/reports", json={"title": "listed", "content": "v1"}, headers=auth).get_json()["id"]
+    client.put(f"/api/reports/{report_id}", json={"content": "v2"}, headers=auth)
+
+    listing = {r["id"]: r for r in client.get("/api/reports", headers=auth).get_json()}
+    assert (listing[report_id]["content"], listing[report_id]["latest_version"]) == ("v2", 2)
+    assert all("content" in r for r in listing.values())
+
+    light = client.get("/api/reports?content=false", headers=auth).get_json()
+    assert report_id in {r["id"] for r in light}
+    assert not any("content" in r for r in light)
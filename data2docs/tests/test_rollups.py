@@ -0,0 +1,20 @@
+# tests/test_rollups.py
+
+import numpy as np
+import pandas as pd
+
+from rollups import PERCENTILES, build_rollups
+
+
+def test_percentiles_match_groupby_quantile():
+    rng = np.random.default_rng(0)
+    n = 5_000
+    ts = pd.Series(pd.Timestamp("2024-03-01") + pd.to_timedelta(rng.integers(0, 3 * 86_400, n), unit="s"))
+    values = pd.Series(rng.normal(100, 15, n))
+    values[rng.random(n) < 0.05] = np.nan
+
+    table = build_rollups(ts, values).tables["hour"]
+    expected = values.groupby(ts.dt.floor("h")).quantile([p / 100 for p in PERCENTILES]).unstack()
+    for p in PERCENTILES:
+        np.testing.assert_allclose(table[f"p{p}"].to_numpy(), expected[p / 100].to_numpy())
+    np.testing.assert_allclose(table["mean"].to_numpy(), values.groupby(ts.dt.floor("h")).mean().to_numpy())